@@ -0,0 +1,348 @@
+import os
+import csv
+import itertools
+import numpy as np
+from leitor_dados import detectar_formato
+
+# ============================================================================
+# ARMAZENAMENTO BINÁRIO DE SEGMENTOS
+# ============================================================================
+#
+# Cada gravação segmentada vira uma pasta com dois arquivos:
+#   segmentos.npy          - todos os valores da gravação em float64 contíguo
+#   indice_segmentos.csv   - uma linha por segmento: inicio, tamanho, segmento,
+#                            condicao, label
+# Os extratores abrem o .npy por memory-map e cada segmento é uma view sem cópia.
+
+ARQUIVO_SINAL = 'segmentos.npy'
+ARQUIVO_INDICE = 'indice_segmentos.csv'
+CAMPOS_INDICE = ['inicio', 'tamanho', 'segmento', 'condicao', 'label']
+
+# Armazenamentos já abertos neste processo: pasta -> (mtime do índice, sinal, índice, registros por id),
+# do menos para o mais recentemente usado; acima do limite, o mais antigo é fechado
+_armazenamentos_abertos = {}
+MAX_ARMAZENAMENTOS_ABERTOS = 32
+
+def label_da_condicao(condicao):
+    """Label da condição pelo nome da pasta (mesma regra dos extratores)"""
+    nome_pasta = condicao.lower()
+    if 'h' in nome_pasta or 'normal' in nome_pasta:
+        return 0  # Estado normal
+    elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
+        return 1  # Estado com falha
+    return 0  # Padrão como normal
+
+def limites_segmentos(total_linhas, n_segmentos):
+    """(inicio, fim) de cada segmento: divisão em partes iguais, o resto vai para os primeiros"""
+    tamanho_segmento = total_linhas // n_segmentos
+    resto = total_linhas % n_segmentos
+    limites = []
+    inicio = 0
+    for i in range(n_segmentos):
+        fim = inicio + tamanho_segmento + (1 if i < resto else 0)
+        limites.append((inicio, fim))
+        inicio = fim
+    return limites
+
+def detectar_delimitador(linhas):
+    """Delimitador de campos das primeiras linhas, como em leitor_dados (';' se não detectado)"""
+    formato = detectar_formato(linhas[:100])
+    return formato['delimitador'] if formato else ';'
+
+def converter_linhas(linhas, delimitador=None):
+    """Valor numérico de cada linha de uma gravação
+
+    Usa o primeiro campo da linha (delimitador detectado como em leitor_dados,
+    quando não informado), aceitando vírgula decimal. Retorna (valores,
+    validos): linhas de cabeçalho, vazias ou não numéricas ficam com
+    validos = False, como o leitor tolerante as descartaria ao ler o arquivo
+    de texto do segmento.
+    """
+    if delimitador is None:
+        delimitador = detectar_delimitador(linhas)
+    valores = np.zeros(len(linhas), dtype=np.float64)
+    validos = np.zeros(len(linhas), dtype=bool)
+    for i, linha in enumerate(linhas):
+        try:
+            valores[i] = float(linha.strip().split(delimitador)[0].strip().replace(',', '.'))
+            validos[i] = True
+        except ValueError:
+            continue
+    return valores, validos
+
+def salvar_armazenamento_valores(pasta_saida, valores, limites, condicao, label=None):
+    """Grava valores já convertidos e os (inicio, fim) de cada segmento
+
+    Os limites podem se sobrepor (janelas deslizantes): o sinal é gravado uma
+    única vez e cada segmento é só uma entrada do índice. Os segmentos recebem
+    os ids segmento_1, segmento_2..., os mesmos nomes dos arquivos de texto.
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    np.save(os.path.join(pasta_saida, ARQUIVO_SINAL), np.asarray(valores, dtype=np.float64))
+    salvar_indice(pasta_saida, limites, condicao, label)
+
+def salvar_indice(pasta_saida, limites, condicao, label=None):
+    """Grava o índice com os (inicio, fim), em valores do sinal, de cada segmento"""
+    if label is None:
+        label = label_da_condicao(condicao)
+    with open(os.path.join(pasta_saida, ARQUIVO_INDICE), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CAMPOS_INDICE)
+        for idx, (inicio, fim) in enumerate(limites):
+            writer.writerow([int(inicio), int(fim - inicio), f'segmento_{idx+1}', condicao, label])
+
+def salvar_armazenamento(pasta_saida, linhas, limites, condicao, label=None):
+    """Grava as linhas de uma gravação segmentada no formato binário
+
+    `limites` são os (inicio, fim) em linhas de cada segmento, como em
+    limites_segmentos.
+    """
+    valores, validos = converter_linhas(linhas)
+
+    # Posição no vetor de valores de cada linha: só as linhas válidas são guardadas
+    posicoes = np.concatenate([[0], np.cumsum(validos)])
+    limites_valores = [(posicoes[inicio], posicoes[fim]) for inicio, fim in limites]
+    salvar_armazenamento_valores(pasta_saida, valores[validos], limites_valores, condicao, label)
+
+# ============================================================================
+# GRAVAÇÃO EM FLUXO (gravações maiores que a memória)
+# ============================================================================
+#
+# Em vez de readlines(), a gravação é lida duas vezes: contar_linhas conta as
+# linhas em blocos binários (para os limites dos segmentos) e
+# gravar_sinal_em_fluxo converte blocos de linhas direto para o .npy. A
+# memória usada depende do tamanho do bloco, não do arquivo.
+
+TAMANHO_BLOCO_BYTES = 1 << 20
+LINHAS_POR_BLOCO = 65536
+
+def contar_linhas(caminho_arquivo):
+    """Número de linhas como readlines() contaria (fim de linha LF, CRLF ou CR), lendo blocos binários"""
+    total = 0
+    ultimo = b''
+    with open(caminho_arquivo, 'rb') as f:
+        while True:
+            bloco = f.read(TAMANHO_BLOCO_BYTES)
+            if not bloco:
+                break
+            total += bloco.count(b'\n') + bloco.count(b'\r') - bloco.count(b'\r\n')
+            if ultimo == b'\r' and bloco[:1] == b'\n':
+                total -= 1  # \r\n dividido entre dois blocos
+            ultimo = bloco[-1:]
+    if ultimo not in (b'', b'\n', b'\r'):
+        total += 1  # Última linha sem fim de linha
+    return total
+
+def _escrever_cabecalho_npy(f, n_valores):
+    # O numpy reserva espaço no cabeçalho para o shape crescer: o tamanho não
+    # muda quando o número real de valores é regravado no fim
+    np.lib.format.write_array_header_1_0(
+        f, {'descr': np.dtype(np.float64).str, 'fortran_order': False, 'shape': (n_valores,)})
+
+def gravar_sinal_em_fluxo(caminho_arquivo, pasta_saida, fronteiras=(), limites_texto=(), cancelar=None):
+    """Converte a gravação em blocos de linhas direto para segmentos.npy
+
+    `fronteiras` são números de linha cuja posição no sinal é pedida (os
+    inicio/fim dos segmentos); só as linhas válidas viram valores, como em
+    salvar_armazenamento. Os (inicio, fim) em `limites_texto` também são
+    gravados como segmento_N.txt com as linhas originais. Retorna
+    (n_valores, posicoes) com posicoes[linha] = valores antes da linha, ou
+    None quando cancelado (cancelar, um threading.Event).
+    """
+    fronteiras = sorted(set(fronteiras))
+    posicoes = {}
+    proxima_fronteira = 0
+    # Segmentos de texto ainda por abrir (em ordem de início) e os abertos
+    pendentes = sorted(enumerate(limites_texto), key=lambda item: item[1][0])
+    proximo_texto = 0
+    abertos = []
+    n_linhas = 0
+    n_valores = 0
+    delimitador = None
+    try:
+        with open(caminho_arquivo, 'r', encoding='utf-8') as entrada, \
+                open(os.path.join(pasta_saida, ARQUIVO_SINAL), 'wb') as saida:
+            _escrever_cabecalho_npy(saida, 0)
+            inicio_dados = saida.tell()
+            while True:
+                if cancelar is not None and cancelar.is_set():
+                    return None
+                bloco = list(itertools.islice(entrada, LINHAS_POR_BLOCO))
+                if not bloco:
+                    break
+                if delimitador is None:
+                    delimitador = detectar_delimitador(bloco)
+                valores, validos = converter_linhas(bloco, delimitador)
+                fim_bloco = n_linhas + len(bloco)
+
+                if proxima_fronteira < len(fronteiras) and fronteiras[proxima_fronteira] < fim_bloco:
+                    acumulado = np.concatenate([[0], np.cumsum(validos)])
+                    while proxima_fronteira < len(fronteiras) and fronteiras[proxima_fronteira] < fim_bloco:
+                        linha = fronteiras[proxima_fronteira]
+                        posicoes[linha] = n_valores + int(acumulado[linha - n_linhas])
+                        proxima_fronteira += 1
+
+                while proximo_texto < len(pendentes) and pendentes[proximo_texto][1][0] < fim_bloco:
+                    idx, (inicio, fim) = pendentes[proximo_texto]
+                    arquivo = open(os.path.join(pasta_saida, f'segmento_{idx+1}.txt'), 'w', encoding='utf-8')
+                    abertos.append((inicio, fim, arquivo))
+                    proximo_texto += 1
+                for inicio, fim, arquivo in abertos:
+                    arquivo.writelines(bloco[max(inicio - n_linhas, 0):fim - n_linhas])
+                for inicio, fim, arquivo in [aberto for aberto in abertos if aberto[1] <= fim_bloco]:
+                    arquivo.close()
+                    abertos.remove((inicio, fim, arquivo))
+
+                valores[validos].tofile(saida)
+                n_valores += int(validos.sum())
+                n_linhas = fim_bloco
+
+            # Fronteiras no fim do arquivo (ou além, se ele encolheu desde a contagem)
+            for linha in fronteiras[proxima_fronteira:]:
+                posicoes[linha] = n_valores
+            # Segmentos de texto que começam depois da última linha ficam vazios
+            for idx, _ in pendentes[proximo_texto:]:
+                open(os.path.join(pasta_saida, f'segmento_{idx+1}.txt'), 'w', encoding='utf-8').close()
+            saida.seek(0)
+            _escrever_cabecalho_npy(saida, n_valores)
+            if saida.tell() != inicio_dados:
+                raise ValueError("Cabeçalho do .npy mudou de tamanho ao regravar o número de valores")
+    finally:
+        for _, _, arquivo in abertos:
+            arquivo.close()
+    return n_valores, posicoes
+
+def salvar_armazenamento_fluxo(pasta_saida, caminho_arquivo, limites, condicao, label=None, exportar_texto=False,
+                               cancelar=None):
+    """Versão em fluxo de salvar_armazenamento: lê a gravação do disco em blocos
+
+    `limites` são os (inicio, fim) em linhas (contar_linhas dá o total). Com
+    exportar_texto, cada segmento também é gravado como segmento_N.txt.
+    Retorna False quando cancelado (os arquivos parciais ficam na pasta).
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    fronteiras = [linha for limite in limites for linha in limite]
+    gravado = gravar_sinal_em_fluxo(caminho_arquivo, pasta_saida, fronteiras,
+                                    limites if exportar_texto else (), cancelar)
+    if gravado is None:
+        return False
+    _, posicoes = gravado
+    salvar_indice(pasta_saida, [(posicoes[inicio], posicoes[fim]) for inicio, fim in limites], condicao, label)
+    return True
+
+def armazenamento_existe(pasta):
+    """Verifica se a pasta contém um armazenamento binário de segmentos"""
+    return os.path.isfile(os.path.join(pasta, ARQUIVO_SINAL)) and os.path.isfile(os.path.join(pasta, ARQUIVO_INDICE))
+
+def carregar_armazenamento(pasta):
+    """Abre o armazenamento da pasta e retorna (sinal em memory-map, índice)
+
+    O índice é uma lista de dicionários com os campos de CAMPOS_INDICE. O
+    resultado fica em cache no processo (até MAX_ARMAZENAMENTOS_ABERTOS pastas)
+    até o índice ser regravado ou liberar_armazenamentos ser chamada.
+    """
+    _, sinal, indice, _ = _abrir_armazenamento(pasta)
+    return sinal, indice
+
+def _abrir_armazenamento(pasta):
+    caminho_indice = os.path.join(pasta, ARQUIVO_INDICE)
+    mtime = os.path.getmtime(caminho_indice)
+    aberto = _armazenamentos_abertos.pop(pasta, None)
+    if aberto is not None and aberto[0] == mtime:
+        _armazenamentos_abertos[pasta] = aberto
+        return aberto
+
+    sinal = np.load(os.path.join(pasta, ARQUIVO_SINAL), mmap_mode='r')
+    indice = []
+    with open(caminho_indice, 'r', encoding='utf-8', newline='') as f:
+        for registro in csv.DictReader(f):
+            registro['inicio'] = int(registro['inicio'])
+            registro['tamanho'] = int(registro['tamanho'])
+            registro['label'] = int(registro['label'])
+            indice.append(registro)
+    por_segmento = {registro['segmento']: registro for registro in indice}
+    aberto = (mtime, sinal, indice, por_segmento)
+    _armazenamentos_abertos[pasta] = aberto
+    while len(_armazenamentos_abertos) > MAX_ARMAZENAMENTOS_ABERTOS:
+        _armazenamentos_abertos.pop(next(iter(_armazenamentos_abertos)), None)
+    return aberto
+
+def liberar_armazenamentos(pasta=None):
+    """Fecha os armazenamentos em cache (todos, ou os que estão dentro de `pasta`)
+
+    Chamar antes de apagar ou regravar as pastas: no Windows um arquivo em
+    memory-map não pode ser removido. Views entregues antes continuam válidas
+    até serem descartadas. Retorna quantos foram liberados.
+    """
+    if pasta is None:
+        liberados = len(_armazenamentos_abertos)
+        _armazenamentos_abertos.clear()
+        return liberados
+    raiz = os.path.abspath(pasta)
+    liberados = 0
+    for chave in list(_armazenamentos_abertos):
+        caminho = os.path.abspath(chave)
+        if caminho == raiz or caminho.startswith(raiz + os.sep):
+            if _armazenamentos_abertos.pop(chave, None) is not None:
+                liberados += 1
+    return liberados
+
+def iterar_segmentos(pasta):
+    """Gera (registro do índice, dados do segmento) sem copiar os valores"""
+    sinal, indice = carregar_armazenamento(pasta)
+    for registro in indice:
+        inicio = registro['inicio']
+        yield registro, np.asarray(sinal[inicio:inicio + registro['tamanho']])
+
+# ============================================================================
+# INTEGRAÇÃO COM OS EXTRATORES (mesmos nomes da estrutura em texto)
+# ============================================================================
+
+def arquivos_segmentos(pasta, arquivos):
+    """Arquivos de segmentos a processar numa pasta
+
+    Com um armazenamento binário na pasta, retorna os nomes que a exportação em
+    texto geraria após a conversão para CSV (segmento_N.csv), de forma que as
+    saídas dos extratores mantêm os mesmos nomes; senão retorna `arquivos`.
+    """
+    if armazenamento_existe(pasta):
+        _, indice = carregar_armazenamento(pasta)
+        return [f"{registro['segmento']}.csv" for registro in indice]
+    return arquivos
+
+def registro_segmento(pasta, arquivo):
+    """(registro do índice, dados) do segmento `arquivo` do armazenamento da pasta
+
+    Retorna (None, None) quando o segmento não está no índice.
+    """
+    _, sinal, _, por_segmento = _abrir_armazenamento(pasta)
+    registro = por_segmento.get(os.path.splitext(arquivo)[0])
+    if registro is None:
+        return None, None
+    inicio = registro['inicio']
+    return registro, np.asarray(sinal[inicio:inicio + registro['tamanho']])
+
+def ler_segmento(pasta, arquivo, ler_arquivo):
+    """Dados de um segmento: view do armazenamento binário ou ler_arquivo(caminho)"""
+    if armazenamento_existe(pasta):
+        _, dados = registro_segmento(pasta, arquivo)
+        if dados is None:
+            return np.array([], dtype=np.float64)
+        return dados
+    return ler_arquivo(os.path.join(pasta, arquivo))
+
+def exportar_para_texto(pasta, pasta_destino=None, extensao='.txt'):
+    """Exporta um armazenamento para a estrutura antiga: um arquivo por segmento
+
+    Cada arquivo recebe um valor por linha. Por padrão os arquivos são criados
+    na própria pasta do armazenamento. Retorna o número de arquivos gravados.
+    """
+    pasta_destino = pasta_destino or pasta
+    os.makedirs(pasta_destino, exist_ok=True)
+    total = 0
+    for registro, dados in iterar_segmentos(pasta):
+        caminho = os.path.join(pasta_destino, registro['segmento'] + extensao)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.writelines(f'{valor!r}\n' for valor in dados.tolist())
+        total += 1
+    return total
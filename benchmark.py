@@ -0,0 +1,296 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+
+# ============================================================================
+# BENCHMARK DOS CAMINHOS CRÍTICOS (sinais sintéticos, sem rede)
+# ============================================================================
+#
+# Gera sinais de vibração de rolamento sintéticos numa pasta temporária, mede
+# cada etapa separadamente e grava os tempos em JSON. Uma execução pode ser
+# comparada com um baseline salvo: casos mais lentos que o limiar são
+# regressões (código de saída 1).
+#
+#   python benchmark.py --salvar-baseline          # grava benchmark_baseline.json
+#   python benchmark.py --limiar 0.15              # compara com o baseline
+
+VERSAO_BENCHMARK = 1
+
+CASOS = ['ler_dados_arquivo', 'calcular_features_completas', 'calcular_features',
+         'segmentacao', 'aplicar_relief_e_salvar', 'escrita_csv_segmentos', 'escrita_colunar']
+
+# Frequências do sinal sintético (Hz)
+FREQUENCIA_AMOSTRAGEM = 12000
+FREQUENCIA_EIXO = 29.95
+FREQUENCIA_RESSONANCIA = 3000
+# Frequência de passagem dos defeitos de cada tipo de falha (múltiplos do eixo)
+DEFEITOS = {'fault_inner': 5.4152, 'fault_outer': 3.5848, 'fault_ball': 4.7135}
+
+# ============================================================================
+# DADOS SINTÉTICOS
+# ============================================================================
+
+def nomes_condicoes(n_condicoes):
+    """normal_0 e falhas em rodízio (fault_inner_1, fault_outer_2...)"""
+    tipos = list(DEFEITOS)
+    return ['normal_0'] + [f'{tipos[(i - 1) % len(tipos)]}_{i}' for i in range(1, n_condicoes)]
+
+def gerar_sinal_rolamento(n_amostras, condicao, rng):
+    """Vibração sintética: rotação do eixo + ruído, mais impactos amortecidos nas falhas"""
+    t = np.arange(n_amostras) / FREQUENCIA_AMOSTRAGEM
+    sinal = 0.05 * np.sin(2 * np.pi * FREQUENCIA_EIXO * t) + 0.02 * rng.standard_normal(n_amostras)
+    tipo = next((tipo for tipo in DEFEITOS if condicao.startswith(tipo)), None)
+    if tipo is not None:
+        # Cada passagem pelo defeito excita a ressonância da estrutura
+        periodo = int(FREQUENCIA_AMOSTRAGEM / (DEFEITOS[tipo] * FREQUENCIA_EIXO))
+        tamanho_impacto = min(periodo, 200)
+        tt = np.arange(tamanho_impacto) / FREQUENCIA_AMOSTRAGEM
+        impacto = np.exp(-800 * tt) * np.sin(2 * np.pi * FREQUENCIA_RESSONANCIA * tt)
+        for inicio in range(int(rng.integers(periodo)), n_amostras - tamanho_impacto, periodo):
+            sinal[inicio:inicio + tamanho_impacto] += rng.uniform(0.2, 0.4) * impacto
+    return sinal
+
+def criar_dados_sinteticos(pasta_base, n_condicoes, segmentos_por_condicao, tamanho_segmento, semente=0):
+    """Cria dados_convertidos_csv/<condicao>/segmento_N.csv e uma gravação bruta por condição
+
+    Retorna {'segmentos': [caminhos], 'gravacoes': [caminhos], 'bytes': total}.
+    """
+    rng = np.random.default_rng(semente)
+    pasta_dados = os.path.join(pasta_base, 'dados_convertidos_csv')
+    pasta_gravacoes = os.path.join(pasta_base, 'gravacoes')
+    os.makedirs(pasta_gravacoes, exist_ok=True)
+    segmentos = []
+    gravacoes = []
+    total_bytes = 0
+    for condicao in nomes_condicoes(n_condicoes):
+        sinal = gerar_sinal_rolamento(segmentos_por_condicao * tamanho_segmento, condicao, rng)
+        linhas = [f'{valor!r}\n' for valor in sinal.tolist()]
+        caminho_gravacao = os.path.join(pasta_gravacoes, f'{condicao}.txt')
+        with open(caminho_gravacao, 'w', encoding='utf-8') as f:
+            f.writelines(linhas)
+        gravacoes.append(caminho_gravacao)
+
+        pasta_condicao = os.path.join(pasta_dados, condicao)
+        os.makedirs(pasta_condicao, exist_ok=True)
+        for i in range(segmentos_por_condicao):
+            caminho = os.path.join(pasta_condicao, f'segmento_{i+1}.csv')
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.writelines(linhas[i * tamanho_segmento:(i + 1) * tamanho_segmento])
+            segmentos.append(caminho)
+            total_bytes += os.path.getsize(caminho)
+    return {'segmentos': segmentos, 'gravacoes': gravacoes, 'bytes': total_bytes}
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+
+def cronometrar(funcao, repeticoes, itens, preparar=None):
+    """Executa funcao `repeticoes` vezes (saída impressa descartada) e resume os tempos
+
+    `preparar` roda antes de cada repetição, fora da medição. `itens` é a
+    quantidade processada por execução, para a vazão.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+    mediana = statistics.median(tempos)
+    return {
+        'mediana_s': mediana,
+        'minimo_s': min(tempos),
+        'repeticoes': repeticoes,
+        'itens': itens,
+        'itens_por_s': itens / mediana if mediana > 0 else None,
+    }
+
+def executar_benchmark(n_condicoes=4, segmentos_por_condicao=200, tamanho_segmento=1000,
+                       repeticoes=3, semente=0, n_workers=1, casos=None):
+    """Gera os dados numa pasta temporária e mede cada caso de CASOS
+
+    As pastas de dados e de resultados dos extratores ficam na pasta
+    temporária, que é apagada no fim. Retorna o relatório.
+    """
+    casos = casos or CASOS
+    pasta_codigo = os.path.dirname(os.path.abspath(__file__))
+    if pasta_codigo not in sys.path:
+        sys.path.insert(0, pasta_codigo)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as pasta_temporaria:
+        dados = criar_dados_sinteticos(pasta_temporaria, n_condicoes, segmentos_por_condicao,
+                                       tamanho_segmento, semente)
+        pasta_dados = os.path.join(pasta_temporaria, 'dados_convertidos_csv')
+        pasta_features = os.path.join(pasta_temporaria, 'features_extraidas')
+        import features_sem_relief
+        import metodo_relief
+        from armazenamento_segmentos import contar_linhas, limites_segmentos, salvar_armazenamento_fluxo
+        from leitor_dados import limpar_formatos_detectados
+        from saida_features import caminho_dataset, pyarrow_disponivel, salvar_dataset
+        from motor_features import COLUNAS_FEATURES_COMPLETAS
+
+        caminhos = dados['segmentos']
+        n_segmentos = len(caminhos)
+        sinais = [features_sem_relief.ler_dados_arquivo(caminho) for caminho in caminhos]
+
+        if 'ler_dados_arquivo' in casos:
+            resultados['ler_dados_arquivo'] = cronometrar(
+                lambda: [features_sem_relief.ler_dados_arquivo(caminho) for caminho in caminhos],
+                repeticoes, n_segmentos, preparar=limpar_formatos_detectados)
+            resultados['ler_dados_arquivo']['mb_por_s'] = (
+                dados['bytes'] / 1e6 / resultados['ler_dados_arquivo']['mediana_s'])
+
+        if 'calcular_features_completas' in casos:
+            resultados['calcular_features_completas'] = cronometrar(
+                lambda: [features_sem_relief.calcular_features_completas(sinal) for sinal in sinais],
+                repeticoes, n_segmentos)
+
+        if 'calcular_features' in casos:
+            resultados['calcular_features'] = cronometrar(
+                lambda: [metodo_relief.calcular_features(sinal) for sinal in sinais],
+                repeticoes, n_segmentos)
+
+        if 'segmentacao' in casos:
+            # Núcleo do processar_dados da interface: contagem, limites e armazenamento em fluxo
+            pasta_segmentos = os.path.join(pasta_temporaria, 'resultados_segmentos')
+            def segmentar():
+                for caminho in dados['gravacoes']:
+                    nome = os.path.splitext(os.path.basename(caminho))[0]
+                    limites = limites_segmentos(contar_linhas(caminho), segmentos_por_condicao)
+                    salvar_armazenamento_fluxo(os.path.join(pasta_segmentos, nome), caminho, limites, nome)
+            resultados['segmentacao'] = cronometrar(segmentar, repeticoes, n_segmentos)
+
+        if 'aplicar_relief_e_salvar' in casos:
+            # Extração feita uma vez: só o ReliefF e a gravação dos rankings são medidos
+            with contextlib.redirect_stdout(io.StringIO()):
+                extracao = metodo_relief.processar_pasta_completa(
+                    pasta_dados, n_workers, usar_cache=False, pasta_features=pasta_features)
+            resultados['aplicar_relief_e_salvar'] = cronometrar(
+                lambda: metodo_relief.aplicar_relief_e_salvar(n_workers, False, extracao,
+                                                              pasta_features=pasta_features),
+                repeticoes, len(extracao[0]))
+
+        matriz = features_sem_relief.calcular_features_lote_irregular(sinais)
+        nomes = [f'segmento_{i+1}' for i in range(n_segmentos)]
+        if 'escrita_csv_segmentos' in casos:
+            pasta_escrita = os.path.join(pasta_temporaria, 'escrita_csv')
+            os.makedirs(pasta_escrita, exist_ok=True)
+            resultados['escrita_csv_segmentos'] = cronometrar(
+                lambda: features_sem_relief._salvar_features_segmentos(pasta_escrita, nomes, matriz, 'normal_0', 0),
+                repeticoes, n_segmentos)
+
+        if 'escrita_colunar' in casos and pyarrow_disponivel():
+            df_features = features_sem_relief.montar_dataframe_features(matriz)
+            df_features['segmento'] = nomes
+            df_features['condicao'] = [caminho.split(os.sep)[-2] for caminho in caminhos]
+            df_features['label'] = 0
+            destino = caminho_dataset(pasta_temporaria, 'escrita_colunar', 'parquet')
+            resultados['escrita_colunar'] = cronometrar(
+                lambda: salvar_dataset(df_features, destino, 'parquet'), repeticoes, n_segmentos)
+
+    return {
+        'versao': VERSAO_BENCHMARK,
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'parametros': {
+            'n_condicoes': n_condicoes,
+            'segmentos_por_condicao': segmentos_por_condicao,
+            'tamanho_segmento': tamanho_segmento,
+            'repeticoes': repeticoes,
+            'semente': semente,
+            'n_workers': n_workers,
+            'n_features': len(COLUNAS_FEATURES_COMPLETAS),
+        },
+        'ambiente': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'resultados': resultados,
+    }
+
+# ============================================================================
+# COMPARAÇÃO COM O BASELINE
+# ============================================================================
+
+def comparar_com_baseline(relatorio, baseline, limiar=0.10):
+    """Razão de tempo (atual / baseline) de cada caso presente nos dois relatórios
+
+    Retorna a lista de {'caso', 'atual_s', 'baseline_s', 'razao', 'regressao'};
+    um caso é regressão quando fica mais de `limiar` (fração) mais lento.
+    """
+    comparacao = []
+    for caso, medicao in relatorio['resultados'].items():
+        anterior = baseline.get('resultados', {}).get(caso)
+        if anterior is None or not anterior['mediana_s']:
+            continue
+        razao = medicao['mediana_s'] / anterior['mediana_s']
+        comparacao.append({
+            'caso': caso,
+            'atual_s': medicao['mediana_s'],
+            'baseline_s': anterior['mediana_s'],
+            'razao': razao,
+            'regressao': razao > 1 + limiar,
+        })
+    return comparacao
+
+def mostrar_relatorio(relatorio, comparacao=None):
+    """Tabela dos tempos medidos (e da comparação, se houver)"""
+    por_caso = {item['caso']: item for item in comparacao or []}
+    print(f"\n{'caso':<30}{'mediana (s)':>14}{'itens/s':>12}{'vs baseline':>14}")
+    for caso, medicao in relatorio['resultados'].items():
+        vazao = f"{medicao['itens_por_s']:.0f}" if medicao['itens_por_s'] else '-'
+        item = por_caso.get(caso)
+        versus = f"{item['razao']:.2f}x{' !' if item['regressao'] else ''}" if item else '-'
+        print(f"{caso:<30}{medicao['mediana_s']:>14.4f}{vazao:>12}{versus:>14}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark da extração, segmentação, ReliefF e escrita")
+    parser.add_argument('--condicoes', type=int, default=4, help="Número de condições (pastas)")
+    parser.add_argument('--segmentos', type=int, default=200, help="Segmentos por condição")
+    parser.add_argument('--amostras', type=int, default=1000, help="Amostras por segmento")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Repetições de cada caso (vale a mediana)")
+    parser.add_argument('--semente', type=int, default=0, help="Semente dos sinais sintéticos")
+    parser.add_argument('--workers', type=int, default=1, help="Workers da extração e threads do ReliefF")
+    parser.add_argument('--casos', nargs='+', choices=CASOS, default=None, help="Casos a medir (padrão: todos)")
+    parser.add_argument('--saida', default='benchmark_resultados.json', help="JSON com os tempos desta execução")
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help="JSON de referência para comparação")
+    parser.add_argument('--salvar-baseline', action='store_true', help="Grava esta execução como o novo baseline")
+    parser.add_argument('--limiar', type=float, default=0.10,
+                        help="Fração de aumento de tempo considerada regressão (padrão: 0.10)")
+    args = parser.parse_args()
+
+    relatorio = executar_benchmark(args.condicoes, args.segmentos, args.amostras, args.repeticoes,
+                                   args.semente, args.workers, args.casos)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2)
+
+    comparacao = None
+    if args.salvar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2)
+        print(f"Baseline gravado em {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('parametros') != relatorio['parametros']:
+            print("Aviso: o baseline foi medido com outros parâmetros")
+        comparacao = comparar_com_baseline(relatorio, baseline, args.limiar)
+
+    mostrar_relatorio(relatorio, comparacao)
+    print(f"\nResultados gravados em {args.saida}")
+    regressoes = [item['caso'] for item in comparacao or [] if item['regressao']]
+    if regressoes:
+        print(f"Regressões acima de {args.limiar:.0%}: {', '.join(regressoes)}")
+        sys.exit(1)
@@ -0,0 +1,125 @@
+import os
+import json
+import hashlib
+from armazenamento_segmentos import armazenamento_existe, registro_segmento, ARQUIVO_SINAL
+
+# ============================================================================
+# CACHE DE EXTRAÇÃO ENDEREÇADO POR CONTEÚDO
+# ============================================================================
+#
+# O manifesto guarda, para cada segmento (caminho absoluto do arquivo ou do
+# segmento dentro do armazenamento binário), o tamanho, o mtime, o hash do
+# conteúdo e o resultado da extração. Numa nova execução:
+#   - tamanho e mtime iguais: o resultado é reaproveitado sem ler o arquivo;
+#   - tamanho ou mtime diferentes: o hash do conteúdo decide (um arquivo
+#     copiado ou "tocado" sem mudança continua válido);
+#   - o manifesto inteiro é descartado quando a versão das features muda.
+
+# Incrementar quando o formato do manifesto mudar
+VERSAO_CACHE = 1
+
+# Módulos cujo código define os valores extraídos (cálculo, leitura dos segmentos em
+# texto e no armazenamento binário, janelamento): alterá-los invalida o cache.
+# Os extratores entram pela sua leitura tolerante (ler_dados_arquivo).
+MODULOS_VERSAO = ['motor_features.py', 'leitor_dados.py', 'janelamento.py', 'armazenamento_segmentos.py',
+                  'features_sem_relief.py', 'metodo_relief.py']
+
+def versao_features(features, *parametros):
+    """Versão do conjunto de features: hash dos MODULOS_VERSAO, das colunas e dos parâmetros"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{VERSAO_CACHE}'.encode())
+    pasta_modulos = os.path.dirname(os.path.abspath(__file__))
+    for modulo in MODULOS_VERSAO:
+        with open(os.path.join(pasta_modulos, modulo), 'rb') as f:
+            h.update(f.read())
+    h.update(','.join(features).encode())
+    h.update(repr(parametros).encode())
+    return h.hexdigest()
+
+def _hash_bytes(conteudo):
+    return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+
+def identificar_segmento(pasta, arquivo):
+    """(chave, assinatura, funcao_hash) de um segmento
+
+    Para um arquivo, a assinatura é [tamanho, mtime]; para um segmento do
+    armazenamento binário, é [tamanho, mtime] do .npy mais [inicio, tamanho]
+    do segmento. funcao_hash() calcula o hash do conteúdo só quando preciso.
+    """
+    chave = os.path.join(os.path.abspath(pasta), arquivo)
+    if armazenamento_existe(pasta):
+        caminho_sinal = os.path.join(pasta, ARQUIVO_SINAL)
+        info = os.stat(caminho_sinal)
+        registro, dados = registro_segmento(pasta, arquivo)
+        if registro is None:
+            return chave, None, None
+        assinatura = [info.st_size, info.st_mtime_ns, registro['inicio'], registro['tamanho']]
+        return chave, assinatura, lambda: _hash_bytes(dados.tobytes())
+
+    info = os.stat(chave)
+    def funcao_hash():
+        with open(chave, 'rb') as f:
+            return _hash_bytes(f.read())
+    return chave, [info.st_size, info.st_mtime_ns], funcao_hash
+
+def carregar_cache(caminho_cache, versao):
+    """Abre o manifesto; um manifesto ausente, corrompido ou de outra versão começa vazio"""
+    cache = {'versao': versao, 'entradas': {}, 'alterado': False}
+    try:
+        with open(caminho_cache, 'r', encoding='utf-8') as f:
+            conteudo = json.load(f)
+    except (OSError, ValueError):
+        return cache
+    if conteudo.get('versao') == versao:
+        cache['entradas'] = conteudo.get('entradas', {})
+    else:
+        cache['alterado'] = True  # Versão antiga: o manifesto será regravado
+    return cache
+
+def consultar(cache, pasta, arquivo):
+    """Resultado em cache do segmento, ou None
+
+    Retorna (resultado, identificacao); identificacao é usada por registrar
+    para não recalcular assinatura e hash de um segmento que mudou.
+    """
+    chave, assinatura, funcao_hash = identificar_segmento(pasta, arquivo)
+    identificacao = {'chave': chave, 'assinatura': assinatura, 'funcao_hash': funcao_hash, 'hash': None}
+    if assinatura is None:
+        return None, identificacao
+    entrada = cache['entradas'].get(chave)
+    if entrada is None:
+        return None, identificacao
+    if entrada['assinatura'] == assinatura:
+        return entrada['resultado'], identificacao
+
+    identificacao['hash'] = funcao_hash()
+    if entrada['hash'] == identificacao['hash']:
+        # Conteúdo igual com outro mtime: só a assinatura é atualizada
+        entrada['assinatura'] = assinatura
+        cache['alterado'] = True
+        return entrada['resultado'], identificacao
+    return None, identificacao
+
+def registrar(cache, identificacao, resultado):
+    """Guarda o resultado (serializável em JSON) de um segmento recém-calculado"""
+    if identificacao['assinatura'] is None:
+        return
+    if identificacao['hash'] is None:
+        identificacao['hash'] = identificacao['funcao_hash']()
+    cache['entradas'][identificacao['chave']] = {
+        'assinatura': identificacao['assinatura'],
+        'hash': identificacao['hash'],
+        'resultado': resultado,
+    }
+    cache['alterado'] = True
+
+def salvar_cache(cache, caminho_cache):
+    """Grava o manifesto (arquivo temporário + rename, para não corromper em interrupções)"""
+    if not cache['alterado']:
+        return
+    os.makedirs(os.path.dirname(caminho_cache) or '.', exist_ok=True)
+    temporario = caminho_cache + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao': cache['versao'], 'entradas': cache['entradas']}, f)
+    os.replace(temporario, caminho_cache)
+    cache['alterado'] = False
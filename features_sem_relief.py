@@ -1,17 +1,34 @@
 import os
 import numpy as np
-import pandas as pd
-import csv
+from motor_features import (COLUNAS_FEATURES_COMPLETAS, COLUNAS_INTEIRAS, acrescentar_linhas, calcular_features_lote_irregular,
+                            calcular_features_segmento, finalizar_matriz_acumulada, nova_matriz_acumulada)
+from armazenamento_segmentos import arquivos_segmentos, label_da_condicao, ler_segmento
+from leitor_dados import ler_numeros_rapido
+from processamento_paralelo import dividir_em_lotes, mapear_em_ordem, resolver_n_workers
+from cache_extracao import carregar_cache, consultar, registrar, salvar_cache, versao_features
+from perfil_execucao import (ativar_perfil, contar_leitura, etapa, etapa_paralela, perfil_ativo,
+                             salvar_relatorio)
+from saida_features import (caminho_dataset, campo_csv, formatar_matriz_csv, formato_padrao,
+                            gravar_csvs_linha_unica, salvar_dataset, validar_formato)
+from pipeline_dados import PASTA_CONVERTIDOS, PASTA_FEATURES, SUFIXO_PARCIAL, resolver_pasta
 
-# Caminhos
-pasta_dados = os.path.join(os.getcwd(), 'dados_convertidos_csv')
-pasta_features = os.path.join(os.getcwd(), 'features_extraidas')
-pasta_segmentos = os.path.join(pasta_features, 'features_por_segmento')
-os.makedirs(pasta_features, exist_ok=True)
-os.makedirs(pasta_segmentos, exist_ok=True)
+# Caminhos: pasta_dados e pasta_features são parâmetros das funções; sem eles,
+# dados_convertidos_csv e features_extraidas no diretório atual. A importação
+# não cria pastas e o pandas só é importado nas funções que montam DataFrames.
+SUBPASTA_SEGMENTOS = 'features_por_segmento'
+
+# Manifesto do cache de extração, em pasta_features (segmentos inalterados não são recalculados)
+ARQUIVO_CACHE = 'cache_extracao_completas.json'
 
 def ler_dados_arquivo(caminho_arquivo):
-    """Lê dados de arquivos CSV"""
+    """Lê dados de arquivos CSV e retorna um np.ndarray"""
+    # Caminho rápido: formato detectado uma vez por pasta e conversão em C
+    dados_rapidos = ler_numeros_rapido(caminho_arquivo)
+    if dados_rapidos is not None:
+        return dados_rapidos
+    
+    import csv
+    
     dados = []
     
     # Tenta diferentes delimitadores e encodings
@@ -62,7 +79,7 @@ def ler_dados_arquivo(caminho_arquivo):
                                     continue
                     
                     if len(dados) > 0:
-                        return dados
+                        return np.array(dados, dtype=np.float64)
                     else:
                         dados = []  # Reseta para tentar próximo delimitador
                         
@@ -83,208 +100,56 @@ def ler_dados_arquivo(caminho_arquivo):
     except Exception as e:
         print(f"Erro ao ler arquivo como texto simples: {e}")
         
-    return dados
+    return np.array(dados, dtype=np.float64)
 
 def calcular_features_completas(dados):
     """Calcula todas as features vibratórias para um conjunto de dados"""
-    return {
-        'media': np.mean(dados),
-        'desvio_padrao': np.std(dados),
-        'maximo': np.max(dados),
-        'minimo': np.min(dados),
-        'rms': np.sqrt(np.mean(dados**2)),
-        'variancia': np.var(dados),
-        'skewness': float(pd.Series(dados).skew()),
-        'kurtosis': float(pd.Series(dados).kurtosis()),
-        'pico_a_pico': np.max(dados) - np.min(dados),
-        'crest_factor': np.max(np.abs(dados)) / np.sqrt(np.mean(dados**2)) if np.sqrt(np.mean(dados**2)) != 0 else 0,
-        'shape_factor': np.sqrt(np.mean(dados**2)) / np.mean(np.abs(dados)) if np.mean(np.abs(dados)) != 0 else 0,
-        'impulse_factor': np.max(np.abs(dados)) / np.mean(np.abs(dados)) if np.mean(np.abs(dados)) != 0 else 0,
-        'margin_factor': np.max(np.abs(dados)) / np.mean(np.sqrt(np.abs(dados)))**2 if np.mean(np.sqrt(np.abs(dados))) != 0 else 0,
-        'energia': np.sum(dados**2),
-        'zero_crossings': np.sum(np.diff(np.sign(dados)) != 0),
-        'mean_abs': np.mean(np.abs(dados)),
-        'peak_to_rms': np.max(np.abs(dados)) / np.sqrt(np.mean(dados**2)) if np.sqrt(np.mean(dados**2)) != 0 else 0,
-        'mediana': np.median(dados),
-        'amplitude': np.max(dados) - np.min(dados),
-        'coeficiente_variacao': np.std(dados) / np.mean(dados) if np.mean(dados) != 0 else 0,
-        'range': np.max(dados) - np.min(dados),
-        'percentil_25': np.percentile(dados, 25),
-        'percentil_75': np.percentile(dados, 75),
-        'iqr': np.percentile(dados, 75) - np.percentile(dados, 25),
-        'entropia': -np.sum(np.histogram(dados, bins=min(20, len(dados)//2))[0]/len(dados) * np.log2(np.histogram(dados, bins=min(20, len(dados)//2))[0]/len(dados) + 1e-10)),
-        'autocorrelacao_lag1': np.corrcoef(dados[:-1], dados[1:])[0,1] if len(dados) > 1 else 0,
-        'autocorrelacao_lag2': np.corrcoef(dados[:-2], dados[2:])[0,1] if len(dados) > 2 else 0,
-        'autocorrelacao_lag3': np.corrcoef(dados[:-3], dados[3:])[0,1] if len(dados) > 3 else 0,
-        'autocorrelacao_lag5': np.corrcoef(dados[:-5], dados[5:])[0,1] if len(dados) > 5 else 0,
-        'autocorrelacao_lag10': np.corrcoef(dados[:-10], dados[10:])[0,1] if len(dados) > 10 else 0,
-        'fft_media': np.mean(np.abs(np.fft.fft(dados))),
-        'fft_max': np.max(np.abs(np.fft.fft(dados))),
-        'fft_std': np.std(np.abs(np.fft.fft(dados))),
-        'fft_energia': np.sum(np.abs(np.fft.fft(dados))**2),
-        'fft_centroide': np.sum(np.arange(len(dados)) * np.abs(np.fft.fft(dados))) / np.sum(np.abs(np.fft.fft(dados))) if np.sum(np.abs(np.fft.fft(dados))) != 0 else 0,
-        'fft_bandwidth': np.sqrt(np.sum((np.arange(len(dados)) - np.sum(np.arange(len(dados)) * np.abs(np.fft.fft(dados))) / np.sum(np.abs(np.fft.fft(dados))))**2 * np.abs(np.fft.fft(dados))) / np.sum(np.abs(np.fft.fft(dados)))) if np.sum(np.abs(np.fft.fft(dados))) != 0 else 0,
-        'fft_rolloff': np.percentile(np.cumsum(np.abs(np.fft.fft(dados))), 85),
-        'fft_flux': np.sum(np.abs(np.diff(np.abs(np.fft.fft(dados))))) if len(dados) > 1 else 0,
-        'fft_mfcc_1': np.mean(np.abs(np.fft.fft(dados))[:len(dados)//4]),
-        'fft_mfcc_2': np.mean(np.abs(np.fft.fft(dados))[len(dados)//4:len(dados)//2]),
-        'fft_mfcc_3': np.mean(np.abs(np.fft.fft(dados))[len(dados)//2:3*len(dados)//4]),
-        'fft_mfcc_4': np.mean(np.abs(np.fft.fft(dados))[3*len(dados)//4:]),
-        'wavelet_haar_1': np.mean(np.abs(np.diff(dados))),
-        'wavelet_haar_2': np.std(np.abs(np.diff(dados))),
-        'wavelet_haar_3': np.max(np.abs(np.diff(dados))),
-        'wavelet_haar_4': np.min(np.abs(np.diff(dados))),
-        'wavelet_haar_5': np.median(np.abs(np.diff(dados))),
-        'estatisticas_ordem_1': np.mean(dados),
-        'estatisticas_ordem_2': np.mean(dados**2),
-        'estatisticas_ordem_3': np.mean(dados**3),
-        'estatisticas_ordem_4': np.mean(dados**4),
-        'momento_central_2': np.mean((dados - np.mean(dados))**2),
-        'momento_central_3': np.mean((dados - np.mean(dados))**3),
-        'momento_central_4': np.mean((dados - np.mean(dados))**4),
-        'momento_central_5': np.mean((dados - np.mean(dados))**5),
-        'momento_central_6': np.mean((dados - np.mean(dados))**6),
-        'momento_central_7': np.mean((dados - np.mean(dados))**7),
-        'momento_central_8': np.mean((dados - np.mean(dados))**8),
-        'momento_central_9': np.mean((dados - np.mean(dados))**9),
-        'momento_central_10': np.mean((dados - np.mean(dados))**10),
-        'momento_absoluto_1': np.mean(np.abs(dados)),
-        'momento_absoluto_2': np.mean(np.abs(dados)**2),
-        'momento_absoluto_3': np.mean(np.abs(dados)**3),
-        'momento_absoluto_4': np.mean(np.abs(dados)**4),
-        'momento_absoluto_5': np.mean(np.abs(dados)**5),
-        'momento_absoluto_6': np.mean(np.abs(dados)**6),
-        'momento_absoluto_7': np.mean(np.abs(dados)**7),
-        'momento_absoluto_8': np.mean(np.abs(dados)**8),
-        'momento_absoluto_9': np.mean(np.abs(dados)**9),
-        'momento_absoluto_10': np.mean(np.abs(dados)**10),
-        'momento_central_absoluto_1': np.mean(np.abs(dados - np.mean(dados))),
-        'momento_central_absoluto_2': np.mean(np.abs(dados - np.mean(dados))**2),
-        'momento_central_absoluto_3': np.mean(np.abs(dados - np.mean(dados))**3),
-        'momento_central_absoluto_4': np.mean(np.abs(dados - np.mean(dados))**4),
-        'momento_central_absoluto_5': np.mean(np.abs(dados - np.mean(dados))**5),
-        'momento_central_absoluto_6': np.mean(np.abs(dados - np.mean(dados))**6),
-        'momento_central_absoluto_7': np.mean(np.abs(dados - np.mean(dados))**7),
-        'momento_central_absoluto_8': np.mean(np.abs(dados - np.mean(dados))**8),
-        'momento_central_absoluto_9': np.mean(np.abs(dados - np.mean(dados))**9),
-        'momento_central_absoluto_10': np.mean(np.abs(dados - np.mean(dados))**10),
-        'momento_central_absoluto_11': np.mean(np.abs(dados - np.mean(dados))**11),
-        'momento_central_absoluto_12': np.mean(np.abs(dados - np.mean(dados))**12),
-        'momento_central_absoluto_13': np.mean(np.abs(dados - np.mean(dados))**13),
-        'momento_central_absoluto_14': np.mean(np.abs(dados - np.mean(dados))**14),
-        'momento_central_absoluto_15': np.mean(np.abs(dados - np.mean(dados))**15),
-        'momento_central_absoluto_16': np.mean(np.abs(dados - np.mean(dados))**16),
-        'momento_central_absoluto_17': np.mean(np.abs(dados - np.mean(dados))**17),
-        'momento_central_absoluto_18': np.mean(np.abs(dados - np.mean(dados))**18),
-        'momento_central_absoluto_19': np.mean(np.abs(dados - np.mean(dados))**19),
-        'momento_central_absoluto_20': np.mean(np.abs(dados - np.mean(dados))**20),
-        'momento_central_absoluto_21': np.mean(np.abs(dados - np.mean(dados))**21),
-        'momento_central_absoluto_22': np.mean(np.abs(dados - np.mean(dados))**22),
-        'momento_central_absoluto_23': np.mean(np.abs(dados - np.mean(dados))**23),
-        'momento_central_absoluto_24': np.mean(np.abs(dados - np.mean(dados))**24),
-        'momento_central_absoluto_25': np.mean(np.abs(dados - np.mean(dados))**25),
-        'momento_central_absoluto_26': np.mean(np.abs(dados - np.mean(dados))**26),
-        'momento_central_absoluto_27': np.mean(np.abs(dados - np.mean(dados))**27),
-        'momento_central_absoluto_28': np.mean(np.abs(dados - np.mean(dados))**28),
-        'momento_central_absoluto_29': np.mean(np.abs(dados - np.mean(dados))**29),
-        'momento_central_absoluto_30': np.mean(np.abs(dados - np.mean(dados))**30),
-        'momento_central_absoluto_31': np.mean(np.abs(dados - np.mean(dados))**31),
-        'momento_central_absoluto_32': np.mean(np.abs(dados - np.mean(dados))**32),
-        'momento_central_absoluto_33': np.mean(np.abs(dados - np.mean(dados))**33),
-        'momento_central_absoluto_34': np.mean(np.abs(dados - np.mean(dados))**34),
-        'momento_central_absoluto_35': np.mean(np.abs(dados - np.mean(dados))**35),
-        'momento_central_absoluto_36': np.mean(np.abs(dados - np.mean(dados))**36),
-        'momento_central_absoluto_37': np.mean(np.abs(dados - np.mean(dados))**37),
-        'momento_central_absoluto_38': np.mean(np.abs(dados - np.mean(dados))**38),
-        'momento_central_absoluto_39': np.mean(np.abs(dados - np.mean(dados))**39),
-        'momento_central_absoluto_40': np.mean(np.abs(dados - np.mean(dados))**40),
-        'momento_central_absoluto_41': np.mean(np.abs(dados - np.mean(dados))**41),
-        'momento_central_absoluto_42': np.mean(np.abs(dados - np.mean(dados))**42),
-        'momento_central_absoluto_43': np.mean(np.abs(dados - np.mean(dados))**43),
-        'momento_central_absoluto_44': np.mean(np.abs(dados - np.mean(dados))**44),
-        'momento_central_absoluto_45': np.mean(np.abs(dados - np.mean(dados))**45),
-        'momento_central_absoluto_46': np.mean(np.abs(dados - np.mean(dados))**46),
-        'momento_central_absoluto_47': np.mean(np.abs(dados - np.mean(dados))**47),
-        'momento_central_absoluto_48': np.mean(np.abs(dados - np.mean(dados))**48),
-        'momento_central_absoluto_49': np.mean(np.abs(dados - np.mean(dados))**49),
-        'momento_central_absoluto_50': np.mean(np.abs(dados - np.mean(dados))**50),
-        'momento_central_absoluto_51': np.mean(np.abs(dados - np.mean(dados))**51),
-        'momento_central_absoluto_52': np.mean(np.abs(dados - np.mean(dados))**52),
-        'momento_central_absoluto_53': np.mean(np.abs(dados - np.mean(dados))**53),
-        'momento_central_absoluto_54': np.mean(np.abs(dados - np.mean(dados))**54),
-        'momento_central_absoluto_55': np.mean(np.abs(dados - np.mean(dados))**55),
-        'momento_central_absoluto_56': np.mean(np.abs(dados - np.mean(dados))**56),
-        'momento_central_absoluto_57': np.mean(np.abs(dados - np.mean(dados))**57),
-        'momento_central_absoluto_58': np.mean(np.abs(dados - np.mean(dados))**58),
-        'momento_central_absoluto_59': np.mean(np.abs(dados - np.mean(dados))**59),
-        'momento_central_absoluto_60': np.mean(np.abs(dados - np.mean(dados))**60),
-        'momento_central_absoluto_61': np.mean(np.abs(dados - np.mean(dados))**61),
-        'momento_central_absoluto_62': np.mean(np.abs(dados - np.mean(dados))**62),
-        'momento_central_absoluto_63': np.mean(np.abs(dados - np.mean(dados))**63),
-        'momento_central_absoluto_64': np.mean(np.abs(dados - np.mean(dados))**64),
-        'momento_central_absoluto_65': np.mean(np.abs(dados - np.mean(dados))**65),
-        'momento_central_absoluto_66': np.mean(np.abs(dados - np.mean(dados))**66),
-        'momento_central_absoluto_67': np.mean(np.abs(dados - np.mean(dados))**67),
-        'momento_central_absoluto_68': np.mean(np.abs(dados - np.mean(dados))**68),
-        'momento_central_absoluto_69': np.mean(np.abs(dados - np.mean(dados))**69),
-        'momento_central_absoluto_70': np.mean(np.abs(dados - np.mean(dados))**70),
-        'momento_central_absoluto_71': np.mean(np.abs(dados - np.mean(dados))**71),
-        'momento_central_absoluto_72': np.mean(np.abs(dados - np.mean(dados))**72),
-        'momento_central_absoluto_73': np.mean(np.abs(dados - np.mean(dados))**73),
-        'momento_central_absoluto_74': np.mean(np.abs(dados - np.mean(dados))**74),
-        'momento_central_absoluto_75': np.mean(np.abs(dados - np.mean(dados))**75),
-        'momento_central_absoluto_76': np.mean(np.abs(dados - np.mean(dados))**76),
-        'momento_central_absoluto_77': np.mean(np.abs(dados - np.mean(dados))**77),
-        'momento_central_absoluto_78': np.mean(np.abs(dados - np.mean(dados))**78),
-        'momento_central_absoluto_79': np.mean(np.abs(dados - np.mean(dados))**79),
-        'momento_central_absoluto_80': np.mean(np.abs(dados - np.mean(dados))**80),
-        'momento_central_absoluto_81': np.mean(np.abs(dados - np.mean(dados))**81),
-        'momento_central_absoluto_82': np.mean(np.abs(dados - np.mean(dados))**82),
-        'momento_central_absoluto_83': np.mean(np.abs(dados - np.mean(dados))**83),
-        'momento_central_absoluto_84': np.mean(np.abs(dados - np.mean(dados))**84),
-        'momento_central_absoluto_85': np.mean(np.abs(dados - np.mean(dados))**85),
-        'momento_central_absoluto_86': np.mean(np.abs(dados - np.mean(dados))**86),
-        'momento_central_absoluto_87': np.mean(np.abs(dados - np.mean(dados))**87),
-        'momento_central_absoluto_88': np.mean(np.abs(dados - np.mean(dados))**88),
-        'momento_central_absoluto_89': np.mean(np.abs(dados - np.mean(dados))**89),
-        'momento_central_absoluto_90': np.mean(np.abs(dados - np.mean(dados))**90),
-        'momento_central_absoluto_91': np.mean(np.abs(dados - np.mean(dados))**91),
-        'momento_central_absoluto_92': np.mean(np.abs(dados - np.mean(dados))**92),
-        'momento_central_absoluto_93': np.mean(np.abs(dados - np.mean(dados))**93),
-        'momento_central_absoluto_94': np.mean(np.abs(dados - np.mean(dados))**94),
-        'momento_central_absoluto_95': np.mean(np.abs(dados - np.mean(dados))**95),
-        'momento_central_absoluto_96': np.mean(np.abs(dados - np.mean(dados))**96),
-        'momento_central_absoluto_97': np.mean(np.abs(dados - np.mean(dados))**97),
-        'momento_central_absoluto_98': np.mean(np.abs(dados - np.mean(dados))**98),
-        'momento_central_absoluto_99': np.mean(np.abs(dados - np.mean(dados))**99),
-        'momento_central_absoluto_100': np.mean(np.abs(dados - np.mean(dados))**100)
-    }
+    return calcular_features_segmento(dados)
+
+def montar_dataframe_features(linhas_features):
+    """Cria o DataFrame de features a partir das linhas calculadas em lote"""
+    import pandas as pd
+    df_features = pd.DataFrame(linhas_features, columns=COLUNAS_FEATURES_COMPLETAS)
+    for coluna in COLUNAS_INTEIRAS:
+        df_features[coluna] = df_features[coluna].astype(np.int64)
+    return df_features
 
 # ============================================================================
 # FUNÇÃO 1: EXTRAÇÃO CONSOLIDADA (features_sem_relief.py original)
 # ============================================================================
 
-def extrair_features_todos_segmentos():
-    """Extrai todas as features de todos os segmentos CSV nas subpastas"""
+# Segmentos lidos antes de cada cálculo em lote na extração consolidada
+SEGMENTOS_POR_LOTE = 1024
+
+def extrair_features_todos_segmentos(dtype=np.float64, pasta_dados=None):
+    """Extrai todas as features de todos os segmentos CSV nas subpastas de pasta_dados
+
+    As features vão para uma matriz pré-alocada em `dtype` (float64 ou
+    float32), calculada a cada SEGMENTOS_POR_LOTE segmentos lidos. Retorna
+    (matriz de features, nomes dos segmentos, condições, labels em int8).
+    """
     print("=== EXTRAÇÃO DE FEATURES COMPLETAS ===")
     print("Processando todos os segmentos CSV...")
     
-    todas_features = []
+    acumulador = nova_matriz_acumulada(len(COLUNAS_FEATURES_COMPLETAS), dtype)
+    segmentos = []
+    labels_lote = []
     nomes_segmentos = []
     condicoes = []
-    labels = []
     
     arquivos_processados = 0
     arquivos_erro = 0
     
     # Percorre todas as subpastas
-    for root, dirs, files in os.walk(pasta_dados):
-        for file in files:
+    for root, dirs, files in os.walk(resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)):
+        # Segmentações em andamento ou interrompidas ficam de fora
+        dirs[:] = [d for d in dirs if not d.endswith(SUFIXO_PARCIAL)]
+        for file in arquivos_segmentos(root, files):
             if file.lower().endswith('.csv'):
                 caminho_arquivo = os.path.join(root, file)
                 try:
-                    # Lê os dados do arquivo
-                    dados = ler_dados_arquivo(caminho_arquivo)
+                    # Lê os dados do arquivo (ou do armazenamento binário da pasta)
+                    dados = ler_segmento(root, file, ler_dados_arquivo)
                     
                     if len(dados) == 0:
                         print(f"Arquivo {file} não contém dados válidos, pulando...")
@@ -296,12 +161,8 @@ def extrair_features_todos_segmentos():
                     
                     print(f"Processando {file} com {len(dados)} pontos de dados...")
                     
-                    dados = np.array(dados)
-                    
-                    # Calcula todas as features
-                    features = calcular_features_completas(dados)
-                    
-                    todas_features.append(list(features.values()))
+                    # As features são calculadas em lote depois da leitura
+                    segmentos.append(dados)
                     nomes_segmentos.append(file.replace('.csv', ''))
                     
                     # Obtém a condição (nome da pasta)
@@ -311,11 +172,17 @@ def extrair_features_todos_segmentos():
                     # Define label baseado no nome da pasta
                     nome_pasta = condicao.lower()
                     if 'h' in nome_pasta or 'normal' in nome_pasta:
-                        labels.append(0)  # Estado normal
+                        labels_lote.append(0)  # Estado normal
                     elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
-                        labels.append(1)  # Estado com falha
+                        labels_lote.append(1)  # Estado com falha
                     else:
-                        labels.append(0)  # Padrão como normal
+                        labels_lote.append(0)  # Padrão como normal
+                    
+                    # Calcula o lote, agrupando segmentos de mesmo tamanho, e libera os dados lidos
+                    if len(segmentos) >= SEGMENTOS_POR_LOTE:
+                        acrescentar_linhas(acumulador, calcular_features_lote_irregular(segmentos), labels_lote)
+                        segmentos = []
+                        labels_lote = []
                     
                     arquivos_processados += 1
                     if arquivos_processados % 100 == 0:
@@ -326,28 +193,31 @@ def extrair_features_todos_segmentos():
                     arquivos_erro += 1
                     continue
     
+    if segmentos:
+        acrescentar_linhas(acumulador, calcular_features_lote_irregular(segmentos), labels_lote)
+    todas_features, labels = finalizar_matriz_acumulada(acumulador)
+    
     print(f"Extraídas features de {len(todas_features)} segmentos")
     print(f"Arquivos processados com sucesso: {arquivos_processados}")
     print(f"Arquivos com erro: {arquivos_erro}")
     
     return todas_features, nomes_segmentos, condicoes, labels
 
-def salvar_features_completas():
-    """Salva todas as features extraídas"""
+def salvar_features_completas(dtype=np.float64, pasta_dados=None, pasta_features=None):
+    """Salva em pasta_features todas as features extraídas (matriz acumulada em `dtype`)"""
     print("\n=== SALVANDO FEATURES COMPLETAS ===")
     
-    todas_features, nomes_segmentos, condicoes, labels = extrair_features_todos_segmentos()
+    todas_features, nomes_segmentos, condicoes, labels = extrair_features_todos_segmentos(dtype, pasta_dados)
     
-    if not todas_features:
+    if len(todas_features) == 0:
         print("Nenhum segmento válido encontrado para extração de features.")
         return
     
     # Obtém os nomes das features
-    features_exemplo = calcular_features_completas(np.array([1, 2, 3, 4, 5]))
-    colunas_features = list(features_exemplo.keys())
+    colunas_features = list(COLUNAS_FEATURES_COMPLETAS)
     
     # Cria DataFrame com todas as features
-    df_features = pd.DataFrame(todas_features, columns=colunas_features)
+    df_features = montar_dataframe_features(todas_features)
     df_features['segmento'] = nomes_segmentos
     df_features['condicao'] = condicoes
     df_features['label'] = labels
@@ -355,6 +225,8 @@ def salvar_features_completas():
     print(f"Dataset criado com {len(df_features)} amostras e {len(colunas_features)} features")
     
     # Salva todas as features
+    pasta_features = resolver_pasta(pasta_features, PASTA_FEATURES)
+    os.makedirs(pasta_features, exist_ok=True)
     caminho_features = os.path.join(pasta_features, 'features_completas.csv')
     df_features.to_csv(caminho_features, index=False)
     
@@ -409,31 +281,49 @@ def salvar_features_completas():
 # FUNÇÃO 2: EXTRAÇÃO POR SEGMENTO INDIVIDUAL (extrair_features_por_segmento.py)
 # ============================================================================
 
-def extrair_features_por_segmento(pasta_condicao):
-    """Extrai features de cada segmento individualmente"""
-    nome_condicao = os.path.basename(pasta_condicao)
-    print(f"\n--- Processando: {nome_condicao} ---")
-    
-    # Cria pasta para a condição
-    pasta_condicao_features = os.path.join(pasta_segmentos, nome_condicao)
-    os.makedirs(pasta_condicao_features, exist_ok=True)
+# Colunas dos CSVs por segmento e posição das features inteiras
+CABECALHO_SEGMENTO = list(COLUNAS_FEATURES_COMPLETAS) + ['segmento', 'condicao', 'label']
+INDICES_INTEIROS = [COLUNAS_FEATURES_COMPLETAS.index(coluna) for coluna in COLUNAS_INTEIRAS]
+
+def _salvar_features_segmentos(pasta_condicao_features, nomes_segmentos, linhas_features, nome_condicao, label):
+    """Salva os CSVs de features de vários segmentos individuais de uma condição
+
+    A matriz inteira é formatada de uma vez e os arquivos são gravados por
+    threads; o conteúdo é o mesmo de um DataFrame de uma linha com to_csv.
+    Retorna os nomes dos segmentos que não puderam ser gravados.
+    """
+    if not nomes_segmentos:
+        return []
+    sufixo = f',{campo_csv(nome_condicao)},{label}'
+    linhas = [texto + ',' + campo_csv(nome_segmento) + sufixo
+              for texto, nome_segmento in zip(formatar_matriz_csv(linhas_features, INDICES_INTEIROS), nomes_segmentos)]
+    caminhos = [os.path.join(pasta_condicao_features, f'features_{nome_segmento}.csv') for nome_segmento in nomes_segmentos]
+    falhas = dict(gravar_csvs_linha_unica(caminhos, CABECALHO_SEGMENTO, linhas))
+    for caminho, erro in falhas.items():
+        print(f"  Erro ao processar {os.path.basename(caminho)}: {erro}")
+    return [nome for nome, caminho in zip(nomes_segmentos, caminhos) if caminho in falhas]
+
+def _extrair_lote_segmentos(tarefa):
+    """Lê, calcula e salva as features de um lote de arquivos de uma condição
+
+    Roda no processo principal ou num worker de processamento_paralelo.
+    Retorna (arquivos_processados, arquivos_erro, calculados) do lote, onde
+    calculados são os pares (arquivo, features), para o cache e a saída
+    colunar. Sem salvar_csv, os CSVs por segmento não são gravados.
+    """
+    pasta_condicao, arquivos, pasta_condicao_features, nome_condicao, label, salvar_csv = tarefa
     
     arquivos_processados = 0
     arquivos_erro = 0
+    segmentos = []
+    arquivos_validos = []
+    calculados = []
     
-    # Lista todos os arquivos CSV na pasta
-    arquivos_csv = [f for f in os.listdir(pasta_condicao) if f.lower().endswith('.csv')]
-    arquivos_csv.sort()  # Ordena os arquivos
-    
-    print(f"Encontrados {len(arquivos_csv)} arquivos CSV")
-    
-    for arquivo in arquivos_csv:
-        caminho_arquivo = os.path.join(pasta_condicao, arquivo)
-        nome_segmento = arquivo.replace('.csv', '')
-        
+    for arquivo in arquivos:
         try:
-            # Lê os dados do arquivo
-            dados = ler_dados_arquivo(caminho_arquivo)
+            # Lê os dados do arquivo (ou do armazenamento binário da pasta)
+            with etapa('leitura'):
+                dados = ler_segmento(pasta_condicao, arquivo, ler_dados_arquivo)
             
             if len(dados) == 0:
                 print(f"  Arquivo {arquivo} não contém dados válidos, pulando...")
@@ -443,60 +333,192 @@ def extrair_features_por_segmento(pasta_condicao):
                 print(f"  Arquivo {arquivo} tem apenas {len(dados)} pontos, pulando...")
                 continue
             
-            dados = np.array(dados)
-            
-            # Calcula todas as features
-            features = calcular_features_completas(dados)
-            
-            # Cria DataFrame com as features
-            df_features = pd.DataFrame([features])
-            df_features['segmento'] = nome_segmento
-            df_features['condicao'] = nome_condicao
-            
-            # Define label baseado no nome da pasta
-            nome_pasta = nome_condicao.lower()
-            if 'h' in nome_pasta or 'normal' in nome_pasta:
-                df_features['label'] = 0  # Estado normal
-            elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
-                df_features['label'] = 1  # Estado com falha
-            else:
-                df_features['label'] = 0  # Padrão como normal
-            
-            # Salva features do segmento individual
-            caminho_segmento = os.path.join(pasta_condicao_features, f'features_{nome_segmento}.csv')
-            df_features.to_csv(caminho_segmento, index=False)
-            
-            arquivos_processados += 1
-            
-            # Mostra progresso a cada 20 arquivos
-            if arquivos_processados % 20 == 0:
-                print(f"  Processados {arquivos_processados}/{len(arquivos_csv)} arquivos...")
+            segmentos.append(dados)
+            arquivos_validos.append(arquivo)
             
         except Exception as e:
             print(f"  Erro ao processar {arquivo}: {e}")
             arquivos_erro += 1
             continue
     
+    # Calcula as features de todos os segmentos do lote de uma vez
+    with etapa('features'):
+        matriz_features = calcular_features_lote_irregular(segmentos)
+    
+    # Salva as features dos segmentos individuais
+    nomes_segmentos = [arquivo.replace('.csv', '') for arquivo in arquivos_validos]
+    falhas = set()
+    if salvar_csv:
+        with etapa('escrita'):
+            falhas = set(_salvar_features_segmentos(pasta_condicao_features, nomes_segmentos, matriz_features,
+                                                    nome_condicao, label))
+    
+    for arquivo, nome_segmento, linha_features in zip(arquivos_validos, nomes_segmentos, matriz_features):
+        if nome_segmento in falhas:
+            arquivos_erro += 1
+            continue
+        calculados.append((arquivo, linha_features.tolist()))
+        arquivos_processados += 1
+    
+    return arquivos_processados, arquivos_erro, calculados
+
+def extrair_features_por_segmento(pasta_condicao, n_workers=1, cache=None, formato='csv', pasta_features=None):
+    """Extrai features de cada segmento individualmente
+
+    Os arquivos são divididos em lotes; com n_workers > 1 os lotes são
+    processados em paralelo (None ou 0 usa todos os núcleos). Os arquivos
+    gerados são os mesmos da execução serial. Com um cache (cache_extracao),
+    segmentos inalterados não são lidos nem recalculados: o CSV existente é
+    mantido, ou regravado a partir das features guardadas.
+
+    Com formato 'csv' cada segmento ganha seu CSV, em
+    pasta_features/features_por_segmento/<condição>; nos formatos colunares
+    nada é gravado aqui. Retorna (arquivos_processados, arquivos_erro, linhas), onde
+    linhas são os pares (segmento, features) na ordem dos arquivos.
+    """
+    nome_condicao = os.path.basename(pasta_condicao)
+    print(f"\n--- Processando: {nome_condicao} ---")
+    
+    # Cria pasta para a condição
+    salvar_csv = formato == 'csv'
+    pasta_condicao_features = os.path.join(resolver_pasta(pasta_features, PASTA_FEATURES), SUBPASTA_SEGMENTOS,
+                                           nome_condicao)
+    if salvar_csv:
+        os.makedirs(pasta_condicao_features, exist_ok=True)
+    
+    arquivos_processados = 0
+    arquivos_erro = 0
+    
+    # Lista todos os arquivos CSV na pasta
+    with etapa('descoberta'):
+        arquivos_csv = [f for f in arquivos_segmentos(pasta_condicao, os.listdir(pasta_condicao)) if f.lower().endswith('.csv')]
+        arquivos_csv.sort()  # Ordena os arquivos
+    
+    print(f"Encontrados {len(arquivos_csv)} arquivos CSV")
+    
+    # Define label baseado no nome da pasta
+    nome_pasta = nome_condicao.lower()
+    if 'h' in nome_pasta or 'normal' in nome_pasta:
+        label = 0  # Estado normal
+    elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
+        label = 1  # Estado com falha
+    else:
+        label = 0  # Padrão como normal
+    
+    # Segmentos inalterados desde a última execução vêm do cache
+    pendentes = arquivos_csv
+    identificacoes = {}
+    features_por_arquivo = {}
+    if cache is not None:
+        pendentes = []
+        ausentes = []
+        with etapa('descoberta'):
+            for arquivo in arquivos_csv:
+                linha_features, identificacoes[arquivo] = consultar(cache, pasta_condicao, arquivo)
+                if linha_features is None:
+                    pendentes.append(arquivo)
+                    continue
+                features_por_arquivo[arquivo] = linha_features
+                nome_segmento = arquivo.replace('.csv', '')
+                caminho_segmento = os.path.join(pasta_condicao_features, f'features_{nome_segmento}.csv')
+                if salvar_csv and not os.path.exists(caminho_segmento):
+                    ausentes.append((nome_segmento, linha_features))
+                arquivos_processados += 1
+        if ausentes:
+            # CSVs apagados de segmentos inalterados: regravados a partir do cache
+            nomes_ausentes = [nome_segmento for nome_segmento, _ in ausentes]
+            with etapa('escrita'):
+                _salvar_features_segmentos(pasta_condicao_features, nomes_ausentes,
+                                           [linha_features for _, linha_features in ausentes], nome_condicao, label)
+        if arquivos_processados:
+            print(f"  {arquivos_processados} segmentos inalterados (cache), {len(pendentes)} a processar")
+    
+    tarefas = [
+        (pasta_condicao, lote, pasta_condicao_features, nome_condicao, label, salvar_csv)
+        for lote in dividir_em_lotes(pendentes, n_workers)
+    ]
+    with etapa_paralela(n_workers):
+        for tarefa, (processados, erros, calculados) in mapear_em_ordem(_extrair_lote_segmentos, tarefas, n_workers, 1):
+            arquivos_processados += processados
+            arquivos_erro += erros
+            features_por_arquivo.update(calculados)
+            if cache is not None:
+                for arquivo, linha_features in calculados:
+                    registrar(cache, identificacoes[arquivo], linha_features)
+            for arquivo in tarefa[1]:
+                contar_leitura(pasta_condicao, arquivo)
+            
+            # Mostra progresso a cada lote concluído
+            print(f"  Processados {arquivos_processados}/{len(arquivos_csv)} arquivos...")
+    
     print(f"  ✓ Concluído: {arquivos_processados} arquivos processados, {arquivos_erro} erros")
-    return arquivos_processados, arquivos_erro
+    linhas = [(arquivo.replace('.csv', ''), features_por_arquivo[arquivo])
+              for arquivo in arquivos_csv if arquivo in features_por_arquivo]
+    return arquivos_processados, arquivos_erro, linhas
+
+def salvar_dataset_segmentos(linhas_por_condicao, formato, float32=False, pasta_features=None):
+    """Grava as features de todos os segmentos num dataset colunar particionado por condição
+
+    `linhas_por_condicao` são triplas (condicao, label, linhas), com linhas
+    como retornadas por extrair_features_por_segmento. Retorna o caminho do dataset.
+    """
+    segmentos = []
+    condicoes = []
+    labels = []
+    todas_linhas = []
+    for nome_condicao, label, linhas in linhas_por_condicao:
+        for nome_segmento, linha_features in linhas:
+            segmentos.append(nome_segmento)
+            condicoes.append(nome_condicao)
+            labels.append(label)
+            todas_linhas.append(linha_features)
+    
+    df_features = montar_dataframe_features(todas_linhas)
+    df_features['segmento'] = segmentos
+    df_features['condicao'] = condicoes
+    df_features['label'] = labels
+    
+    caminho = caminho_dataset(resolver_pasta(pasta_features, PASTA_FEATURES), SUBPASTA_SEGMENTOS, formato)
+    salvar_dataset(df_features, caminho, formato, float32)
+    return caminho
 
 # ============================================================================
 # FUNÇÃO 3: PROCESSAMENTO DE TODAS AS SUBPASTAS (extrair_features_todas_subpastas.py)
 # ============================================================================
 
-def processar_todas_subpastas():
-    """Processa todas as subpastas de dados_convertidos_csv"""
+def processar_todas_subpastas(n_workers=1, usar_cache=True, formato=None, float32=False,
+                              pasta_dados=None, pasta_features=None):
+    """Processa todas as subpastas de pasta_dados (padrão: dados_convertidos_csv)
+
+    n_workers > 1 distribui os arquivos de cada subpasta entre processos.
+    Com usar_cache, só segmentos novos ou alterados são recalculados.
+    formato 'parquet' ou 'feather' grava um único dataset particionado por
+    condição (float32 opcional); 'csv' grava um arquivo por segmento. O
+    padrão é parquet quando o pyarrow está instalado. Os resultados e o
+    cache ficam em pasta_features (padrão: features_extraidas).
+    """
+    formato = formato or formato_padrao()
+    validar_formato(formato)
+    pasta_dados = resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)
+    pasta_features = resolver_pasta(pasta_features, PASTA_FEATURES)
+    pasta_segmentos = os.path.join(pasta_features, SUBPASTA_SEGMENTOS)
+    caminho_cache = os.path.join(pasta_features, ARQUIVO_CACHE)
+    
     print("=== EXTRAÇÃO DE FEATURES POR SEGMENTO - TODAS AS SUBPASTAS ===")
     print(f"Pasta de dados: {pasta_dados}")
     print(f"Pasta de resultados: {pasta_features}")
+    print(f"Workers: {resolver_n_workers(n_workers)}")
+    print(f"Formato de saída: {formato}{' (float32)' if float32 and formato != 'csv' else ''}")
     
     if not os.path.exists(pasta_dados):
         print(f"ERRO: Pasta de dados não encontrada: {pasta_dados}")
         return
     
     # Lista todas as subpastas
-    subpastas = [d for d in os.listdir(pasta_dados) if os.path.isdir(os.path.join(pasta_dados, d))]
-    subpastas.sort()
+    with etapa('descoberta'):
+        subpastas = [d for d in os.listdir(pasta_dados)
+                     if os.path.isdir(os.path.join(pasta_dados, d)) and not d.endswith(SUFIXO_PARCIAL)]
+        subpastas.sort()
     
     print(f"\nEncontradas {len(subpastas)} subpastas:")
     for i, subpasta in enumerate(subpastas, 1):
@@ -504,13 +526,21 @@ def processar_todas_subpastas():
     
     total_arquivos_processados = 0
     total_arquivos_erro = 0
+    linhas_por_condicao = []
+    cache = carregar_cache(caminho_cache, versao_features(COLUNAS_FEATURES_COMPLETAS)) if usar_cache else None
     
     # Processa cada subpasta
     for i, subpasta in enumerate(subpastas, 1):
         pasta_condicao = os.path.join(pasta_dados, subpasta)
         print(f"\n[{i}/{len(subpastas)}] Processando subpasta: {subpasta}")
         
-        arquivos_processados, arquivos_erro = extrair_features_por_segmento(pasta_condicao)
+        arquivos_processados, arquivos_erro, linhas = extrair_features_por_segmento(
+            pasta_condicao, n_workers, cache, formato, pasta_features)
+        if cache is not None:
+            with etapa('escrita'):
+                salvar_cache(cache, caminho_cache)  # Uma interrupção não perde as subpastas concluídas
+        if formato != 'csv':
+            linhas_por_condicao.append((subpasta, label_da_condicao(subpasta), linhas))
         total_arquivos_processados += arquivos_processados
         total_arquivos_erro += arquivos_erro
     
@@ -518,6 +548,17 @@ def processar_todas_subpastas():
     print(f"Total de subpastas processadas: {len(subpastas)}")
     print(f"Total de segmentos processados: {total_arquivos_processados}")
     print(f"Total de segmentos com erro: {total_arquivos_erro}")
+    
+    if formato != 'csv':
+        # Um único dataset colunar, gravado de uma vez
+        with etapa('escrita'):
+            caminho = salvar_dataset_segmentos(linhas_por_condicao, formato, float32, pasta_features)
+        print(f"Features salvas em: {caminho}")
+        print("\nPartições do dataset:")
+        for subpasta, _, linhas in linhas_por_condicao:
+            print(f"  condicao={subpasta}/ - {len(linhas)} segmentos")
+        return
+    
     print(f"Features salvas em: {pasta_segmentos}")
     
     # Mostra estrutura das pastas criadas
@@ -532,8 +573,10 @@ def processar_todas_subpastas():
 # MENU PRINCIPAL
 # ============================================================================
 
-def main():
+def main(n_workers=1, usar_cache=True, formato=None, float32=False, pasta_dados=None, pasta_features=None):
     """Função principal - executa automaticamente a extração por segmento individual"""
+    pasta_dados = resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)
+    pasta_features = resolver_pasta(pasta_features, PASTA_FEATURES)
     print("=== SISTEMA DE EXTRAÇÃO DE FEATURES SEM RELIEF ===")
     print(f"Pasta de dados: {pasta_dados}")
     print(f"Pasta de resultados: {pasta_features}")
@@ -549,9 +592,35 @@ def main():
     print("="*60)
     
     # Executa automaticamente a extração por segmento individual para todas as subpastas
-    processar_todas_subpastas()
+    processar_todas_subpastas(n_workers, usar_cache, formato, float32, pasta_dados, pasta_features)
     
     print("\n=== PROCESSO CONCLUÍDO AUTOMATICAMENTE ===")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Extração de features sem ReliefF")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos paralelos na extração (0 = todos os núcleos)")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="Recalcula todos os segmentos, ignorando o cache de extração")
+    parser.add_argument('--formato', choices=['csv', 'parquet', 'feather'], default=None,
+                        help="Saída: dataset parquet/feather particionado por condição ou um CSV por segmento "
+                             "(padrão: parquet com pyarrow instalado, senão csv)")
+    parser.add_argument('--float32', action='store_true',
+                        help="Grava as features em float32 nos formatos parquet/feather")
+    parser.add_argument('--dados', default=None, help="Pasta dos segmentos (padrão: dados_convertidos_csv)")
+    parser.add_argument('--features', default=None, help="Pasta dos resultados (padrão: features_extraidas)")
+    parser.add_argument('--perfil', action='store_true',
+                        help="Mede tempo por etapa, vazão e pico de memória (perfil_features_sem_relief.json)")
+    parser.add_argument('--perfil-grupos', action='store_true',
+                        help="Como --perfil, medindo também o tempo de cada grupo de features")
+    args = parser.parse_args()
+    if args.perfil or args.perfil_grupos:
+        ativar_perfil(args.perfil_grupos)
+    pasta_features = resolver_pasta(args.features, PASTA_FEATURES)
+    main(args.workers, not args.sem_cache, args.formato, args.float32, args.dados, pasta_features)
+    if perfil_ativo():
+        caminho_perfil = os.path.join(pasta_features, 'perfil_features_sem_relief.json')
+        salvar_relatorio(caminho_perfil, script='features_sem_relief', workers=args.workers,
+                         cache=not args.sem_cache, formato=args.formato or formato_padrao())
+        print(f"Relatório de perfil: {caminho_perfil}")
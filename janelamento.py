@@ -0,0 +1,157 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ============================================================================
+# JANELAS DESLIZANTES SEM CÓPIA (tamanho de janela, passo e trecho final)
+# ============================================================================
+
+# O que fazer com o trecho final, menor que uma janela:
+#   'descartar' - ignora o trecho
+#   'manter'    - mantém o trecho como um segmento mais curto (se >= tamanho_minimo)
+#   'preencher' - completa o trecho com zeros até o tamanho da janela
+POLITICAS_FINAL = ('descartar', 'manter', 'preencher')
+
+def _validar_parametros(tamanho_janela, passo, politica_final='descartar'):
+    if tamanho_janela <= 0 or passo <= 0:
+        raise ValueError("O tamanho da janela e o passo devem ser positivos")
+    if politica_final not in POLITICAS_FINAL:
+        raise ValueError(f"Política do trecho final desconhecida: {politica_final} (use {', '.join(POLITICAS_FINAL)})")
+
+def numero_janelas(n_amostras, tamanho_janela, passo):
+    """Quantidade de janelas completas que cabem em n_amostras"""
+    if n_amostras < tamanho_janela:
+        return 0
+    return (n_amostras - tamanho_janela) // passo + 1
+
+def janelas_deslizantes(sinal, tamanho_janela, passo):
+    """Matriz (n_janelas, tamanho_janela) com as janelas completas do sinal
+
+    A matriz é uma view (sliding_window_view com passo) sobre o próprio sinal:
+    janelas sobrepostas não multiplicam o uso de memória.
+    """
+    _validar_parametros(tamanho_janela, passo)
+    sinal = np.asarray(sinal)
+    if len(sinal) < tamanho_janela:
+        return np.empty((0, tamanho_janela), dtype=sinal.dtype)
+    return sliding_window_view(sinal, tamanho_janela)[::passo]
+
+def trecho_final(sinal, tamanho_janela, passo, politica_final='descartar', tamanho_minimo=None):
+    """Trecho que começa após a última janela completa, tratado conforme a política
+
+    Retorna None quando o trecho é descartado ou tem menos de tamanho_minimo
+    pontos (padrão: 1).
+    """
+    _validar_parametros(tamanho_janela, passo, politica_final)
+    sinal = np.asarray(sinal)
+    inicio = numero_janelas(len(sinal), tamanho_janela, passo) * passo
+    if politica_final == 'descartar' or inicio >= len(sinal):
+        return None
+    final = sinal[inicio:]
+    if len(final) < (tamanho_minimo or 1):
+        return None
+    if politica_final == 'preencher':
+        return np.concatenate([final, np.zeros(tamanho_janela - len(final), dtype=final.dtype)])
+    return final
+
+def iterar_blocos_janelas(sinal, tamanho_janela, passo, janelas_por_bloco=1024):
+    """Gera blocos de até janelas_por_bloco janelas completas, todos views do sinal"""
+    janelas = janelas_deslizantes(sinal, tamanho_janela, passo)
+    for inicio in range(0, len(janelas), janelas_por_bloco):
+        yield janelas[inicio:inicio + janelas_por_bloco]
+
+def limites_janelas(n_amostras, tamanho_janela, passo, politica_final='descartar', tamanho_minimo=None):
+    """(inicio, fim) de cada janela, para índices de segmentos (armazenamento binário)
+
+    A política 'preencher' não tem representação em limites e não é aceita aqui.
+    """
+    _validar_parametros(tamanho_janela, passo, politica_final)
+    if politica_final == 'preencher':
+        raise ValueError("A política 'preencher' só vale para janelas em memória")
+    n_janelas = numero_janelas(n_amostras, tamanho_janela, passo)
+    limites = [(i * passo, i * passo + tamanho_janela) for i in range(n_janelas)]
+    inicio = n_janelas * passo
+    if politica_final == 'manter' and inicio < n_amostras and n_amostras - inicio >= (tamanho_minimo or 1):
+        limites.append((inicio, n_amostras))
+    return limites
+
+def parametros_por_contagem(n_amostras, n_segmentos, sobreposicao=0.0):
+    """(tamanho_janela, passo) para obter n_segmentos janelas com a sobreposição pedida
+
+    `sobreposicao` é a fração da janela compartilhada com a seguinte (0 <= s < 1).
+    """
+    if not 0 <= sobreposicao < 1:
+        raise ValueError("A sobreposição deve estar entre 0 (inclusive) e 1")
+    tamanho_janela = int(n_amostras / (1 + (n_segmentos - 1) * (1 - sobreposicao)))
+    if tamanho_janela <= 0:
+        raise ValueError("O número de segmentos é maior que o número de amostras")
+    passo = max(1, int(tamanho_janela * (1 - sobreposicao)))
+    return tamanho_janela, passo
+
+def limites_por_contagem(n_amostras, n_segmentos, sobreposicao=0.0):
+    """(inicio, fim) de n_segmentos janelas de mesmo tamanho com a sobreposição pedida
+
+    ValueError quando as n_segmentos janelas não cabem: com sobreposição alta
+    e poucas amostras o passo chega a menos de uma amostra e é arredondado
+    para 1.
+    """
+    tamanho_janela, passo = parametros_por_contagem(n_amostras, n_segmentos, sobreposicao)
+    limites = limites_janelas(n_amostras, tamanho_janela, passo)[:n_segmentos]
+    if len(limites) < n_segmentos:
+        raise ValueError(f"Só cabem {len(limites)} de {n_segmentos} segmentos em {n_amostras} amostras com "
+                         f"sobreposição {sobreposicao:g}; reduza a sobreposição ou o número de segmentos")
+    return limites
+
+# ============================================================================
+# SEGMENTAÇÃO DE GRAVAÇÕES EM JANELAS (linha de comando)
+# ============================================================================
+
+def segmentar_arquivo_em_janelas(caminho_arquivo, pasta_base, tamanho_janela, passo=None,
+                                 politica_final='descartar', tamanho_minimo=None):
+    """Segmenta uma gravação em janelas e grava o armazenamento binário
+
+    O sinal é gravado uma única vez; cada janela é uma entrada do índice. A
+    pasta de saída recebe o nome do arquivo (com sufixo _1, _2... se já existir).
+    A gravação é lida em blocos, sem carregá-la inteira na memória.
+    Retorna (pasta_saida, numero_de_segmentos).
+    """
+    import os
+    import shutil
+    from armazenamento_segmentos import gravar_sinal_em_fluxo, salvar_indice
+
+    _validar_parametros(tamanho_janela, passo or tamanho_janela, politica_final)
+    nome_arquivo = os.path.splitext(os.path.basename(caminho_arquivo))[0]
+    subpasta_nome = nome_arquivo
+    idx = 1
+    while os.path.exists(os.path.join(pasta_base, subpasta_nome)):
+        subpasta_nome = f"{nome_arquivo}_{idx}"
+        idx += 1
+    pasta_saida = os.path.join(pasta_base, subpasta_nome)
+    os.makedirs(pasta_saida)
+    try:
+        # Os valores vão em blocos para o .npy; as janelas dependem só da contagem final
+        n_valores, _ = gravar_sinal_em_fluxo(caminho_arquivo, pasta_saida)
+        limites = limites_janelas(n_valores, tamanho_janela, passo or tamanho_janela, politica_final, tamanho_minimo)
+        salvar_indice(pasta_saida, limites, subpasta_nome)
+    except BaseException:
+        shutil.rmtree(pasta_saida, ignore_errors=True)
+        raise
+    return pasta_saida, len(limites)
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(description="Segmentação de gravações em janelas deslizantes")
+    parser.add_argument('arquivos', nargs='+', help="Arquivos de gravação (.txt/.csv)")
+    parser.add_argument('--janela', type=int, required=True, help="Tamanho da janela em amostras")
+    parser.add_argument('--passo', type=int, default=None, help="Passo entre janelas (padrão: sem sobreposição)")
+    parser.add_argument('--final', choices=['descartar', 'manter'], default='descartar',
+                        help="O que fazer com o trecho final menor que uma janela")
+    parser.add_argument('--minimo', type=int, default=None, help="Tamanho mínimo do trecho final mantido")
+    parser.add_argument('--saida', default=os.path.join(os.getcwd(), 'resultados_segmentos'),
+                        help="Pasta base dos resultados")
+    args = parser.parse_args()
+
+    for caminho in args.arquivos:
+        pasta_saida, n_segmentos = segmentar_arquivo_em_janelas(
+            caminho, args.saida, args.janela, args.passo, args.final, args.minimo)
+        print(f"{os.path.basename(caminho)}: {n_segmentos} janelas em {pasta_saida}")
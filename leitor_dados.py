@@ -0,0 +1,111 @@
+import os
+import warnings
+import numpy as np
+
+# ============================================================================
+# LEITURA RÁPIDA DE ARQUIVOS NUMÉRICOS (CSV/TXT de uma coluna útil)
+# ============================================================================
+
+# Bytes do início do arquivo usados para detectar o formato
+TAMANHO_AMOSTRA = 4096
+
+# Formato detectado por pasta: os segmentos de uma mesma pasta compartilham o formato
+_formatos_por_pasta = {}
+
+def _tem_cabecalho(primeira_linha, delimitador):
+    """Mesmo critério do leitor tolerante: o primeiro campo não é numérico"""
+    try:
+        float(primeira_linha.strip().split(delimitador)[0].replace(',', '.'))
+        return False
+    except ValueError:
+        return True
+
+def detectar_formato(linhas):
+    """Detecta o formato a partir das primeiras linhas de um arquivo
+
+    Retorna {'delimitador', 'virgula_decimal'} quando o arquivo pode ser lido
+    pelo caminho rápido com o mesmo resultado do leitor tolerante (que tenta
+    ';', ',' e '\\t' nessa ordem e usa a primeira coluna numérica), ou None
+    quando o formato é ambíguo e o leitor tolerante deve ser usado.
+    """
+    linhas = [linha for linha in linhas if linha.strip()]
+    # Um cabeçalho de texto é descartado pelo leitor com qualquer delimitador
+    if linhas and _tem_cabecalho(linhas[0], ';') and _tem_cabecalho(linhas[0], '\t'):
+        linhas = linhas[1:]
+    if not linhas:
+        return None
+
+    tem_ponto_virgula = any(';' in linha for linha in linhas)
+    tem_tab = any('\t' in linha for linha in linhas)
+    tem_virgula = any(',' in linha for linha in linhas)
+
+    if tem_ponto_virgula:
+        if tem_virgula:
+            return None
+        return {'delimitador': ';', 'virgula_decimal': False}
+    if tem_tab:
+        # O leitor tolerante só chega ao '\t' se nenhuma linha for lida com ';' ou ','
+        if tem_virgula:
+            return None
+        return {'delimitador': '\t', 'virgula_decimal': False}
+    if tem_virgula:
+        # Uma vírgula por linha é lida como separador decimal ("0,123")
+        if all(linha.count(',') == 1 for linha in linhas):
+            return {'delimitador': ';', 'virgula_decimal': True}
+        return None
+    return {'delimitador': ';', 'virgula_decimal': False}
+
+def ler_numeros_rapido(caminho_arquivo):
+    """Lê a primeira coluna numérica de um arquivo de texto como np.ndarray
+
+    O formato é detectado uma única vez por pasta e a conversão é feita em C por
+    np.loadtxt. Retorna None quando o arquivo não segue o formato (codificação
+    diferente de UTF-8, colunas não numéricas, linhas inválidas...), para que o
+    chamador use o leitor tolerante.
+    """
+    try:
+        with open(caminho_arquivo, 'rb') as f:
+            conteudo = f.read()
+        texto = conteudo.decode('utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+    if texto.startswith('\ufeff'):
+        # BOM: o leitor tolerante trata a primeira linha de forma própria
+        return None
+
+    pasta = os.path.dirname(os.path.abspath(caminho_arquivo))
+    formato = _formatos_por_pasta.get(pasta)
+    if formato is None:
+        amostra = texto[:TAMANHO_AMOSTRA].splitlines()
+        if len(texto) > TAMANHO_AMOSTRA:
+            amostra = amostra[:-1]  # A última linha da amostra pode estar cortada
+        formato = detectar_formato(amostra)
+        if formato is None:
+            return None
+        _formatos_por_pasta[pasta] = formato
+
+    if formato['virgula_decimal']:
+        texto = texto.replace(',', '.')
+    linhas = texto.splitlines()
+    if not linhas:
+        return None
+
+    delimitador = formato['delimitador']
+    if _tem_cabecalho(linhas[0], delimitador):
+        linhas = linhas[1:]
+    if delimitador == '\t' and not all('\t' in linha.strip() for linha in linhas if linha.strip()):
+        return None
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # Arquivo sem dados: tratado abaixo
+            dados = np.loadtxt(linhas, delimiter=delimitador, usecols=0, comments=None, dtype=np.float64, ndmin=1)
+    except ValueError:
+        return None
+    if len(dados) == 0:
+        return None
+    return dados
+
+def limpar_formatos_detectados():
+    """Esquece os formatos memorizados (por exemplo, após regravar as pastas)"""
+    _formatos_por_pasta.clear()
@@ -1,19 +1,58 @@
 import os
 import numpy as np
-import pandas as pd
-import csv
-from sklearn.preprocessing import StandardScaler
+from motor_features import (COLUNAS_BASICAS, COLUNAS_INTEIRAS, acrescentar_linhas, calcular_features_janelas,
+                            calcular_features_segmento, finalizar_matriz_acumulada, linhas_features, nova_matriz_acumulada)
+from janelamento import janelas_deslizantes, trecho_final
+from armazenamento_segmentos import arquivos_segmentos, ler_segmento
+from leitor_dados import ler_numeros_rapido
+from processamento_paralelo import mapear_em_ordem
+from cache_extracao import carregar_cache, consultar, registrar, salvar_cache, versao_features
+from perfil_execucao import (ativar_perfil, contar_leitura, etapa, etapa_paralela, perfil_ativo,
+                             salvar_relatorio)
+from saida_features import caminho_dataset, formato_padrao, salvar_dataset, validar_formato
+from pipeline_dados import PASTA_CONVERTIDOS, PASTA_FEATURES, SUFIXO_PARCIAL, resolver_pasta
 
-# Caminhos
-pasta_dados = os.path.join(os.getcwd(), 'dados_convertidos_csv')
-pasta_features = os.path.join(os.getcwd(), 'features_extraidas')
-os.makedirs(pasta_features, exist_ok=True)
+# Caminhos: pasta_dados e pasta_features são parâmetros das funções; sem eles,
+# dados_convertidos_csv e features_extraidas no diretório atual. A importação
+# não cria pastas, e pandas, scikit-learn e scipy só são importados nas funções
+# que os usam.
+
+# Segmentação automática de arquivos grandes (janelas deslizantes)
+TAMANHO_SEGMENTO = 1000
+PASSO_SEGMENTO = None  # None: janelas sem sobreposição (passo = TAMANHO_SEGMENTO)
+TAMANHO_MINIMO_SEGMENTO = 10  # Trecho final menor que isso é descartado
+
+# Ranking usado na organização por segmento quando ainda não há relief_scores.csv
+TOP_FEATURES_PADRAO = [
+    'minimo', 'mean_abs', 'kurtosis', 'media', 'rms',
+    'desvio_padrao', 'pico_a_pico', 'skewness', 'energia', 'variancia'
+]
+PESOS_FEATURES_PADRAO = {
+    'minimo': 1.0, 'mean_abs': 0.95, 'kurtosis': 0.90, 'media': 0.85, 'rms': 0.80,
+    'desvio_padrao': 0.75, 'pico_a_pico': 0.70, 'skewness': 0.65, 'energia': 0.60, 'variancia': 0.55
+}
+N_FEATURES_SELECIONADAS = 10
+
+# Saídas do ReliefF em pasta_features, apagadas no início de cada aplicação
+ARQUIVOS_RELIEF = ('relief_scores.csv', 'relief_features.csv', 'top_features_relief.csv', 'relief_amostragem.csv')
+
+# Manifesto do cache de extração, em pasta_features (segmentos inalterados não são recalculados)
+ARQUIVO_CACHE = 'cache_extracao_basicas.json'
+# Formato do resultado guardado por arquivo (alterar invalida o cache)
+FORMATO_RESULTADO_CACHE = 2
 
 def ler_dados_arquivo(caminho_arquivo):
-    """Lê dados de arquivos CSV ou Excel"""
+    """Lê dados de arquivos CSV ou Excel e retorna um np.ndarray"""
     dados = []
     
     if caminho_arquivo.lower().endswith('.csv'):
+        # Caminho rápido: formato detectado uma vez por pasta e conversão em C
+        dados_rapidos = ler_numeros_rapido(caminho_arquivo)
+        if dados_rapidos is not None:
+            return dados_rapidos
+        
+        import csv
+        
         # Tenta diferentes delimitadores e encodings
         delimitadores = [';', ',', '\t']
         encodings = ['utf-8', 'latin-1', 'cp1252']
@@ -63,7 +102,7 @@ def ler_dados_arquivo(caminho_arquivo):
                         
                         if len(dados) > 0:
                             print(f"Arquivo lido com sucesso usando delimitador '{delimitador}' e encoding '{encoding}'")
-                            return dados
+                            return np.array(dados, dtype=np.float64)
                         else:
                             dados = []  # Reseta para tentar próximo delimitador
                             
@@ -86,6 +125,7 @@ def ler_dados_arquivo(caminho_arquivo):
             
     elif caminho_arquivo.lower().endswith(('.xlsx', '.xls')):
         # Lê arquivo Excel
+        import pandas as pd
         try:
             df = pd.read_excel(caminho_arquivo)
             # Tenta diferentes colunas para encontrar dados numéricos
@@ -106,20 +146,36 @@ def ler_dados_arquivo(caminho_arquivo):
                     
         except Exception as e:
             print(f"Erro ao ler arquivo Excel {caminho_arquivo}: {e}")
-            return []
+            return np.array([], dtype=np.float64)
     
-    return dados
+    return np.array(dados, dtype=np.float64)
 
-def segmentar_dados_grandes(dados, tamanho_segmento=1000):
-    """Segmenta dados grandes em segmentos menores"""
-    segmentos = []
-    for i in range(0, len(dados), tamanho_segmento):
-        segmento = dados[i:i + tamanho_segmento]
-        if len(segmento) >= 10:  # Mínimo de 10 pontos por segmento
-            segmentos.append(segmento)
+def segmentar_dados_grandes(dados, tamanho_segmento=TAMANHO_SEGMENTO, passo=PASSO_SEGMENTO,
+                            tamanho_minimo=TAMANHO_MINIMO_SEGMENTO):
+    """Segmenta dados grandes em janelas (views dos dados, sem cópia)
+
+    O trecho final é mantido como um segmento mais curto se tiver pelo menos
+    tamanho_minimo pontos.
+    """
+    passo = passo or tamanho_segmento
+    dados = np.asarray(dados, dtype=np.float64)
+    segmentos = list(janelas_deslizantes(dados, tamanho_segmento, passo))
+    final = trecho_final(dados, tamanho_segmento, passo, 'manter', tamanho_minimo)
+    if final is not None:
+        segmentos.append(final)
     return segmentos
 
-def processar_arquivo_ou_pasta(caminho):
+def matriz_features_segmentos_grandes(dados):
+    """Matriz (n_segmentos, n_features) das features básicas de cada segmento de segmentar_dados_grandes"""
+    return calcular_features_janelas(dados, TAMANHO_SEGMENTO, PASSO_SEGMENTO, COLUNAS_BASICAS,
+                                     'manter', TAMANHO_MINIMO_SEGMENTO)
+
+def calcular_features_segmentos_grandes(dados):
+    """Features básicas de cada segmento de segmentar_dados_grandes, calculadas em lote"""
+    return linhas_features(matriz_features_segmentos_grandes(dados), COLUNAS_BASICAS)
+
+def processar_arquivo_ou_pasta(caminho, n_workers=1, usar_cache=True, resultados=None, dtype=np.float64,
+                               pasta_features=None):
     """Processa um arquivo específico ou uma pasta inteira"""
     if os.path.isfile(caminho):
         # Processa arquivo único
@@ -128,7 +184,7 @@ def processar_arquivo_ou_pasta(caminho):
     elif os.path.isdir(caminho):
         # Processa pasta e subpastas
         print(f"Processando pasta: {caminho}")
-        return processar_pasta_completa(caminho)
+        return processar_pasta_completa(caminho, n_workers, usar_cache, resultados, dtype, pasta_features)
     else:
         print(f"Caminho não encontrado: {caminho}")
         return [], [], []
@@ -150,41 +206,31 @@ def processar_arquivo_unico(caminho_arquivo):
         print(f"Processando {os.path.basename(caminho_arquivo)} com {len(dados)} pontos de dados...")
         
         # Se o arquivo é muito grande, segmenta automaticamente
-        if len(dados) > 1000:
-            print(f"Arquivo grande detectado. Segmentando em partes de 1000 pontos...")
-            segmentos = segmentar_dados_grandes(dados)
-            print(f"Criados {len(segmentos)} segmentos")
+        if len(dados) > TAMANHO_SEGMENTO:
+            print(f"Arquivo grande detectado. Segmentando em partes de {TAMANHO_SEGMENTO} pontos...")
+            # Todas as janelas são calculadas em lote
+            features_segmentos = calcular_features_segmentos_grandes(dados)
+            print(f"Criados {len(features_segmentos)} segmentos")
             
-            for i, segmento in enumerate(segmentos):
-                try:
-                    dados_segmento = np.array(segmento)
-                    
-                    # Calcula as features vibratórias
-                    features = calcular_features(dados_segmento)
-                    
-                    todas_features.append(list(features.values()))
-                    nomes_segmentos.append(f"{os.path.splitext(os.path.basename(caminho_arquivo))[0]}_segmento_{i+1}")
-                    
-                    # Define label baseado no nome do arquivo
-                    nome_arquivo = os.path.basename(caminho_arquivo).lower()
-                    if 'normal' in nome_arquivo:
-                        labels.append(0)  # Estado normal
-                    elif 'fault' in nome_arquivo or 'crack' in nome_arquivo or 'erosion' in nome_arquivo or 'unbalance' in nome_arquivo:
-                        labels.append(1)  # Estado com falha
-                    else:
-                        labels.append(0)  # Padrão como normal
-                        
-                except Exception as e:
-                    print(f"Erro ao processar segmento {i+1}: {e}")
-                    continue
+            # Define label baseado no nome do arquivo
+            nome_arquivo = os.path.basename(caminho_arquivo).lower()
+            if 'normal' in nome_arquivo:
+                label = 0  # Estado normal
+            elif 'fault' in nome_arquivo or 'crack' in nome_arquivo or 'erosion' in nome_arquivo or 'unbalance' in nome_arquivo:
+                label = 1  # Estado com falha
+            else:
+                label = 0  # Padrão como normal
+            
+            for i, features in enumerate(features_segmentos):
+                todas_features.append(features)
+                nomes_segmentos.append(f"{os.path.splitext(os.path.basename(caminho_arquivo))[0]}_segmento_{i+1}")
+                labels.append(label)
         else:
             # Arquivo pequeno, processa normalmente
             if len(dados) < 3:
                 print(f"Arquivo {os.path.basename(caminho_arquivo)} tem apenas {len(dados)} pontos, pulando...")
                 return [], [], []
             
-            dados = np.array(dados)
-            
             # Calcula as features vibratórias
             features = calcular_features(dados)
             
@@ -207,92 +253,171 @@ def processar_arquivo_unico(caminho_arquivo):
         print(f"Erro ao processar {caminho_arquivo}: {e}")
         return [], [], []
 
-def processar_pasta_completa(pasta):
-    """Processa pasta e subpastas"""
-    todas_features = []
+def _processar_arquivo_pasta(tarefa):
+    """Lê um arquivo de processar_pasta_completa e calcula as features dos seus segmentos
+
+    Roda no processo principal ou num worker de processamento_paralelo.
+    Retorna (status, features, nomes_segmentos, labels, features_arquivo), com
+    status 'ok', 'pulado' ou 'erro'; features é a matriz float64 dos
+    segmentos e features_arquivo são as features básicas do arquivo inteiro
+    (usadas na organização por segmento), mesmo quando o arquivo é dividido
+    em segmentos.
+    """
+    root, file = tarefa
+    caminho_arquivo = os.path.join(root, file)
     nomes_segmentos = []
     labels = []
     
+    try:
+        # Lê os dados do arquivo (ou do armazenamento binário da pasta)
+        with etapa('leitura'):
+            dados = ler_segmento(root, file, ler_dados_arquivo)
+        
+        if len(dados) == 0:
+            print(f"Arquivo {file} não contém dados válidos, pulando...")
+            return 'pulado', [], [], [], None
+        
+        print(f"Processando {file} com {len(dados)} pontos de dados...")
+        
+        # Define labels baseado no nome da pasta
+        nome_pasta = os.path.basename(root).lower()
+        nome_arquivo = file.lower()
+        if 'h' in nome_pasta or 'normal' in nome_pasta or 'normal' in nome_arquivo:
+            label = 0  # Estado normal
+        elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
+            label = 1  # Estado com falha
+        else:
+            label = 0  # Padrão como normal
+        
+        # Se o arquivo é muito grande, segmenta automaticamente
+        if len(dados) > TAMANHO_SEGMENTO:
+            print(f"Arquivo grande detectado. Segmentando em partes de {TAMANHO_SEGMENTO} pontos...")
+            # Todas as janelas são calculadas em lote
+            with etapa('features'):
+                todas_features = matriz_features_segmentos_grandes(dados)
+                features_arquivo = list(calcular_features(dados).values())
+            print(f"Criados {len(todas_features)} segmentos")
+            
+            for i in range(len(todas_features)):
+                nomes_segmentos.append(f"{os.path.basename(root)}_{file}_segmento_{i+1}")
+                labels.append(label)
+        else:
+            # Arquivo pequeno, processa normalmente
+            if len(dados) < 3:
+                print(f"Arquivo {file} tem apenas {len(dados)} pontos, pulando...")
+                return 'pulado', [], [], [], None
+            
+            # Calcula as features vibratórias
+            with etapa('features'):
+                features_arquivo = list(calcular_features(dados).values())
+            
+            todas_features = np.array([features_arquivo], dtype=np.float64)
+            nomes_segmentos.append(f"{os.path.basename(root)}_{file}")
+            labels.append(label)
+        
+        return 'ok', todas_features, nomes_segmentos, labels, features_arquivo
+            
+    except Exception as e:
+        print(f"Erro ao processar {caminho_arquivo}: {e}")
+        return 'erro', [], [], [], None
+
+def listar_arquivos_pasta(pasta):
+    """(root, file) de todos os arquivos .csv e .xlsx/.xls nas subpastas, na ordem do os.walk"""
+    tarefas = []
+    for root, dirs, files in os.walk(pasta):
+        # Segmentações em andamento ou interrompidas (lendo direto de resultados_segmentos)
+        dirs[:] = [d for d in dirs if not d.endswith(SUFIXO_PARCIAL)]
+        for file in arquivos_segmentos(root, files):
+            if file.lower().endswith(('.csv', '.xlsx', '.xls')):
+                tarefas.append((root, file))
+    return tarefas
+
+def _resultado_para_cache(resultado):
+    """Resultado de _processar_arquivo_pasta em listas, serializável em JSON"""
+    status, features, nomes, labels, features_arquivo = resultado
+    return status, np.asarray(features).tolist(), nomes, labels, features_arquivo
+
+def _resultado_do_cache(resultado):
+    """Resultado guardado no cache com as features de volta numa matriz float64"""
+    status, features, nomes, labels, features_arquivo = resultado
+    matriz = np.array(features, dtype=np.float64).reshape(-1, len(COLUNAS_BASICAS))
+    return status, matriz, nomes, labels, features_arquivo
+
+def extrair_resultados_pasta(pasta, n_workers=1, usar_cache=True, pasta_features=None):
+    """Lê cada arquivo da pasta e subpastas e calcula suas features uma única vez
+
+    Retorna a lista de (tarefa, resultado) na ordem do os.walk, com tarefa =
+    (root, file) e o resultado de _processar_arquivo_pasta: é o conjunto de
+    features compartilhado pela extração, pelo ReliefF e pela organização por
+    segmento. Com n_workers > 1 os arquivos são distribuídos entre processos
+    (None ou 0 usa todos os núcleos). Com usar_cache, arquivos inalterados
+    desde a última execução não são lidos nem recalculados; o manifesto do
+    cache fica em pasta_features.
+    """
+    caminho_cache = os.path.join(resolver_pasta(pasta_features, PASTA_FEATURES), ARQUIVO_CACHE)
+    with etapa('descoberta'):
+        tarefas = listar_arquivos_pasta(pasta)
+    
+    # Resultados em cache e identificação dos arquivos a processar
+    resultados = {}
+    identificacoes = {}
+    if usar_cache:
+        versao = versao_features(COLUNAS_BASICAS, TAMANHO_SEGMENTO, PASSO_SEGMENTO, TAMANHO_MINIMO_SEGMENTO,
+                                 FORMATO_RESULTADO_CACHE)
+        with etapa('descoberta'):
+            cache = carregar_cache(caminho_cache, versao)
+            for tarefa in tarefas:
+                resultado, identificacoes[tarefa] = consultar(cache, *tarefa)
+                if resultado is not None:
+                    resultados[tarefa] = _resultado_do_cache(resultado)
+        if resultados:
+            print(f"{len(resultados)} arquivos inalterados (cache), {len(tarefas) - len(resultados)} a processar")
+    pendentes = [tarefa for tarefa in tarefas if tarefa not in resultados]
+    
+    with etapa_paralela(n_workers):
+        for tarefa, resultado in mapear_em_ordem(_processar_arquivo_pasta, pendentes, n_workers):
+            resultados[tarefa] = resultado
+            if usar_cache and resultado[0] != 'erro':
+                registrar(cache, identificacoes[tarefa], _resultado_para_cache(resultado))
+            contar_leitura(*tarefa)
+    if usar_cache:
+        with etapa('escrita'):
+            salvar_cache(cache, caminho_cache)
+    
+    return [(tarefa, resultados[tarefa]) for tarefa in tarefas]
+
+def processar_pasta_completa(pasta, n_workers=1, usar_cache=True, resultados=None, dtype=np.float64,
+                             pasta_features=None):
+    """Processa pasta e subpastas
+
+    `resultados` são os de extrair_resultados_pasta, quando já calculados;
+    senão a pasta é lida aqui. Retorna (matriz de features em `dtype`, nomes
+    dos segmentos, labels em int8).
+    """
+    acumulador = nova_matriz_acumulada(len(COLUNAS_BASICAS), dtype)
+    nomes_segmentos = []
+    
     arquivos_processados = 0
     arquivos_erro = 0
     
-    # Percorre todos os arquivos .csv e .xlsx/.xls nas subpastas
-    for root, dirs, files in os.walk(pasta):
-        for file in files:
-            if file.lower().endswith(('.csv', '.xlsx', '.xls')):
-                caminho_arquivo = os.path.join(root, file)
-                try:
-                    # Lê os dados do arquivo
-                    dados = ler_dados_arquivo(caminho_arquivo)
-                    
-                    if len(dados) == 0:
-                        print(f"Arquivo {file} não contém dados válidos, pulando...")
-                        continue
-                    
-                    print(f"Processando {file} com {len(dados)} pontos de dados...")
-                    
-                    # Se o arquivo é muito grande, segmenta automaticamente
-                    if len(dados) > 1000:
-                        print(f"Arquivo grande detectado. Segmentando em partes de 1000 pontos...")
-                        segmentos = segmentar_dados_grandes(dados)
-                        print(f"Criados {len(segmentos)} segmentos")
-                        
-                        for i, segmento in enumerate(segmentos):
-                            try:
-                                dados_segmento = np.array(segmento)
-                                
-                                # Calcula as features vibratórias
-                                features = calcular_features(dados_segmento)
-                                
-                                todas_features.append(list(features.values()))
-                                nomes_segmentos.append(f"{os.path.basename(root)}_{file}_segmento_{i+1}")
-                                
-                                # Define labels baseado no nome da pasta/arquivo
-                                nome_pasta = os.path.basename(root).lower()
-                                nome_arquivo = file.lower()
-                                if 'h' in nome_pasta or 'normal' in nome_pasta or 'normal' in nome_arquivo:
-                                    labels.append(0)  # Estado normal
-                                elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
-                                    labels.append(1)  # Estado com falha
-                                else:
-                                    labels.append(0)  # Padrão como normal
-                                    
-                            except Exception as e:
-                                print(f"Erro ao processar segmento {i+1}: {e}")
-                                continue
-                    else:
-                        # Arquivo pequeno, processa normalmente
-                        if len(dados) < 3:
-                            print(f"Arquivo {file} tem apenas {len(dados)} pontos, pulando...")
-                            continue
-                        
-                        dados = np.array(dados)
-                        
-                        # Calcula as features vibratórias
-                        features = calcular_features(dados)
-                        
-                        todas_features.append(list(features.values()))
-                        nomes_segmentos.append(f"{os.path.basename(root)}_{file}")
-                        
-                        # Define labels baseado no nome da pasta
-                        nome_pasta = os.path.basename(root).lower()
-                        nome_arquivo = file.lower()
-                        if 'h' in nome_pasta or 'normal' in nome_pasta or 'normal' in nome_arquivo:
-                            labels.append(0)  # Estado normal
-                        elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
-                            labels.append(1)  # Estado com falha
-                        else:
-                            labels.append(0)  # Padrão como normal
-                    
-                    arquivos_processados += 1
-                    if arquivos_processados % 10 == 0:
-                        print(f"Processados {arquivos_processados} arquivos...")
-                        
-                except Exception as e:
-                    print(f"Erro ao processar {caminho_arquivo}: {e}")
-                    arquivos_erro += 1
-                    continue
+    if resultados is None:
+        resultados = extrair_resultados_pasta(pasta, n_workers, usar_cache, pasta_features)
+    
+    for _, (status, features, nomes, labels_arquivo, _) in resultados:
+        if status == 'erro':
+            arquivos_erro += 1
+            continue
+        if status != 'ok':
+            continue
+        
+        acrescentar_linhas(acumulador, features, labels_arquivo)
+        nomes_segmentos.extend(nomes)
+        
+        arquivos_processados += 1
+        if arquivos_processados % 10 == 0:
+            print(f"Processados {arquivos_processados} arquivos...")
     
+    todas_features, labels = finalizar_matriz_acumulada(acumulador)
     print(f"Extraídas features de {len(todas_features)} segmentos")
     print(f"Arquivos processados com sucesso: {arquivos_processados}")
     print(f"Arquivos com erro: {arquivos_erro}")
@@ -300,29 +425,17 @@ def processar_pasta_completa(pasta):
 
 def calcular_features(dados):
     """Calcula todas as features vibratórias para um conjunto de dados"""
-    return {
-        'media': np.mean(dados),
-        'desvio_padrao': np.std(dados),
-        'maximo': np.max(dados),
-        'minimo': np.min(dados),
-        'rms': np.sqrt(np.mean(dados**2)),
-        'variancia': np.var(dados),
-        'skewness': float(pd.Series(dados).skew()),
-        'kurtosis': float(pd.Series(dados).kurtosis()),
-        'pico_a_pico': np.max(dados) - np.min(dados),
-        'crest_factor': np.max(np.abs(dados)) / np.sqrt(np.mean(dados**2)) if np.sqrt(np.mean(dados**2)) != 0 else 0,
-        'shape_factor': np.sqrt(np.mean(dados**2)) / np.mean(np.abs(dados)) if np.mean(np.abs(dados)) != 0 else 0,
-        'impulse_factor': np.max(np.abs(dados)) / np.mean(np.abs(dados)) if np.mean(np.abs(dados)) != 0 else 0,
-        'margin_factor': np.max(np.abs(dados)) / np.mean(np.sqrt(np.abs(dados)))**2 if np.mean(np.sqrt(np.abs(dados))) != 0 else 0,
-        'energia': np.sum(dados**2),
-        'zero_crossings': np.sum(np.diff(np.sign(dados)) != 0),
-        'mean_abs': np.mean(np.abs(dados)),
-        'peak_to_rms': np.max(np.abs(dados)) / np.sqrt(np.mean(dados**2)) if np.sqrt(np.mean(dados**2)) != 0 else 0
-    }
-
-def extrair_features_vibratorias():
-    """Extrai features vibratórias de todos os segmentos CSV e Excel"""
+    return calcular_features_segmento(dados, features=COLUNAS_BASICAS)
+
+def extrair_features_vibratorias(n_workers=1, usar_cache=True, resultados=None, dtype=np.float64,
+                                 pasta_dados=None, pasta_features=None):
+    """Extrai features vibratórias de todos os segmentos CSV e Excel de pasta_dados
+
+    `resultados` (de extrair_resultados_pasta) evita ler a pasta de novo.
+    As features de uma pasta são acumuladas numa matriz em `dtype`.
+    """
     print("Iniciando extração de features...")
+    pasta_dados = resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)
     
     # Verifica se existe um arquivo específico para processar
     arquivo_especifico = os.path.join(pasta_dados, "97_Normal_0.csv")
@@ -331,51 +444,81 @@ def extrair_features_vibratorias():
         return processar_arquivo_ou_pasta(arquivo_especifico)
     else:
         print(f"Procurando arquivos CSV e Excel em: {pasta_dados}")
-        return processar_arquivo_ou_pasta(pasta_dados)
+        return processar_arquivo_ou_pasta(pasta_dados, n_workers, usar_cache, resultados, dtype, pasta_features)
+
+def aplicar_relief_e_salvar(n_workers=1, usar_cache=True, extracao=None, aproximado=False,
+                            estratos=None, semente=0, pasta_dados=None, pasta_features=None):
+    """Aplica o método ReliefF e salva os resultados
+
+    n_workers também é o número de threads do ReliefF. `extracao` é o
+    (todas_features, nomes_segmentos, labels) já extraído; sem ele as
+    features são extraídas aqui. Com aproximado, o ReliefF pontua uma amostra
+    estratificada crescente (por `estratos`, por exemplo a condição de cada
+    segmento; padrão: o label) até o top 10 estabilizar. Os resultados vão
+    para pasta_features; os de um ReliefF anterior são apagados antes, para
+    nunca serem confundidos com os destes dados. RuntimeError quando o
+    ReliefF falha (por exemplo, todos os segmentos da mesma classe).
+    """
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+    from relieff_nativo import calcular_scores_relieff, calcular_scores_relieff_aproximado
 
-def aplicar_relief_e_salvar():
-    """Aplica o método ReliefF e salva os resultados"""
-    todas_features, nomes_segmentos, labels = extrair_features_vibratorias()
+    pasta_features = resolver_pasta(pasta_features, PASTA_FEATURES)
+    for arquivo in ARQUIVOS_RELIEF:
+        caminho = os.path.join(pasta_features, arquivo)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    if extracao is None:
+        extracao = extrair_features_vibratorias(n_workers, usar_cache, pasta_dados=pasta_dados,
+                                                pasta_features=pasta_features)
+    todas_features, nomes_segmentos, labels = extracao
     
-    if not todas_features:
+    if len(todas_features) == 0:
         print("Nenhum segmento válido encontrado para extração de features.")
         return
     
-    # Define as colunas das features
-    colunas_features = [
-        'media', 'desvio_padrao', 'maximo', 'minimo', 'rms', 'variancia',
-        'skewness', 'kurtosis', 'pico_a_pico', 'crest_factor',
-        'shape_factor', 'impulse_factor', 'margin_factor', 'energia',
-        'zero_crossings', 'mean_abs', 'peak_to_rms'
-    ]
+    # Colunas das features, na ordem em que o motor as calcula
+    colunas_features = list(COLUNAS_BASICAS)
     
     # Cria DataFrame com as features
     df_features = pd.DataFrame(todas_features, columns=colunas_features)
+    for coluna in COLUNAS_INTEIRAS:
+        df_features[coluna] = df_features[coluna].astype(np.int64)
     df_features['segmento'] = nomes_segmentos
     df_features['label'] = labels
     
     print(f"Dataset criado com {len(df_features)} amostras e {len(colunas_features)} features")
+    os.makedirs(pasta_features, exist_ok=True)
     
     try:
-        # Tenta importar ReliefF
-        from skrebate import ReliefF
-        
         # Prepara os dados para ReliefF
         X = df_features[colunas_features].values
         y = np.array(labels)
         
-        # Normaliza os dados
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        print("Aplicando método ReliefF...")
+        with etapa('selecao'):
+            # Normaliza os dados
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X)
         
-        # Aplica ReliefF
-        relief = ReliefF(n_features_to_select=min(10, len(colunas_features)), n_neighbors=10)
-        relief.fit(X_scaled, y)
+            print("Aplicando método ReliefF...")
         
-        # Obtém os scores das features
-        scores = relief.feature_importances_
+            # Aplica ReliefF (implementação própria, blocos de distâncias em n_workers threads)
+            if aproximado:
+                scores, info = calcular_scores_relieff_aproximado(
+                    X_scaled, y, estratos, n_vizinhos=10, top_k=10, semente=semente, n_jobs=n_workers)
+                if info['convergiu']:
+                    situacao = 'ranking estável'
+                elif info['amostras_usadas'] == info['total_amostras']:
+                    situacao = 'todas as amostras, equivalente ao exato'
+                else:
+                    situacao = 'sem convergência'
+                print(f"ReliefF aproximado: {info['amostras_usadas']} de {info['total_amostras']} amostras "
+                      f"em {info['incrementos']} incrementos ({situacao}), "
+                      f"confiança do top 10: {info['confianca_top']:.1%}")
+                caminho_amostragem = os.path.join(pasta_features, 'relief_amostragem.csv')
+                pd.DataFrame([dict(info, semente=semente)]).to_csv(caminho_amostragem, index=False)
+            else:
+                scores = calcular_scores_relieff(X_scaled, y, n_vizinhos=10, n_jobs=n_workers)
         
         # Cria DataFrame com os scores
         df_scores = pd.DataFrame({
@@ -385,7 +528,8 @@ def aplicar_relief_e_salvar():
         
         # Salva os scores
         caminho_scores = os.path.join(pasta_features, 'relief_scores.csv')
-        df_scores.to_csv(caminho_scores, index=False)
+        with etapa('escrita'):
+            df_scores.to_csv(caminho_scores, index=False)
         
         # Mostra as top features
         top_features = df_scores.head(10)['feature'].tolist()
@@ -396,12 +540,14 @@ def aplicar_relief_e_salvar():
         
         # Salva as features extraídas
         caminho_features = os.path.join(pasta_features, 'relief_features.csv')
-        df_features.to_csv(caminho_features, index=False)
+        with etapa('escrita'):
+            df_features.to_csv(caminho_features, index=False)
         
         # Cria dataset apenas com as top features
         df_top_features = df_features[top_features + ['segmento', 'label']]
         caminho_top_features = os.path.join(pasta_features, 'top_features_relief.csv')
-        df_top_features.to_csv(caminho_top_features, index=False)
+        with etapa('escrita'):
+            df_top_features.to_csv(caminho_top_features, index=False)
         
         print(f"\nResultados salvos:")
         print(f"- Scores ReliefF: {caminho_scores}")
@@ -411,215 +557,184 @@ def aplicar_relief_e_salvar():
         # Estatísticas dos dados
         print(f"\nEstatísticas dos dados:")
         print(f"- Total de amostras: {len(df_features)}")
-        print(f"- Amostras normais (label 0): {sum(labels == 0)}")
-        print(f"- Amostras com falha (label 1): {sum(labels == 1)}")
+        print(f"- Amostras normais (label 0): {sum(y == 0)}")
+        print(f"- Amostras com falha (label 1): {sum(y == 1)}")
         print(f"- Features originais: {len(colunas_features)}")
         print(f"- Features selecionadas: {len(top_features)}")
         
-    except ImportError:
-        print("Biblioteca skrebate não encontrada. Tentando instalar...")
-        try:
-            import subprocess
-            subprocess.check_call(["pip", "install", "skrebate"])
-            print("skrebate instalado com sucesso!")
-            print("Execute o script novamente.")
-        except Exception as e:
-            print(f"Erro ao instalar skrebate: {e}")
-            print("Instale manualmente com: pip install skrebate")
-            print("Ou use uma alternativa como scikit-learn para feature selection")
-            
-            # Alternativa usando scikit-learn
-            print("\nAplicando método alternativo usando scikit-learn...")
-            try:
-                from sklearn.feature_selection import SelectKBest, f_classif
-                
-                # Usa ANOVA F-value para seleção de features
-                selector = SelectKBest(score_func=f_classif, k=min(10, len(colunas_features)))
-                X = df_features[colunas_features].values
-                y = np.array(labels)
-                
-                X_selected = selector.fit_transform(X, y)
-                scores = selector.scores_
-                
-                # Cria DataFrame com os scores
-                df_scores = pd.DataFrame({
-                    'feature': colunas_features,
-                    'score_f_test': scores
-                }).sort_values('score_f_test', ascending=False)
-                
-                # Salva os scores
-                caminho_scores = os.path.join(pasta_features, 'f_test_scores.csv')
-                df_scores.to_csv(caminho_scores, index=False)
-                
-                # Mostra as top features
-                top_features = df_scores.head(10)['feature'].tolist()
-                print("\nTop 10 features selecionadas pelo F-test:")
-                for i, feature in enumerate(top_features, 1):
-                    score = df_scores.iloc[i-1]['score_f_test']
-                    print(f"{i}. {feature} (score: {score:.4f})")
-                
-                # Salva as features extraídas
-                caminho_features = os.path.join(pasta_features, 'f_test_features.csv')
-                df_features.to_csv(caminho_features, index=False)
-                
-                # Cria dataset apenas com as top features
-                df_top_features = df_features[top_features + ['segmento', 'label']]
-                caminho_top_features = os.path.join(pasta_features, 'top_features_f_test.csv')
-                df_top_features.to_csv(caminho_top_features, index=False)
-                
-                print(f"\nResultados salvos:")
-                print(f"- Scores F-test: {caminho_scores}")
-                print(f"- Todas as features: {caminho_features}")
-                print(f"- Top features selecionadas: {caminho_top_features}")
-                
-            except Exception as e2:
-                print(f"Erro ao aplicar método alternativo: {e2}")
-        return
-        
     except Exception as e:
         print(f"Erro ao aplicar ReliefF: {e}")
-        return
+        raise RuntimeError(f"Erro ao aplicar ReliefF: {e}") from e
+
+def carregar_ranking_relief(n_features=N_FEATURES_SELECIONADAS, pasta_features=None):
+    """Top features do último ReliefF (pasta_features/relief_scores.csv) e seus pesos normalizados
+
+    O peso é o score dividido pelo maior score em módulo (a primeira feature
+    recebe 1.0). Sem relief_scores.csv, usa TOP_FEATURES_PADRAO e
+    PESOS_FEATURES_PADRAO. Retorna (top_features, pesos_features).
+    """
+    caminho_scores = os.path.join(resolver_pasta(pasta_features, PASTA_FEATURES), 'relief_scores.csv')
+    if not os.path.exists(caminho_scores):
+        print(f"Arquivo {caminho_scores} não encontrado, usando o ranking PADRÃO "
+              "(TOP_FEATURES_PADRAO, não calculado a partir destes dados)")
+        return list(TOP_FEATURES_PADRAO), dict(PESOS_FEATURES_PADRAO)
+    
+    import pandas as pd
+    df_scores = pd.read_csv(caminho_scores).sort_values('score_relief', ascending=False, kind='stable')
+    df_top = df_scores.head(n_features)
+    maior_score = df_scores['score_relief'].abs().max() or 1.0
+    top_features = df_top['feature'].tolist()
+    pesos_features = {feature: float(score / maior_score)
+                      for feature, score in zip(top_features, df_top['score_relief'])}
+    return top_features, pesos_features
 
-def organizar_features_relief_por_segmento():
-    """Organiza as features selecionadas pelo ReliefF em subpastas por condição com pesos"""
+def _features_selecionadas_arquivo(tarefa):
+    """Lê um arquivo e calcula só as features pedidas (e os intermediários de que dependem)
+
+    Roda no processo principal ou num worker de processamento_paralelo.
+    Retorna {feature: valor}, ou None quando o arquivo é pulado.
+    """
+    root, file, features = tarefa
+    try:
+        # Lê os dados do arquivo (ou do armazenamento binário da pasta)
+        with etapa('leitura'):
+            dados = ler_segmento(root, file, ler_dados_arquivo)
+        
+        # Verifica se há dados suficientes
+        if len(dados) < 3:
+            return None
+        with etapa('features'):
+            return calcular_features_segmento(dados, features=features)
+    except Exception as e:
+        print(f"Erro ao processar {os.path.join(root, file)}: {e}")
+        return None
+
+def organizar_features_relief_por_segmento(resultados=None, n_workers=1, usar_cache=True, formato=None, float32=False,
+                                          pasta_dados=None, pasta_features=None):
+    """Organiza as features selecionadas pelo ReliefF em subpastas por condição com pesos
+
+    O ranking e os pesos vêm do último ReliefF (carregar_ranking_relief).
+    Com `resultados` (de extrair_resultados_pasta) as features já calculadas
+    na extração são reaproveitadas; sem eles, cada arquivo é lido e só as
+    features selecionadas são calculadas.
+
+    Com formato 'parquet' ou 'feather' os segmentos vão para um único dataset
+    particionado por condição (segmentos_relief.<formato>); 'csv' grava um
+    arquivo por segmento. O padrão é parquet quando o pyarrow está instalado.
+    A saída vai para pasta_features/relief_organizado.
+    """
+    import pandas as pd
+
+    formato = formato or formato_padrao()
+    validar_formato(formato)
+    pasta_dados = resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)
+    pasta_features = resolver_pasta(pasta_features, PASTA_FEATURES)
+    
     print("\n=== ORGANIZAÇÃO DAS FEATURES RELIEFF POR SEGMENTO ===")
     
     pasta_relief_organizado = os.path.join(pasta_features, 'relief_organizado')
     os.makedirs(pasta_relief_organizado, exist_ok=True)
     
-    # Top features selecionadas pelo ReliefF com seus pesos (baseado no ranking)
-    top_features_relief = [
-        'minimo', 'mean_abs', 'kurtosis', 'media', 'rms', 
-        'desvio_padrao', 'pico_a_pico', 'skewness', 'energia', 'variancia'
-    ]
-    
-    # Pesos das features (baseado na importância do ReliefF - valores normalizados)
-    pesos_features = {
-        'minimo': 1.0,           # Peso máximo (feature mais importante)
-        'mean_abs': 0.95,        # Muito alta importância
-        'kurtosis': 0.90,        # Alta importância
-        'media': 0.85,           # Alta importância
-        'rms': 0.80,             # Importância alta
-        'desvio_padrao': 0.75,   # Importância alta
-        'pico_a_pico': 0.70,     # Importância média-alta
-        'skewness': 0.65,        # Importância média
-        'energia': 0.60,         # Importância média
-        'variancia': 0.55        # Importância média-baixa
-    }
+    # Top features selecionadas pelo ReliefF com seus pesos (scores normalizados)
+    top_features_relief, pesos_features = carregar_ranking_relief(pasta_features=pasta_features)
     
     print("Extraindo features por segmento com pesos...")
     
     # Dicionário para armazenar features por condição
     features_por_condicao = {}
     
-    # Percorre todos os arquivos .csv e .xlsx/.xls nas subpastas
-    for root, dirs, files in os.walk(pasta_dados):
-        for file in files:
-            if file.lower().endswith(('.csv', '.xlsx', '.xls')):
-                caminho_arquivo = os.path.join(root, file)
-                try:
-                    # Lê os dados do arquivo
-                    dados = ler_dados_arquivo(caminho_arquivo)
-                    
-                    # Verifica se há dados suficientes
-                    if len(dados) < 3:
-                        continue
-                    
-                    dados = np.array(dados)
-                    
-                    # Calcula as features vibratórias
-                    features = {
-                        'media': np.mean(dados),
-                        'desvio_padrao': np.std(dados),
-                        'maximo': np.max(dados),
-                        'minimo': np.min(dados),
-                        'rms': np.sqrt(np.mean(dados**2)),
-                        'variancia': np.var(dados),
-                        'skewness': float(pd.Series(dados).skew()),
-                        'kurtosis': float(pd.Series(dados).kurtosis()),
-                        'pico_a_pico': np.max(dados) - np.min(dados),
-                        'crest_factor': np.max(np.abs(dados)) / np.sqrt(np.mean(dados**2)) if np.sqrt(np.mean(dados**2)) != 0 else 0,
-                        'shape_factor': np.sqrt(np.mean(dados**2)) / np.mean(np.abs(dados)) if np.mean(np.abs(dados)) != 0 else 0,
-                        'impulse_factor': np.max(np.abs(dados)) / np.mean(np.abs(dados)) if np.mean(np.abs(dados)) != 0 else 0,
-                        'margin_factor': np.max(np.abs(dados)) / np.mean(np.sqrt(np.abs(dados)))**2 if np.mean(np.sqrt(np.abs(dados))) != 0 else 0,
-                        'energia': np.sum(dados**2),
-                        'zero_crossings': np.sum(np.diff(np.sign(dados)) != 0),
-                        'mean_abs': np.mean(np.abs(dados)),
-                        'peak_to_rms': np.max(np.abs(dados)) / np.sqrt(np.mean(dados**2)) if np.sqrt(np.mean(dados**2)) != 0 else 0
-                    }
-                    
-                    # Obtém o nome da condição (pasta)
-                    condicao = os.path.basename(root)
-                    
-                    # Adiciona informações do segmento
-                    features['segmento'] = file.replace('.csv', '').replace('.xlsx', '').replace('.xls', '')
-                    features['arquivo_original'] = file
-                    features['condicao'] = condicao
-                    
-                    # Define label baseado no nome da pasta
-                    nome_pasta = condicao.lower()
-                    if 'h' in nome_pasta or 'normal' in nome_pasta:
-                        features['label'] = 0  # Estado normal
-                    elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
-                        features['label'] = 1  # Estado com falha
-                    else:
-                        features['label'] = 0  # Padrão como normal
-                    
-                    # Adiciona apenas as top features selecionadas pelo ReliefF com seus pesos
-                    features_relief = {}
-                    for feature in top_features_relief:
-                        if feature in features:
-                            features_relief[feature] = features[feature]
-                            features_relief[f'{feature}_peso'] = pesos_features[feature]
-                    
-                    features_relief.update({
-                        'segmento': features['segmento'],
-                        'arquivo_original': features['arquivo_original'],
-                        'condicao': features['condicao'],
-                        'label': features['label']
-                    })
-                    
-                    # Organiza por condição
-                    if condicao not in features_por_condicao:
-                        features_por_condicao[condicao] = []
-                    features_por_condicao[condicao].append(features_relief)
-                    
-                except Exception as e:
-                    print(f"Erro ao processar {caminho_arquivo}: {e}")
-                    continue
+    if resultados is not None:
+        # Features do arquivo inteiro, calculadas uma única vez na extração
+        selecionadas = []
+        for tarefa, (status, _, _, _, features_arquivo) in resultados:
+            if status != 'ok':
+                continue
+            features_basicas = dict(zip(COLUNAS_BASICAS, features_arquivo))
+            selecionadas.append((tarefa, {feature: features_basicas[feature] for feature in top_features_relief}))
+    else:
+        # Apenas as features selecionadas são calculadas
+        with etapa('descoberta'):
+            tarefas = [(root, file, top_features_relief) for root, file in listar_arquivos_pasta(pasta_dados)]
+        selecionadas = []
+        with etapa_paralela(n_workers):
+            for (root, file, _), features in mapear_em_ordem(_features_selecionadas_arquivo, tarefas, n_workers):
+                contar_leitura(root, file)
+                if features is not None:
+                    selecionadas.append(((root, file), features))
+    
+    for (root, file), features in selecionadas:
+        # Obtém o nome da condição (pasta)
+        condicao = os.path.basename(root)
+        
+        # Adiciona informações do segmento
+        features['segmento'] = file.replace('.csv', '').replace('.xlsx', '').replace('.xls', '')
+        features['arquivo_original'] = file
+        features['condicao'] = condicao
+        
+        # Define label baseado no nome da pasta
+        nome_pasta = condicao.lower()
+        if 'h' in nome_pasta or 'normal' in nome_pasta:
+            features['label'] = 0  # Estado normal
+        elif 'fault' in nome_pasta or 'crack' in nome_pasta or 'erosion' in nome_pasta or 'unbalance' in nome_pasta:
+            features['label'] = 1  # Estado com falha
+        else:
+            features['label'] = 0  # Padrão como normal
+        
+        # Adiciona apenas as top features selecionadas pelo ReliefF com seus pesos
+        features_relief = {}
+        for feature in top_features_relief:
+            if feature in features:
+                features_relief[feature] = features[feature]
+                features_relief[f'{feature}_peso'] = pesos_features[feature]
+        
+        features_relief.update({
+            'segmento': features['segmento'],
+            'arquivo_original': features['arquivo_original'],
+            'condicao': features['condicao'],
+            'label': features['label']
+        })
+        
+        # Organiza por condição
+        if condicao not in features_por_condicao:
+            features_por_condicao[condicao] = []
+        features_por_condicao[condicao].append(features_relief)
     
     # Salva as features organizadas
     print("Salvando features organizadas com pesos...")
     
-    # Salva ranking das features com pesos
-    ranking_features = pd.DataFrame({
-        'feature': top_features_relief,
-        'posicao': range(1, len(top_features_relief) + 1),
-        'peso': [pesos_features[feature] for feature in top_features_relief]
-    })
-    caminho_ranking = os.path.join(pasta_relief_organizado, 'ranking_features_relief.csv')
-    ranking_features.to_csv(caminho_ranking, index=False)
-    
-    # Salva features por condição
-    for condicao, features_list in features_por_condicao.items():
-        if features_list:
-            # Cria subpasta para a condição
-            pasta_condicao = os.path.join(pasta_relief_organizado, condicao)
-            os.makedirs(pasta_condicao, exist_ok=True)
+    with etapa('escrita'):
+        # Salva ranking das features com pesos
+        ranking_features = pd.DataFrame({
+            'feature': top_features_relief,
+            'posicao': range(1, len(top_features_relief) + 1),
+            'peso': [pesos_features[feature] for feature in top_features_relief]
+        })
+        caminho_ranking = os.path.join(pasta_relief_organizado, 'ranking_features_relief.csv')
+        ranking_features.to_csv(caminho_ranking, index=False)
+    
+        # Salva features por condição
+        for condicao, features_list in features_por_condicao.items():
+            if features_list:
+                # Cria subpasta para a condição
+                pasta_condicao = os.path.join(pasta_relief_organizado, condicao)
+                os.makedirs(pasta_condicao, exist_ok=True)
             
-            # Converte para DataFrame
-            df_condicao = pd.DataFrame(features_list)
+                # Converte para DataFrame
+                df_condicao = pd.DataFrame(features_list)
             
-            # Salva arquivo da condição
-            caminho_condicao = os.path.join(pasta_condicao, f'features_relief_{condicao}.csv')
-            df_condicao.to_csv(caminho_condicao, index=False)
+                # Salva arquivo da condição
+                caminho_condicao = os.path.join(pasta_condicao, f'features_relief_{condicao}.csv')
+                df_condicao.to_csv(caminho_condicao, index=False)
             
-            # Salva arquivo individual para cada segmento
-            for feature_dict in features_list:
-                segmento = feature_dict['segmento']
-                df_segmento = pd.DataFrame([feature_dict])
-                caminho_segmento = os.path.join(pasta_condicao, f'segmento_{segmento}_relief.csv')
-                df_segmento.to_csv(caminho_segmento, index=False)
+                if formato != 'csv':
+                    continue
+            
+                # Salva arquivo individual para cada segmento
+                for feature_dict in features_list:
+                    segmento = feature_dict['segmento']
+                    df_segmento = pd.DataFrame([feature_dict])
+                    caminho_segmento = os.path.join(pasta_condicao, f'segmento_{segmento}_relief.csv')
+                    df_segmento.to_csv(caminho_segmento, index=False)
     
     # Cria arquivo consolidado com todas as features
     todas_features = []
@@ -629,12 +744,22 @@ def organizar_features_relief_por_segmento():
     if todas_features:
         df_consolidado = pd.DataFrame(todas_features)
         caminho_consolidado = os.path.join(pasta_relief_organizado, 'features_relief_consolidadas.csv')
-        df_consolidado.to_csv(caminho_consolidado, index=False)
+        with etapa('escrita'):
+            df_consolidado.to_csv(caminho_consolidado, index=False)
+            
+            if formato != 'csv':
+                # Todos os segmentos num único dataset colunar, gravado de uma vez
+                caminho_segmentos = caminho_dataset(pasta_relief_organizado, 'segmentos_relief', formato)
+                salvar_dataset(df_consolidado, caminho_segmentos, formato, float32)
         
         print(f"\nArquivos salvos em: {pasta_relief_organizado}")
         print(f"- ranking_features_relief.csv - Ranking das features com pesos")
         print(f"- features_relief_consolidadas.csv - Todas as features consolidadas com pesos")
-        print(f"- Subpastas por condição com features individuais e pesos")
+        if formato != 'csv':
+            print(f"- segmentos_relief.{formato} - Features por segmento, particionadas por condição")
+            print(f"- Subpastas por condição com as features da condição e pesos")
+        else:
+            print(f"- Subpastas por condição com features individuais e pesos")
         
         print(f"\nEstatísticas gerais:")
         print(f"- Total de segmentos processados: {len(df_consolidado)}")
@@ -649,20 +774,90 @@ def organizar_features_relief_por_segmento():
         for feature, peso in pesos_features.items():
             print(f"- {feature}: {peso:.2f}")
 
-def mostrar_top_features():
+def executar_pipeline_relief(n_workers=1, usar_cache=True, aproximado=False, semente=0, formato=None, float32=False,
+                             dtype=np.float64, pasta_dados=None, pasta_features=None):
+    """Extração, ReliefF e organização por segmento com uma única leitura dos dados
+
+    Os arquivos são lidos e as features calculadas uma só vez
+    (extrair_resultados_pasta); as três etapas consomem os mesmos resultados.
+    Com aproximado, o ReliefF usa amostragem estratificada por condição.
+    formato e float32 definem a saída por segmento da organização; dtype, o
+    tipo da matriz de features acumulada na extração. Os segmentos são lidos
+    de pasta_dados e os resultados gravados em pasta_features.
+    Retorna (todas_features, nomes_segmentos, labels). Sem segmentos válidos,
+    o ReliefF e a organização não são executados; quando o ReliefF falha, a
+    organização também não roda e o RuntimeError é propagado.
+    """
+    formato = formato or formato_padrao()
+    validar_formato(formato)  # Antes da extração: um pyarrow ausente aparece logo
+    pasta_dados = resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)
+    pasta_features = resolver_pasta(pasta_features, PASTA_FEATURES)
+    
+    print("\n=== EXTRAÇÃO DE FEATURES ===")
+    resultados = extrair_resultados_pasta(pasta_dados, n_workers, usar_cache, pasta_features)
+    extracao = extrair_features_vibratorias(n_workers, usar_cache, resultados, dtype, pasta_dados, pasta_features)
+    
+    if len(extracao[0]) == 0:
+        print("Nenhum segmento válido encontrado para extração de features.")
+        print("Verifique se os arquivos contêm dados numéricos válidos.")
+        return extracao
+    
+    print(f"\nFeatures extraídas com sucesso: {len(extracao[0])} segmentos")
+    
+    # Condição (pasta) de cada segmento, na ordem da extração, para a amostragem
+    estratos = []
+    for (root, _), (status, _, nomes, _, _) in resultados:
+        if status == 'ok':
+            estratos.extend([os.path.basename(root)] * len(nomes))
+    if len(estratos) != len(extracao[0]):
+        estratos = None  # Arquivo específico: extração diferente da pasta
+    
+    print("\n=== APLICAÇÃO DO MÉTODO RELIEFF ===")
+    aplicar_relief_e_salvar(n_workers, usar_cache, extracao, aproximado, estratos, semente, pasta_dados, pasta_features)
+    
+    print("\n=== ORGANIZAÇÃO DAS FEATURES RELIEFF POR SEGMENTO ===")
+    organizar_features_relief_por_segmento(resultados, formato=formato, float32=float32, pasta_dados=pasta_dados,
+                                           pasta_features=pasta_features)
+    return extracao
+
+def mostrar_top_features(pasta_features=None):
     """Mostra as top features selecionadas pelo ReliefF"""
     print("\n=== TOP FEATURES SELECIONADAS PELO RELIEFF ===")
-    top_features = [
-        'minimo', 'mean_abs', 'kurtosis', 'media', 'rms', 
-        'desvio_padrao', 'pico_a_pico', 'skewness', 'energia', 'variancia'
-    ]
+    top_features, pesos_features = carregar_ranking_relief(pasta_features=pasta_features)
     
     for i, feature in enumerate(top_features, 1):
-        print(f"{i}. {feature}")
+        print(f"{i}. {feature} (peso: {pesos_features[feature]:.2f})")
     
     print(f"\nTotal de features selecionadas: {len(top_features)}")
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Extração de features e seleção pelo método ReliefF")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos paralelos na extração e threads do ReliefF (0 = todos os núcleos)")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="Recalcula todos os segmentos, ignorando o cache de extração")
+    parser.add_argument('--relief-aproximado', action='store_true',
+                        help="ReliefF sobre amostra estratificada crescente até o top 10 estabilizar")
+    parser.add_argument('--semente', type=int, default=0,
+                        help="Semente da amostragem do ReliefF aproximado")
+    parser.add_argument('--formato', choices=['csv', 'parquet', 'feather'], default=None,
+                        help="Saída por segmento: dataset parquet/feather particionado por condição ou um CSV "
+                             "por segmento (padrão: parquet com pyarrow instalado, senão csv)")
+    parser.add_argument('--float32', action='store_true',
+                        help="Grava as features em float32 nos formatos parquet/feather")
+    parser.add_argument('--dados', default=None, help="Pasta dos segmentos (padrão: dados_convertidos_csv)")
+    parser.add_argument('--features', default=None, help="Pasta dos resultados (padrão: features_extraidas)")
+    parser.add_argument('--perfil', action='store_true',
+                        help="Mede tempo por etapa, vazão e pico de memória (perfil_metodo_relief.json)")
+    parser.add_argument('--perfil-grupos', action='store_true',
+                        help="Como --perfil, medindo também o tempo de cada grupo de features")
+    args = parser.parse_args()
+    if args.perfil or args.perfil_grupos:
+        ativar_perfil(args.perfil_grupos)
+    pasta_dados = resolver_pasta(args.dados, PASTA_CONVERTIDOS)
+    pasta_features = resolver_pasta(args.features, PASTA_FEATURES)
+    
     print("=== INÍCIO DO PROCESSAMENTO ===")
     print(f"Pasta de dados: {pasta_dados}")
     print(f"Pasta de resultados: {pasta_features}")
@@ -683,24 +878,19 @@ if __name__ == "__main__":
             if file.lower().endswith(('.csv', '.xlsx', '.xls')):
                 print(f"  - {os.path.join(root, file)}")
     
-    print("\n=== EXTRAÇÃO DE FEATURES ===")
-    # Extrai features vibratórias
-    todas_features, nomes_segmentos, labels = extrair_features_vibratorias()
-    
+    # Extrai as features uma única vez, aplica ReliefF e organiza por segmento
+    try:
+        todas_features, nomes_segmentos, labels = executar_pipeline_relief(
+            args.workers, not args.sem_cache, args.relief_aproximado, args.semente, args.formato, args.float32,
+            pasta_dados=pasta_dados, pasta_features=pasta_features)
+    except RuntimeError:
+        exit(1)  # Mensagem já exibida por aplicar_relief_e_salvar
+    if perfil_ativo():
+        caminho_perfil = os.path.join(pasta_features, 'perfil_metodo_relief.json')
+        salvar_relatorio(caminho_perfil, script='metodo_relief', workers=args.workers, cache=not args.sem_cache,
+                         relief_aproximado=args.relief_aproximado, segmentos=len(todas_features))
+        print(f"Relatório de perfil: {caminho_perfil}")
     if len(todas_features) == 0:
-        print("Nenhum segmento válido encontrado para extração de features.")
-        print("Verifique se os arquivos contêm dados numéricos válidos.")
         exit(1)
     
-    print(f"\nFeatures extraídas com sucesso: {len(todas_features)} segmentos")
-    
-    print("\n=== APLICAÇÃO DO MÉTODO RELIEFF ===")
-    # Aplica ReliefF e salva resultados
-    aplicar_relief_e_salvar()
-    
-    print("\n=== ORGANIZAÇÃO DAS FEATURES RELIEFF POR SEGMENTO ===")
-    # Organiza features por segmento
-    organizar_features_relief_por_segmento()
-    
     print("\n=== PROCESSO CONCLUÍDO ===")
-    
\ No newline at end of file
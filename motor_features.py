@@ -0,0 +1,544 @@
+import numpy as np
+from janelamento import iterar_blocos_janelas, trecho_final
+from perfil_execucao import medir_grupo, perfil_por_grupo
+
+# ============================================================================
+# PARÂMETROS DAS FEATURES
+# ============================================================================
+
+LAGS_AUTOCORRELACAO = [1, 2, 3, 5, 10]
+ORDEM_MAXIMA_CENTRAL = 10
+ORDEM_MAXIMA_ABSOLUTO = 10
+ORDEM_MAXIMA_CENTRAL_ABSOLUTO = 100
+
+# Features de contagem, gravadas como inteiros nos CSVs
+COLUNAS_INTEIRAS = ['zero_crossings']
+
+# ============================================================================
+# CONTEXTO DE SEGMENTOS: INTERMEDIÁRIOS CALCULADOS UMA ÚNICA VEZ
+# ============================================================================
+
+def criar_contexto(matriz):
+    """Cria o contexto de cálculo para uma matriz (n_segmentos, tamanho_segmento)
+
+    O contexto é um dicionário que guarda os intermediários (espectro, sinal
+    centrado, valores absolutos, diferenças, valores ordenados, histograma...)
+    à medida que são pedidos, de forma que cada um é calculado uma única vez.
+    Um vetor 1-D é tratado como um único segmento.
+    """
+    x = np.asarray(matriz, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[np.newaxis, :]
+    return {'dados': x, 'n': x.shape[1]}
+
+def obter(contexto, nome):
+    """Retorna o intermediário `nome`, calculando-o apenas na primeira vez"""
+    if nome not in contexto:
+        contexto[nome] = INTERMEDIARIOS[nome]['calcular'](contexto)
+    return contexto[nome]
+
+def _histograma(contexto):
+    """Contagens do histograma de cada linha (mesmos bins de np.histogram)"""
+    x = contexto['dados']
+    n_seg, n = x.shape
+    n_bins = min(20, n // 2)
+
+    primeira_borda = obter(contexto, 'minimo')
+    ultima_borda = obter(contexto, 'maximo')
+    constante = primeira_borda == ultima_borda
+    primeira_borda = np.where(constante, primeira_borda - 0.5, primeira_borda)
+    ultima_borda = np.where(constante, ultima_borda + 0.5, ultima_borda)
+    bordas = np.linspace(primeira_borda, ultima_borda, n_bins + 1, axis=1)
+
+    # Índice do bin de cada valor, com a mesma correção de 1 ULP feita pelo numpy
+    largura = (ultima_borda - primeira_borda)[:, np.newaxis]
+    indices = ((x - primeira_borda[:, np.newaxis]) / largura * n_bins).astype(np.intp)
+    indices[indices == n_bins] -= 1
+    indices -= x < np.take_along_axis(bordas, indices, axis=1)
+    indices += (x >= np.take_along_axis(bordas, indices + 1, axis=1)) & (indices != n_bins - 1)
+
+    deslocamento = (np.arange(n_seg) * n_bins)[:, np.newaxis]
+    contagens = np.bincount((indices + deslocamento).ravel(), minlength=n_seg * n_bins)
+    return contagens.reshape(n_seg, n_bins)
+
+def _momentos_por_recorrencia(base, ordem_maxima):
+    """Médias de base**k para k = 1..ordem_maxima em cada linha, por produto acumulado
+
+    Cada linha é dividida pelo seu maior valor absoluto, de forma que as potências
+    intermediárias ficam em [-1, 1] e nunca estouram; a escala é reaplicada no fim,
+    em espaço logarítmico quando escala**k não é representável. Retorna
+    (momentos, log_momentos), com log_momentos = log|momento|, sempre finito para
+    bases não negativas e não nulas.
+    """
+    escala = np.max(np.abs(base), axis=1)
+    escala_segura = np.where(escala > 0, escala, 1.0)
+    razao = base / escala_segura[:, np.newaxis]
+
+    somas = np.empty((ordem_maxima, base.shape[0]))
+    potencia = razao.copy()
+    for k in range(ordem_maxima):
+        np.add.reduce(potencia, axis=1, out=somas[k])
+        if k + 1 < ordem_maxima:
+            potencia *= razao
+    medias_escaladas = somas.T / base.shape[1]
+
+    ordens = np.arange(1, ordem_maxima + 1)
+    with np.errstate(over='ignore', under='ignore', divide='ignore', invalid='ignore'):
+        log_momentos = ordens * np.log(escala)[:, np.newaxis] + np.log(np.abs(medias_escaladas))
+        momentos = escala_segura[:, np.newaxis] ** ordens * medias_escaladas
+        fora_da_faixa = ~np.isfinite(momentos) | (np.abs(momentos) < np.finfo(np.float64).tiny)
+        momentos = np.where(fora_da_faixa, np.sign(medias_escaladas) * np.exp(log_momentos), momentos)
+    momentos[escala == 0] = 0
+    return momentos, log_momentos
+
+# Cada intermediário declara de quais outros depende; `calcular` recebe o contexto
+INTERMEDIARIOS = {
+    'media': {'dependencias': [], 'calcular': lambda c: np.mean(c['dados'], axis=1)},
+    'maximo': {'dependencias': [], 'calcular': lambda c: np.max(c['dados'], axis=1)},
+    'minimo': {'dependencias': [], 'calcular': lambda c: np.min(c['dados'], axis=1)},
+    'pico_a_pico': {'dependencias': ['maximo', 'minimo'],
+                    'calcular': lambda c: obter(c, 'maximo') - obter(c, 'minimo')},
+    'quadrado': {'dependencias': [], 'calcular': lambda c: c['dados']**2},
+    'media_quadrado': {'dependencias': ['quadrado'], 'calcular': lambda c: np.mean(obter(c, 'quadrado'), axis=1)},
+    'rms': {'dependencias': ['media_quadrado'], 'calcular': lambda c: np.sqrt(obter(c, 'media_quadrado'))},
+    'abs': {'dependencias': [], 'calcular': lambda c: np.abs(c['dados'])},
+    'max_abs': {'dependencias': ['abs'], 'calcular': lambda c: np.max(obter(c, 'abs'), axis=1)},
+    'media_abs': {'dependencias': ['abs'], 'calcular': lambda c: np.mean(obter(c, 'abs'), axis=1)},
+    'media_raiz_abs': {'dependencias': ['abs'], 'calcular': lambda c: np.mean(np.sqrt(obter(c, 'abs')), axis=1)},
+    'centrado': {'dependencias': ['media'], 'calcular': lambda c: c['dados'] - obter(c, 'media')[:, np.newaxis]},
+    'centrado_quadrado': {'dependencias': ['centrado'], 'calcular': lambda c: obter(c, 'centrado')**2},
+    'centrado_abs': {'dependencias': ['centrado'], 'calcular': lambda c: np.abs(obter(c, 'centrado'))},
+    'variancia': {'dependencias': ['centrado_quadrado'],
+                  'calcular': lambda c: np.sum(obter(c, 'centrado_quadrado'), axis=1) / c['n']},
+    'desvio_padrao': {'dependencias': ['variancia'], 'calcular': lambda c: np.sqrt(obter(c, 'variancia'))},
+    'ordenado': {'dependencias': [], 'calcular': lambda c: np.sort(c['dados'], axis=1)},
+    'percentil_25': {'dependencias': ['ordenado'], 'calcular': lambda c: _quantil_ordenado(obter(c, 'ordenado'), 25)},
+    'percentil_75': {'dependencias': ['ordenado'], 'calcular': lambda c: _quantil_ordenado(obter(c, 'ordenado'), 75)},
+    'histograma': {'dependencias': ['minimo', 'maximo'], 'calcular': lambda c: _histograma(c)},
+    'diff_abs': {'dependencias': [], 'calcular': lambda c: np.abs(np.diff(c['dados'], axis=1))},
+    'diff_abs_ordenado': {'dependencias': ['diff_abs'], 'calcular': lambda c: np.sort(obter(c, 'diff_abs'), axis=1)},
+    'espectro': {'dependencias': [], 'calcular': lambda c: np.fft.fft(c['dados'], axis=1)},
+    'magnitude': {'dependencias': ['espectro'], 'calcular': lambda c: np.abs(obter(c, 'espectro'))},
+    'soma_magnitude': {'dependencias': ['magnitude'], 'calcular': lambda c: np.sum(obter(c, 'magnitude'), axis=1)},
+    'centroide': {'dependencias': ['magnitude', 'soma_magnitude'], 'calcular': lambda c: _centroide(c)},
+    'momentos_abs': {'dependencias': ['abs'],
+                     'calcular': lambda c: _momentos_por_recorrencia(obter(c, 'abs'), ORDEM_MAXIMA_ABSOLUTO)},
+    'momentos_centrais_abs': {'dependencias': ['centrado_abs'],
+                              'calcular': lambda c: _momentos_por_recorrencia(obter(c, 'centrado_abs'),
+                                                                               ORDEM_MAXIMA_CENTRAL_ABSOLUTO)},
+}
+
+# ============================================================================
+# FUNÇÕES AUXILIARES VETORIZADAS (operam linha a linha, axis=1)
+# ============================================================================
+
+def _dividir(numerador, denominador):
+    """Divide elemento a elemento retornando 0 onde o denominador é zero"""
+    resultado = np.zeros(np.broadcast(numerador, denominador).shape)
+    np.divide(numerador, denominador, out=resultado, where=denominador != 0)
+    return resultado
+
+def _quantil_ordenado(ordenado, percentil):
+    """Percentil linear de linhas já ordenadas (mesmo resultado de np.percentile)"""
+    n = ordenado.shape[1]
+    indice_virtual = (n - 1) * (percentil / 100)
+    anterior = int(np.floor(indice_virtual))
+    proximo = min(anterior + 1, n - 1)
+    gamma = indice_virtual - anterior
+    a = ordenado[:, anterior]
+    b = ordenado[:, proximo]
+    diferenca = b - a
+    if gamma >= 0.5:
+        return b - diferenca * (1 - gamma)
+    return a + diferenca * gamma
+
+def _mediana_ordenada(ordenado):
+    """Mediana de linhas já ordenadas (mesmo resultado de np.median)"""
+    n = ordenado.shape[1]
+    if n % 2:
+        return ordenado[:, n // 2].copy()
+    return (ordenado[:, n // 2 - 1] + ordenado[:, n // 2]) / 2
+
+def _skewness(contexto):
+    """Assimetria ajustada (G1), equivalente a pd.Series(dados).skew() por linha"""
+    n = float(contexto['n'])
+    if n < 3:
+        # Indefinida (o pandas retorna NaN); evita a divisão por n - 2 = 0
+        return np.full(contexto['dados'].shape[0], np.nan)
+    ajustado = obter(contexto, 'centrado')
+    ajustado2 = obter(contexto, 'centrado_quadrado')
+    m2 = ajustado2.sum(axis=1)
+    m3 = (ajustado2 * ajustado).sum(axis=1)
+
+    # Zera erros de ponto flutuante em sinais constantes (mesmo critério do pandas)
+    eps = np.finfo(np.float64).eps
+    max_abs = obter(contexto, 'max_abs')
+    m2 = np.where(np.abs(m2) < ((eps * max_abs) ** 2) * n, 0, m2)
+    m3 = np.where(np.abs(m3) < ((eps * max_abs) ** 3) * n, 0, m3)
+
+    # Potência escalar por linha: reproduz o arredondamento de pd.Series.skew()
+    m2_15 = np.array([valor**1.5 for valor in m2.tolist()])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        resultado = (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2_15)
+    return np.where(m2 == 0, 0, resultado)
+
+def _kurtosis(contexto):
+    """Curtose em excesso ajustada (G2), equivalente a pd.Series(dados).kurtosis() por linha"""
+    n = float(contexto['n'])
+    if n < 4:
+        # Indefinida (o pandas retorna NaN); evita a divisão por (n - 2) * (n - 3) = 0
+        return np.full(contexto['dados'].shape[0], np.nan)
+    ajustado2 = obter(contexto, 'centrado_quadrado')
+    m2 = ajustado2.sum(axis=1)
+    m4 = (ajustado2**2).sum(axis=1)
+
+    eps = np.finfo(np.float64).eps
+    max_abs = obter(contexto, 'max_abs')
+    m2 = np.where(np.abs(m2) < ((eps * max_abs) ** 2) * n, 0, m2)
+    m4 = np.where(np.abs(m4) < ((eps * max_abs) ** 4) * n, 0, m4)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ajuste = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        numerador = n * (n + 1) * (n - 1) * m4
+        denominador = (n - 2) * (n - 3) * m2**2
+        resultado = numerador / denominador - ajuste
+    return np.where(denominador == 0, 0, resultado)
+
+def _autocorrelacao(contexto, lag):
+    """Coeficiente de Pearson entre dados[:-lag] e dados[lag:] para cada linha
+
+    Reproduz np.corrcoef: covariância 2x2 por produto matricial e divisão
+    pelos desvios padrão, em lote para todas as linhas.
+    """
+    x = contexto['dados']
+    if contexto['n'] <= lag:
+        return np.zeros(x.shape[0])
+    pares = np.stack([x[:, :-lag], x[:, lag:]], axis=1)
+    pares = pares - pares.mean(axis=2, keepdims=True)
+    covariancia = pares @ pares.transpose(0, 2, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariancia *= np.true_divide(1, pares.shape[2] - 1)
+        correlacao = covariancia[:, 0, 1] / np.sqrt(covariancia[:, 0, 0]) / np.sqrt(covariancia[:, 1, 1])
+    return np.clip(correlacao, -1, 1)
+
+def _centroide(contexto):
+    """Centroide espectral (índice médio ponderado pela magnitude) de cada linha"""
+    indices_freq = np.arange(contexto['n'])
+    magnitude = obter(contexto, 'magnitude')
+    return _dividir(np.sum(indices_freq * magnitude, axis=1), obter(contexto, 'soma_magnitude'))
+
+def _bandwidth(contexto):
+    indices_freq = np.arange(contexto['n'])
+    magnitude = obter(contexto, 'magnitude')
+    soma_magnitude = obter(contexto, 'soma_magnitude')
+    centroide = obter(contexto, 'centroide')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bandwidth = np.sqrt(np.sum((indices_freq - centroide[:, np.newaxis])**2 * magnitude, axis=1) / soma_magnitude)
+    return np.where(soma_magnitude != 0, bandwidth, 0)
+
+def _fft_flux(contexto):
+    magnitude = obter(contexto, 'magnitude')
+    if contexto['n'] < 2:
+        return np.zeros(magnitude.shape[0])
+    return np.sum(np.abs(np.diff(magnitude, axis=1)), axis=1)
+
+def _quarto_magnitude(quarto):
+    """Média da magnitude no quarto `quarto` (1..4) do espectro (pseudo-MFCC)"""
+    def calcular(contexto):
+        n = contexto['n']
+        return np.mean(obter(contexto, 'magnitude')[:, (quarto - 1) * n // 4:quarto * n // 4], axis=1)
+    return calcular
+
+def _entropia(contexto):
+    probabilidades = obter(contexto, 'histograma') / contexto['n']
+    return -np.sum(probabilidades * np.log2(probabilidades + 1e-10), axis=1)
+
+# ============================================================================
+# REGISTRO DE FEATURES (nome, grupo e intermediários de que cada uma depende)
+# ============================================================================
+
+REGISTRO_FEATURES = {}
+
+def registrar_feature(nome, grupo, dependencias, calcular):
+    """Registra uma feature no motor
+
+    `dependencias` lista os intermediários (INTERMEDIARIOS) lidos por `calcular`,
+    que recebe o contexto e retorna um valor por segmento. A ordem de registro é
+    a ordem das colunas nos arquivos de features.
+    """
+    REGISTRO_FEATURES[nome] = {'grupo': grupo, 'dependencias': list(dependencias), 'calcular': calcular}
+
+def _ler(intermediario):
+    """Feature que é o próprio intermediário"""
+    return lambda c: obter(c, intermediario)
+
+# --- Básicas: as mesmas 17 de metodo_relief.calcular_features
+registrar_feature('media', 'basicas', ['media'], _ler('media'))
+registrar_feature('desvio_padrao', 'basicas', ['desvio_padrao'], _ler('desvio_padrao'))
+registrar_feature('maximo', 'basicas', ['maximo'], _ler('maximo'))
+registrar_feature('minimo', 'basicas', ['minimo'], _ler('minimo'))
+registrar_feature('rms', 'basicas', ['rms'], _ler('rms'))
+registrar_feature('variancia', 'basicas', ['variancia'], _ler('variancia'))
+registrar_feature('skewness', 'basicas', ['centrado', 'centrado_quadrado', 'max_abs'], _skewness)
+registrar_feature('kurtosis', 'basicas', ['centrado_quadrado', 'max_abs'], _kurtosis)
+registrar_feature('pico_a_pico', 'basicas', ['pico_a_pico'], _ler('pico_a_pico'))
+registrar_feature('crest_factor', 'basicas', ['max_abs', 'rms'],
+                  lambda c: _dividir(obter(c, 'max_abs'), obter(c, 'rms')))
+registrar_feature('shape_factor', 'basicas', ['rms', 'media_abs'],
+                  lambda c: _dividir(obter(c, 'rms'), obter(c, 'media_abs')))
+registrar_feature('impulse_factor', 'basicas', ['max_abs', 'media_abs'],
+                  lambda c: _dividir(obter(c, 'max_abs'), obter(c, 'media_abs')))
+registrar_feature('margin_factor', 'basicas', ['max_abs', 'media_raiz_abs'],
+                  lambda c: _dividir(obter(c, 'max_abs'), obter(c, 'media_raiz_abs')**2))
+registrar_feature('energia', 'basicas', ['quadrado'], lambda c: np.sum(obter(c, 'quadrado'), axis=1))
+registrar_feature('zero_crossings', 'basicas', [],
+                  lambda c: np.sum(np.diff(np.sign(c['dados']), axis=1) != 0, axis=1))
+registrar_feature('mean_abs', 'basicas', ['media_abs'], _ler('media_abs'))
+registrar_feature('peak_to_rms', 'basicas', ['max_abs', 'rms'],
+                  lambda c: _dividir(obter(c, 'max_abs'), obter(c, 'rms')))
+
+# --- Distribuição
+registrar_feature('mediana', 'distribuicao', ['ordenado'], lambda c: _mediana_ordenada(obter(c, 'ordenado')))
+registrar_feature('amplitude', 'distribuicao', ['pico_a_pico'], _ler('pico_a_pico'))
+registrar_feature('coeficiente_variacao', 'distribuicao', ['desvio_padrao', 'media'],
+                  lambda c: _dividir(obter(c, 'desvio_padrao'), obter(c, 'media')))
+registrar_feature('range', 'distribuicao', ['pico_a_pico'], _ler('pico_a_pico'))
+registrar_feature('percentil_25', 'distribuicao', ['percentil_25'], _ler('percentil_25'))
+registrar_feature('percentil_75', 'distribuicao', ['percentil_75'], _ler('percentil_75'))
+registrar_feature('iqr', 'distribuicao', ['percentil_25', 'percentil_75'],
+                  lambda c: obter(c, 'percentil_75') - obter(c, 'percentil_25'))
+registrar_feature('entropia', 'distribuicao', ['histograma'], _entropia)
+
+# --- Autocorrelação
+for lag in LAGS_AUTOCORRELACAO:
+    registrar_feature(f'autocorrelacao_lag{lag}', 'autocorrelacao', [], lambda c, lag=lag: _autocorrelacao(c, lag))
+
+# --- FFT
+registrar_feature('fft_media', 'fft', ['magnitude'], lambda c: np.mean(obter(c, 'magnitude'), axis=1))
+registrar_feature('fft_max', 'fft', ['magnitude'], lambda c: np.max(obter(c, 'magnitude'), axis=1))
+registrar_feature('fft_std', 'fft', ['magnitude'], lambda c: np.std(obter(c, 'magnitude'), axis=1))
+registrar_feature('fft_energia', 'fft', ['magnitude'], lambda c: np.sum(obter(c, 'magnitude')**2, axis=1))
+registrar_feature('fft_centroide', 'fft', ['centroide'], _ler('centroide'))
+registrar_feature('fft_bandwidth', 'fft', ['magnitude', 'soma_magnitude', 'centroide'], _bandwidth)
+# A soma acumulada da magnitude já é crescente: dispensa ordenação
+registrar_feature('fft_rolloff', 'fft', ['magnitude'],
+                  lambda c: _quantil_ordenado(np.cumsum(obter(c, 'magnitude'), axis=1), 85))
+registrar_feature('fft_flux', 'fft', ['magnitude'], _fft_flux)
+for quarto in range(1, 5):
+    registrar_feature(f'fft_mfcc_{quarto}', 'fft', ['magnitude'], _quarto_magnitude(quarto))
+
+# --- Wavelet (Haar simplificada: diferenças absolutas consecutivas)
+registrar_feature('wavelet_haar_1', 'wavelet', ['diff_abs'], lambda c: np.mean(obter(c, 'diff_abs'), axis=1))
+registrar_feature('wavelet_haar_2', 'wavelet', ['diff_abs'], lambda c: np.std(obter(c, 'diff_abs'), axis=1))
+registrar_feature('wavelet_haar_3', 'wavelet', ['diff_abs'], lambda c: np.max(obter(c, 'diff_abs'), axis=1))
+registrar_feature('wavelet_haar_4', 'wavelet', ['diff_abs'], lambda c: np.min(obter(c, 'diff_abs'), axis=1))
+registrar_feature('wavelet_haar_5', 'wavelet', ['diff_abs_ordenado'],
+                  lambda c: _mediana_ordenada(obter(c, 'diff_abs_ordenado')))
+
+# --- Momentos: ordens 1 e 2 vêm dos intermediários já calculados. Os momentos
+# com sinal sofrem cancelamento e usam a potência direta; os absolutos vêm do
+# bloco de potências por recorrência
+registrar_feature('estatisticas_ordem_1', 'momentos', ['media'], _ler('media'))
+registrar_feature('estatisticas_ordem_2', 'momentos', ['media_quadrado'], _ler('media_quadrado'))
+registrar_feature('estatisticas_ordem_3', 'momentos', [], lambda c: np.mean(c['dados']**3, axis=1))
+registrar_feature('estatisticas_ordem_4', 'momentos', [], lambda c: np.mean(c['dados']**4, axis=1))
+registrar_feature('momento_central_2', 'momentos', ['variancia'], _ler('variancia'))
+for k in range(3, ORDEM_MAXIMA_CENTRAL + 1):
+    registrar_feature(f'momento_central_{k}', 'momentos', ['centrado'],
+                      lambda c, k=k: np.mean(obter(c, 'centrado')**k, axis=1))
+registrar_feature('momento_absoluto_1', 'momentos', ['media_abs'], _ler('media_abs'))
+registrar_feature('momento_absoluto_2', 'momentos', ['media_quadrado'], _ler('media_quadrado'))
+for k in range(3, ORDEM_MAXIMA_ABSOLUTO + 1):
+    registrar_feature(f'momento_absoluto_{k}', 'momentos', ['momentos_abs'],
+                      lambda c, k=k: obter(c, 'momentos_abs')[0][:, k - 1])
+registrar_feature('momento_central_absoluto_1', 'momentos', ['centrado_abs'],
+                  lambda c: np.mean(obter(c, 'centrado_abs'), axis=1))
+registrar_feature('momento_central_absoluto_2', 'momentos', ['variancia'], _ler('variancia'))
+for k in range(3, ORDEM_MAXIMA_CENTRAL_ABSOLUTO + 1):
+    registrar_feature(f'momento_central_absoluto_{k}', 'momentos', ['momentos_centrais_abs'],
+                      lambda c, k=k: obter(c, 'momentos_centrais_abs')[0][:, k - 1])
+
+def colunas_dos_grupos(grupos=None):
+    """Nomes das features dos grupos pedidos, na ordem do registro (todas se None)"""
+    if grupos is None:
+        return list(REGISTRO_FEATURES)
+    desconhecidos = set(grupos) - {dados['grupo'] for dados in REGISTRO_FEATURES.values()}
+    if desconhecidos:
+        raise ValueError(f"Grupo(s) de features desconhecido(s): {sorted(desconhecidos)}")
+    return [nome for nome, dados in REGISTRO_FEATURES.items() if dados['grupo'] in grupos]
+
+COLUNAS_FEATURES_COMPLETAS = colunas_dos_grupos()
+COLUNAS_BASICAS = colunas_dos_grupos(['basicas'])
+COLUNAS_DISTRIBUICAO = colunas_dos_grupos(['distribuicao'])
+COLUNAS_AUTOCORRELACAO = colunas_dos_grupos(['autocorrelacao'])
+COLUNAS_FFT = colunas_dos_grupos(['fft'])
+COLUNAS_WAVELET = colunas_dos_grupos(['wavelet'])
+COLUNAS_MOMENTOS = colunas_dos_grupos(['momentos'])
+
+def _validar_features(features):
+    """Lista de features pedida (todas se None), verificando se estão registradas"""
+    if features is None:
+        return COLUNAS_FEATURES_COMPLETAS
+    features = list(features)
+    desconhecidas = [nome for nome in features if nome not in REGISTRO_FEATURES]
+    if desconhecidas:
+        raise ValueError(f"Feature(s) não registrada(s): {desconhecidas}")
+    return features
+
+def intermediarios_necessarios(features=None):
+    """Conjunto de intermediários calculados para obter as features pedidas
+
+    Inclui as dependências transitivas declaradas em INTERMEDIARIOS.
+    """
+    pendentes = [dep for nome in _validar_features(features) for dep in REGISTRO_FEATURES[nome]['dependencias']]
+    necessarios = set()
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in necessarios:
+            necessarios.add(nome)
+            pendentes.extend(INTERMEDIARIOS[nome]['dependencias'])
+    return necessarios
+
+# ============================================================================
+# API EM LOTE E POR SEGMENTO
+# ============================================================================
+
+def calcular_features_contexto(contexto, features=None):
+    """Calcula as features pedidas sobre um contexto já criado
+
+    Só os intermediários de que essas features dependem são calculados. Com
+    o perfil por grupo ativo, o tempo de cada feature (e dos intermediários
+    que ela calcula primeiro) é somado ao seu grupo.
+    """
+    features = _validar_features(features)
+    if not features:
+        return np.empty((contexto['dados'].shape[0], 0), dtype=np.float64)
+    if perfil_por_grupo():
+        colunas = [medir_grupo(REGISTRO_FEATURES[nome]['grupo'], REGISTRO_FEATURES[nome]['calcular'], contexto)
+                   for nome in features]
+        return np.column_stack(colunas).astype(np.float64)
+    return np.column_stack([REGISTRO_FEATURES[nome]['calcular'](contexto) for nome in features]).astype(np.float64)
+
+def calcular_features_lote(matriz, features=None):
+    """Calcula as features vibratórias de uma matriz (n_segmentos, tamanho_segmento)
+
+    Cada linha é um segmento. Retorna uma matriz (n_segmentos, n_features) com as
+    colunas na ordem de `features` — por padrão todas, na ordem de
+    COLUNAS_FEATURES_COMPLETAS — e os mesmos valores de
+    calcular_features_completas aplicada a cada linha.
+    """
+    return calcular_features_contexto(criar_contexto(matriz), features)
+
+def calcular_features_lote_irregular(segmentos, features=None):
+    """Calcula as features de uma lista de segmentos com tamanhos diferentes
+
+    Os segmentos são agrupados por tamanho, cada grupo é calculado em lote com
+    calcular_features_lote e as linhas voltam na ordem original da lista.
+    """
+    features = _validar_features(features)
+    segmentos = [np.asarray(segmento, dtype=np.float64) for segmento in segmentos]
+    resultado = np.empty((len(segmentos), len(features)), dtype=np.float64)
+
+    tamanhos = {}
+    for i, segmento in enumerate(segmentos):
+        tamanhos.setdefault(len(segmento), []).append(i)
+
+    for indices in tamanhos.values():
+        matriz = np.stack([segmentos[i] for i in indices])
+        resultado[indices] = calcular_features_lote(matriz, features)
+    return resultado
+
+def calcular_features_segmento(dados, features=None):
+    """Calcula as features de um único segmento e retorna {nome: valor}"""
+    features = _validar_features(features)
+    linha = calcular_features_lote(dados, features)[0]
+    resultado = dict(zip(features, linha.tolist()))
+    for coluna in COLUNAS_INTEIRAS:
+        if coluna in resultado:
+            resultado[coluna] = int(resultado[coluna])
+    return resultado
+
+def calcular_features_janelas(sinal, tamanho_janela, passo=None, features=None,
+                              politica_final='descartar', tamanho_minimo=None, janelas_por_bloco=1024):
+    """Calcula as features de cada janela deslizante de um sinal
+
+    As janelas completas são views do sinal (janelamento.janelas_deslizantes)
+    calculadas em blocos de até janelas_por_bloco linhas; o trecho final é
+    tratado conforme politica_final. `passo` padrão: janelas sem sobreposição.
+    Retorna uma matriz (n_janelas, n_features).
+    """
+    features = _validar_features(features)
+    passo = passo or tamanho_janela
+    sinal = np.asarray(sinal, dtype=np.float64)
+    blocos = [calcular_features_lote(bloco, features)
+              for bloco in iterar_blocos_janelas(sinal, tamanho_janela, passo, janelas_por_bloco)]
+    final = trecho_final(sinal, tamanho_janela, passo, politica_final, tamanho_minimo)
+    if final is not None:
+        blocos.append(calcular_features_lote(final, features))
+    if not blocos:
+        return np.empty((0, len(features)), dtype=np.float64)
+    return np.vstack(blocos)
+
+def linhas_features(matriz, features=None):
+    """Converte uma matriz de features em listas de valores Python, uma por linha
+
+    As colunas de COLUNAS_INTEIRAS voltam como int, como em
+    calcular_features_segmento.
+    """
+    features = _validar_features(features)
+    inteiras = [i for i, nome in enumerate(features) if nome in COLUNAS_INTEIRAS]
+    linhas = np.asarray(matriz).tolist()
+    for linha in linhas:
+        for i in inteiras:
+            linha[i] = int(linha[i])
+    return linhas
+
+# ============================================================================
+# ACUMULAÇÃO EM MATRIZ PRÉ-ALOCADA
+# ============================================================================
+
+# Linhas reservadas a cada crescimento da matriz acumulada
+LINHAS_POR_BLOCO = 4096
+
+def nova_matriz_acumulada(n_colunas, dtype=np.float64, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Acumulador de linhas de features: matriz tipada que cresce em blocos
+
+    Guarda as features em `dtype` (float64 ou float32) e os labels em int8,
+    lado a lado, sem uma lista Python por segmento. Em float32, valores fora
+    do alcance do tipo (momentos de ordem alta) viram ±inf.
+    """
+    return {
+        'dados': np.empty((linhas_por_bloco, n_colunas), dtype=dtype),
+        'labels': np.empty(linhas_por_bloco, dtype=np.int8),
+        'n': 0,
+        'linhas_por_bloco': linhas_por_bloco,
+    }
+
+def acrescentar_linhas(acumulador, linhas, label=0):
+    """Copia as linhas (matriz ou lista de listas) para o fim do acumulador
+
+    `label` é um valor para todas as linhas ou um por linha.
+    """
+    dados = acumulador['dados']
+    linhas = np.asarray(linhas, dtype=dados.dtype).reshape(-1, dados.shape[1])
+    inicio = acumulador['n']
+    fim = inicio + len(linhas)
+    if fim > len(dados):
+        # Cresce o número de blocos necessário de uma vez
+        bloco = acumulador['linhas_por_bloco']
+        capacidade = len(dados) + -(-(fim - len(dados)) // bloco) * bloco
+        novos_dados = np.empty((capacidade, dados.shape[1]), dtype=dados.dtype)
+        novos_dados[:inicio] = dados[:inicio]
+        novos_labels = np.empty(capacidade, dtype=np.int8)
+        novos_labels[:inicio] = acumulador['labels'][:inicio]
+        acumulador['dados'], acumulador['labels'] = novos_dados, novos_labels
+    acumulador['dados'][inicio:fim] = linhas
+    acumulador['labels'][inicio:fim] = label
+    acumulador['n'] = fim
+
+def finalizar_matriz_acumulada(acumulador):
+    """(matriz (n, n_colunas), labels) com as linhas acumuladas, sem a folga do último bloco"""
+    n = acumulador['n']
+    if n == len(acumulador['dados']):
+        return acumulador['dados'], acumulador['labels']
+    return acumulador['dados'][:n].copy(), acumulador['labels'][:n].copy()
@@ -0,0 +1,137 @@
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+from armazenamento_segmentos import armazenamento_existe, registro_segmento
+from processamento_paralelo import resolver_n_workers
+
+# ============================================================================
+# PERFIL DE EXECUÇÃO (opcional): tempo por etapa e por grupo de features
+# ============================================================================
+#
+# Desativado por padrão: etapa() devolve um contexto nulo e contar() retorna
+# de imediato. Ativado (ativar_perfil), mede tempo de relógio e de CPU de cada
+# etapa (descoberta, leitura, features, selecao, escrita), a vazão de
+# arquivos e bytes lidos e o pico de memória (tracemalloc). Com n_workers > 1
+# as etapas que rodam nos workers não são vistas pelo processo principal e o
+# trecho paralelo aparece como a etapa 'paralelo'; a vazão é contada no
+# processo principal nos dois casos.
+
+# Estado do perfil ativo (None quando desativado)
+_perfil = None
+_CONTEXTO_NULO = contextlib.nullcontext()
+
+def ativar_perfil(por_grupo=False):
+    """Começa a medir; com por_grupo, também o tempo de cada grupo de features"""
+    global _perfil
+    _perfil = {
+        'etapas': {},
+        'grupos': {},
+        'arquivos': 0,
+        'bytes': 0,
+        'por_grupo': por_grupo,
+        'inicio': time.perf_counter(),
+        'inicio_cpu': time.process_time(),
+    }
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+def desativar_perfil():
+    """Para de medir e descarta as medições"""
+    global _perfil
+    _perfil = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def perfil_ativo():
+    return _perfil is not None
+
+def perfil_por_grupo():
+    """Verifica se o tempo por grupo de features está sendo medido"""
+    return _perfil is not None and _perfil['por_grupo']
+
+@contextlib.contextmanager
+def _medir_etapa(nome):
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    try:
+        yield
+    finally:
+        medicao = _perfil['etapas'].setdefault(nome, {'wall_s': 0.0, 'cpu_s': 0.0, 'chamadas': 0})
+        medicao['wall_s'] += time.perf_counter() - inicio
+        medicao['cpu_s'] += time.process_time() - inicio_cpu
+        medicao['chamadas'] += 1
+
+def etapa(nome):
+    """Contexto que soma o tempo do bloco à etapa `nome` (nulo com o perfil desativado)"""
+    if _perfil is None:
+        return _CONTEXTO_NULO
+    return _medir_etapa(nome)
+
+def etapa_paralela(n_workers):
+    """Etapa 'paralelo' para um trecho distribuído entre processos; nula com um worker
+
+    Com um worker o trecho roda no processo atual e suas etapas internas já
+    são medidas.
+    """
+    if _perfil is None or resolver_n_workers(n_workers) == 1:
+        return _CONTEXTO_NULO
+    return _medir_etapa('paralelo')
+
+def medir_grupo(grupo, funcao, *args):
+    """Executa funcao(*args) somando o tempo ao grupo de features"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    _perfil['grupos'][grupo] = _perfil['grupos'].get(grupo, 0.0) + time.perf_counter() - inicio
+    return resultado
+
+def contar(arquivos=0, n_bytes=0):
+    """Soma arquivos e bytes lidos à vazão do perfil"""
+    if _perfil is None:
+        return
+    _perfil['arquivos'] += arquivos
+    _perfil['bytes'] += n_bytes
+
+def contar_leitura(pasta, arquivo):
+    """Conta um segmento lido: o tamanho do arquivo ou, no armazenamento binário, dos valores"""
+    if _perfil is None:
+        return
+    if armazenamento_existe(pasta):
+        registro, dados = registro_segmento(pasta, arquivo)
+        contar(1, dados.nbytes if registro is not None else 0)
+    else:
+        contar(1, os.path.getsize(os.path.join(pasta, arquivo)))
+
+def gerar_relatorio(**informacoes):
+    """Relatório do perfil ativo como dicionário (as informações extras vão em 'execucao')"""
+    total = time.perf_counter() - _perfil['inicio']
+    total_cpu = time.process_time() - _perfil['inicio_cpu']
+    etapas = _perfil['etapas']
+    # Vazão sobre o tempo das etapas que leem os dados (ou o total, sem elas)
+    tempo_leitura = sum(etapas[nome]['wall_s'] for nome in ('leitura', 'features', 'paralelo') if nome in etapas) or total
+    relatorio = {
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'execucao': informacoes,
+        'total': {'wall_s': total, 'cpu_s': total_cpu},
+        'etapas': etapas,
+        'vazao': {
+            'arquivos': _perfil['arquivos'],
+            'bytes': _perfil['bytes'],
+            'arquivos_por_s': _perfil['arquivos'] / tempo_leitura if tempo_leitura else None,
+            'mb_por_s': _perfil['bytes'] / 1e6 / tempo_leitura if tempo_leitura else None,
+        },
+        'memoria_pico_mb': tracemalloc.get_traced_memory()[1] / 1e6 if tracemalloc.is_tracing() else None,
+    }
+    if _perfil['por_grupo']:
+        relatorio['grupos_features_s'] = dict(_perfil['grupos'])
+    return relatorio
+
+def salvar_relatorio(caminho, **informacoes):
+    """Grava o relatório do perfil ativo em JSON e o retorna"""
+    relatorio = gerar_relatorio(**informacoes)
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2)
+    return relatorio
@@ -0,0 +1,474 @@
+import importlib
+import os
+import queue
+import shutil
+import threading
+import time
+
+# ============================================================================
+# ETAPAS DO PIPELINE SEM INTERFACE GRÁFICA
+# ============================================================================
+#
+# Segmentação, conversão e exportação dos resultados como funções comuns,
+# usadas pela interface (sistema_automatizado, sistema_segmentacao), pelo
+# conversor_csv.py e pela linha de comando (sistema_cli). Nada aqui importa
+# tkinter ou PIL; os erros são levantados (ou devolvidos) em vez de exibidos.
+
+PASTA_SEGMENTOS = 'resultados_segmentos'
+PASTA_CONVERTIDOS = 'dados_convertidos_csv'
+PASTA_FEATURES = 'features_extraidas'
+EXTENSOES_DADOS = ('.txt', '.csv')
+# Pastas apagadas pelo reset (apagar_resultados)
+PASTAS_RESULTADOS = (PASTA_SEGMENTOS, PASTA_FEATURES, PASTA_CONVERTIDOS)
+# Resultados exportados: CSVs e datasets colunares (o cache e os relatórios JSON ficam de fora)
+EXTENSOES_RESULTADOS = ('.csv', '.parquet', '.feather')
+
+# Sufixo da pasta em que um arquivo é segmentado antes de receber o nome final
+SUFIXO_PARCIAL = '.parcial'
+
+def resolver_pasta(pasta, nome_padrao):
+    """`pasta` ou, quando None, <diretório atual>/<nome_padrao> (resolvido na chamada, não na importação)"""
+    return pasta if pasta is not None else os.path.join(os.getcwd(), nome_padrao)
+
+def listar_arquivos_dados(caminho):
+    """Arquivos de dados (.txt, .csv) de um arquivo ou de uma pasta e suas subpastas"""
+    if os.path.isfile(caminho):
+        return [caminho]
+    arquivos = []
+    for root, dirs, files in os.walk(caminho):
+        for file in files:
+            if file.lower().endswith(EXTENSOES_DADOS):
+                arquivos.append(os.path.join(root, file))
+    return arquivos
+
+def nome_subpasta_livre(pasta_base, nome_arquivo):
+    """Nome da subpasta de resultados: o nome do arquivo, com sufixo _1, _2... se já existir"""
+    subpastas_existentes = [d for d in os.listdir(pasta_base) if os.path.isdir(os.path.join(pasta_base, d))]
+    subpasta_nome = nome_arquivo
+    if subpasta_nome in subpastas_existentes:
+        idx = 1
+        while f"{nome_arquivo}_{idx}" in subpastas_existentes:
+            idx += 1
+        subpasta_nome = f"{nome_arquivo}_{idx}"
+    return subpasta_nome
+
+def segmentar_arquivo(caminho_arquivo, n_segmentos, pasta_base, sobreposicao=0.0, exportar_texto=False,
+                      cancelar=None):
+    """Divide uma gravação em n_segmentos e grava o armazenamento binário
+
+    Com sobreposição os segmentos são janelas deslizantes de mesmo tamanho.
+    Com exportar_texto, cada segmento também é gravado como segmento_N.txt.
+    Tudo é gravado numa pasta <nome>.parcial, renomeada no fim: uma falha ou
+    um cancelamento (cancelar, um threading.Event) não deixa pasta pela metade.
+    A gravação é lida em blocos (nunca inteira na memória). Erros de leitura
+    são propagados; ValueError quando há mais segmentos que linhas. Retorna a pasta de saída, ou None quando cancelado.
+    """
+    from armazenamento_segmentos import contar_linhas, limites_segmentos, salvar_armazenamento_fluxo
+    from janelamento import limites_por_contagem
+
+    # Primeira passada só conta as linhas; a segunda grava em fluxo (memória constante)
+    total_linhas = contar_linhas(caminho_arquivo)
+    if n_segmentos > total_linhas:
+        raise ValueError(f"O número de segmentos é maior que o número de linhas do arquivo: {os.path.basename(caminho_arquivo)}.")
+    if sobreposicao > 0:
+        limites = limites_por_contagem(total_linhas, n_segmentos, sobreposicao)
+    else:
+        limites = limites_segmentos(total_linhas, n_segmentos)
+    # Organização dos resultados em subpastas
+    os.makedirs(pasta_base, exist_ok=True)
+    subpasta_nome = nome_subpasta_livre(pasta_base, os.path.splitext(os.path.basename(caminho_arquivo))[0])
+    pasta_saida = os.path.join(pasta_base, subpasta_nome)
+    pasta_parcial = pasta_saida + SUFIXO_PARCIAL
+    if os.path.exists(pasta_parcial):
+        shutil.rmtree(pasta_parcial)  # Sobra de uma execução interrompida
+    os.makedirs(pasta_parcial)
+    try:
+        # Um .npy contíguo + índice por gravação, em vez de um arquivo por segmento
+        concluido = salvar_armazenamento_fluxo(pasta_parcial, caminho_arquivo, limites, subpasta_nome,
+                                               exportar_texto=exportar_texto, cancelar=cancelar)
+        if not concluido:
+            shutil.rmtree(pasta_parcial)
+            return None
+    except BaseException:
+        shutil.rmtree(pasta_parcial, ignore_errors=True)
+        raise
+    os.rename(pasta_parcial, pasta_saida)
+    return pasta_saida
+
+def segmentar_arquivos(arquivos, n_segmentos, pasta_base, sobreposicao=0.0, exportar_texto=False):
+    """Segmenta cada arquivo; um arquivo com erro não interrompe os demais
+
+    Retorna (pastas_saida, erros), com erros = [(caminho, mensagem)].
+    """
+    if n_segmentos <= 0:
+        raise ValueError("Digite um número válido de segmentos.")
+    pastas_saida = []
+    erros = []
+    for caminho_arquivo in arquivos:
+        try:
+            pastas_saida.append(segmentar_arquivo(caminho_arquivo, n_segmentos, pasta_base, sobreposicao, exportar_texto))
+        except (OSError, ValueError) as e:
+            erros.append((caminho_arquivo, str(e)))
+    return pastas_saida, erros
+
+# ============================================================================
+# SEGMENTAÇÃO EM SEGUNDO PLANO (progresso numa fila, com cancelamento)
+# ============================================================================
+#
+# A interface não pode ler e gravar na thread do Tk: iniciar_segmentacao roda
+# a segmentação numa thread e publica eventos numa fila, que a interface lê
+# com janela.after (eventos_pendentes). Eventos:
+#   {'tipo': 'progresso', 'concluidos', 'total', 'arquivo', 'arquivos_por_s', 'eta_s'}
+#   {'tipo': 'erro', 'titulo', 'mensagem'}
+#   {'tipo': 'fim', 'pastas', 'cancelado'}
+
+def _executar_segmentacao(tarefa, arquivos, n_segmentos, pasta_base, sobreposicao, exportar_texto):
+    fila = tarefa['fila']
+    cancelar = tarefa['cancelar']
+    pastas_saida = []
+    # O tempo restante é estimado pelos bytes já lidos: os arquivos podem ter tamanhos bem diferentes
+    tamanhos = []
+    for caminho_arquivo in arquivos:
+        try:
+            tamanhos.append(os.path.getsize(caminho_arquivo))
+        except OSError:
+            tamanhos.append(0)
+    total_bytes = sum(tamanhos)
+    bytes_lidos = 0
+    inicio = time.perf_counter()
+    for concluidos, caminho_arquivo in enumerate(arquivos, 1):
+        if cancelar.is_set():
+            break
+        try:
+            pasta_saida = segmentar_arquivo(caminho_arquivo, n_segmentos, pasta_base, sobreposicao, exportar_texto,
+                                            cancelar)
+            if pasta_saida is not None:
+                pastas_saida.append(pasta_saida)
+        except (OSError, UnicodeDecodeError) as e:
+            fila.put({'tipo': 'erro', 'titulo': "Erro ao ler arquivo", 'mensagem': f"{caminho_arquivo}: {e}"})
+        except ValueError as e:
+            fila.put({'tipo': 'erro', 'titulo': "Erro", 'mensagem': str(e)})
+        except Exception as e:
+            fila.put({'tipo': 'erro', 'titulo': "Erro", 'mensagem': f"{caminho_arquivo}: {e}"})
+        bytes_lidos += tamanhos[concluidos - 1]
+        decorrido = time.perf_counter() - inicio
+        fila.put({
+            'tipo': 'progresso',
+            'concluidos': concluidos,
+            'total': len(arquivos),
+            'arquivo': os.path.basename(caminho_arquivo),
+            'arquivos_por_s': concluidos / decorrido if decorrido > 0 else None,
+            'eta_s': decorrido * (total_bytes - bytes_lidos) / bytes_lidos if bytes_lidos else None,
+        })
+    fila.put({'tipo': 'fim', 'pastas': pastas_saida, 'cancelado': cancelar.is_set()})
+
+def iniciar_segmentacao(arquivos, n_segmentos, pasta_base, sobreposicao=0.0, exportar_texto=False):
+    """Segmenta os arquivos numa thread e retorna a tarefa em andamento
+
+    A tarefa é um dicionário com a fila de eventos ('fila'), o evento de
+    cancelamento ('cancelar') e a thread ('thread').
+    """
+    tarefa = {'fila': queue.Queue(), 'cancelar': threading.Event()}
+    tarefa['thread'] = threading.Thread(
+        target=_executar_segmentacao,
+        args=(tarefa, list(arquivos), n_segmentos, pasta_base, sobreposicao, exportar_texto),
+        daemon=True)
+    tarefa['thread'].start()
+    return tarefa
+
+def cancelar_tarefa(tarefa):
+    """Pede o cancelamento: o arquivo em andamento é descartado e a tarefa termina com 'fim'"""
+    tarefa['cancelar'].set()
+
+def eventos_pendentes(tarefa):
+    """Eventos publicados desde a última leitura, sem bloquear"""
+    eventos = []
+    while True:
+        try:
+            eventos.append(tarefa['fila'].get_nowait())
+        except queue.Empty:
+            return eventos
+
+def formatar_duracao(segundos):
+    """Duração legível: '45 s', '3 min 05 s', '1 h 02 min'"""
+    if segundos is None:
+        return "calculando..."
+    segundos = int(round(segundos))
+    if segundos < 60:
+        return f"{segundos} s"
+    if segundos < 3600:
+        return f"{segundos // 60} min {segundos % 60:02d} s"
+    return f"{segundos // 3600} h {segundos % 3600 // 60:02d} min"
+
+# ============================================================================
+# CONVERSÃO E EXPORTAÇÃO
+# ============================================================================
+
+# Threads que materializam a pasta convertida (links e cópias pelo kernel liberam o GIL)
+THREADS_CONVERSAO = 8
+
+def segmentos_em_texto(pasta_segmentos):
+    """Subpastas só com segmentos em texto (sem armazenamento binário), que exigem conversão"""
+    from armazenamento_segmentos import armazenamento_existe
+
+    pastas = []
+    for root, dirs, files in os.walk(pasta_segmentos):
+        dirs[:] = [d for d in dirs if not d.endswith(SUFIXO_PARCIAL)]
+        if not armazenamento_existe(root) and any(file.lower().endswith('.txt') for file in files):
+            pastas.append(root)
+    return pastas
+
+def _possui_armazenamento(pasta_segmentos):
+    from armazenamento_segmentos import armazenamento_existe
+
+    for root, dirs, _ in os.walk(pasta_segmentos):
+        dirs[:] = [d for d in dirs if not d.endswith(SUFIXO_PARCIAL)]
+        if armazenamento_existe(root):
+            return True
+    return False
+
+def pasta_extracao(pasta_segmentos, pasta_convertidos):
+    """Pasta que os extratores devem ler
+
+    Os extratores leem o armazenamento binário direto de resultados_segmentos;
+    pasta_convertidos é usada quando não há nenhum armazenamento ali (pasta
+    ausente ou vazia) ou quando há segmentações antigas, apenas em texto, que
+    precisam de conversão (converter_segmentos).
+    """
+    if _possui_armazenamento(pasta_segmentos) and not segmentos_em_texto(pasta_segmentos):
+        return pasta_segmentos
+    return pasta_convertidos
+
+def _materializar_arquivo(origem, destino):
+    # Destino atualizado: o mesmo arquivo (hardlink) ou cópia com tamanho e mtime iguais
+    if os.path.exists(destino):
+        estado_origem = os.stat(origem)
+        estado_destino = os.stat(destino)
+        if os.path.samestat(estado_origem, estado_destino) or (
+                estado_origem.st_size == estado_destino.st_size
+                and estado_origem.st_mtime_ns == estado_destino.st_mtime_ns):
+            return False
+        os.remove(destino)
+    try:
+        os.link(origem, destino)
+    except OSError:
+        # Outro sistema de arquivos ou sem hardlinks: shutil.copy2 copia pelo
+        # kernel (sendfile) e preserva o mtime usado na comparação acima
+        shutil.copy2(origem, destino)
+    return True
+
+def converter_segmentos(pasta_origem, pasta_destino, n_threads=THREADS_CONVERSAO):
+    """Materializa os segmentos na pasta lida pelos extratores
+
+    Armazenamentos binários mantêm os nomes; segmentos em texto (.txt)
+    aparecem como .csv com o mesmo conteúdo. A estrutura de subpastas é
+    mantida. Cada arquivo é um hardlink para o original (ou uma cópia feita
+    pelo kernel, quando o link não é possível), criados em paralelo; destinos
+    já atualizados são mantidos. Retorna a pasta de destino.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from armazenamento_segmentos import ARQUIVO_INDICE, ARQUIVO_SINAL, liberar_armazenamentos
+
+    # Destinos desatualizados são removidos e recriados: nenhum pode continuar em memory-map
+    liberar_armazenamentos(pasta_destino)
+    os.makedirs(pasta_destino, exist_ok=True)
+    origens = []
+    destinos = []
+    for root, dirs, files in os.walk(pasta_origem):
+        # Segmentações em andamento ou interrompidas ficam de fora
+        dirs[:] = [d for d in dirs if not d.endswith(SUFIXO_PARCIAL)]
+        pasta_saida = os.path.join(pasta_destino, os.path.relpath(root, pasta_origem))
+        for file in files:
+            if file in (ARQUIVO_SINAL, ARQUIVO_INDICE):
+                nome_saida = file
+            elif file.lower().endswith('.txt'):
+                nome_saida = os.path.splitext(file)[0] + '.csv'
+            else:
+                continue
+            os.makedirs(pasta_saida, exist_ok=True)
+            origens.append(os.path.join(root, file))
+            destinos.append(os.path.join(pasta_saida, nome_saida))
+    if n_threads <= 1 or len(origens) <= 1:
+        for origem, destino in zip(origens, destinos):
+            _materializar_arquivo(origem, destino)
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            # list() propaga o primeiro erro
+            list(executor.map(_materializar_arquivo, origens, destinos))
+    return pasta_destino
+
+def apagar_resultados(pasta_base=None):
+    """Apaga as pastas de PASTAS_RESULTADOS em pasta_base (padrão: diretório atual)
+
+    Retorna (apagadas, erros), com erros = [(pasta, mensagem)]; pastas que
+    não existem não aparecem em nenhuma das listas.
+    """
+    from armazenamento_segmentos import liberar_armazenamentos
+
+    pasta_base = pasta_base or os.getcwd()
+    apagadas = []
+    erros = []
+    for nome in PASTAS_RESULTADOS:
+        pasta = os.path.join(pasta_base, nome)
+        if not os.path.exists(pasta):
+            continue
+        liberar_armazenamentos(pasta)
+        try:
+            shutil.rmtree(pasta)
+            apagadas.append(pasta)
+        except OSError as e:
+            erros.append((pasta, str(e)))
+    return apagadas, erros
+
+def copiar_pasta_resultados(pasta_origem, destino):
+    """Copia a pasta inteira para destino/<nome da pasta>, substituindo uma cópia anterior
+
+    Retorna o caminho da cópia.
+    """
+    if not os.path.exists(pasta_origem):
+        raise FileNotFoundError(f"A pasta '{os.path.basename(pasta_origem)}' não existe.")
+    nome_pasta_final = os.path.join(destino, os.path.basename(os.path.normpath(pasta_origem)))
+    # Se já existir, remover para evitar duplicidade
+    if os.path.exists(nome_pasta_final):
+        from armazenamento_segmentos import liberar_armazenamentos
+        liberar_armazenamentos(nome_pasta_final)
+        shutil.rmtree(nome_pasta_final)
+    shutil.copytree(pasta_origem, nome_pasta_final)
+    return nome_pasta_final
+
+def copiar_arquivos_resultados(pasta_origem, destino, extensoes=EXTENSOES_RESULTADOS):
+    """Copia para destino/<nome da pasta> só os arquivos com as extensões dadas
+
+    A estrutura de subpastas é mantida e arquivos de mesmo nome são
+    sobrescritos. Retorna o caminho da cópia.
+    """
+    if not os.path.exists(pasta_origem):
+        raise FileNotFoundError("A pasta de features extraídas não foi encontrada!")
+    pasta_destino = os.path.join(destino, os.path.basename(os.path.normpath(pasta_origem)))
+    os.makedirs(pasta_destino, exist_ok=True)
+    # Copia todos os arquivos e subpastas mantendo a estrutura
+    for root, dirs, files in os.walk(pasta_origem):
+        rel_path = os.path.relpath(root, pasta_origem)
+        destino_atual = os.path.join(pasta_destino, rel_path)
+        os.makedirs(destino_atual, exist_ok=True)
+        for file in files:
+            if file.lower().endswith(extensoes):
+                shutil.copy2(os.path.join(root, file), os.path.join(destino_atual, file))
+    return pasta_destino
+
+# ============================================================================
+# EXECUTOR PERSISTENTE DAS ETAPAS (conversão e extração sem subprocessos)
+# ============================================================================
+#
+# Em vez de um novo interpretador para cada extração (que reimporta numpy,
+# pandas e scikit-learn a cada clique), a interface mantém uma thread de vida
+# longa que executa as etapas como chamadas de função. Os módulos pesados são
+# importados uma vez, em segundo plano, quando o executor é criado. Os pedidos
+# são atendidos na ordem de chegada e as etapas de um pedido em sequência; um
+# pedido que depende de outro (depende_de) não roda se aquele falhou. Cada
+# pedido tem sua própria fila de eventos (eventos_pendentes):
+#   {'tipo': 'etapa', 'descricao', 'indice', 'total'}
+#   {'tipo': 'concluida', 'descricao', 'indice', 'total', 'duracao_s'}
+#   {'tipo': 'erro', 'descricao', 'mensagem'}
+#   {'tipo': 'fim', 'ok'}
+
+# Importados em segundo plano ao criar o executor da interface
+MODULOS_EXTRACAO = ('numpy', 'pandas', 'sklearn.preprocessing', 'relieff_nativo',
+                    'metodo_relief', 'features_sem_relief')
+
+def _pre_carregar(modulos):
+    for nome in modulos:
+        try:
+            importlib.import_module(nome)
+        except ImportError as e:
+            # O erro reaparece, com a mensagem completa, na etapa que usar o módulo
+            print(f"Aviso: não foi possível pré-carregar {nome}: {e}")
+
+def _executar_pedido(pedido):
+    fila = pedido['fila']
+    dependencia = pedido['depende_de']
+    # Os pedidos são atendidos em ordem: a dependência já terminou
+    if dependencia is not None and not dependencia['ok']:
+        pedido['erro'] = f"Não executado: {dependencia['erro']}"
+        fila.put({'tipo': 'erro', 'descricao': pedido['etapas'][0][0], 'mensagem': pedido['erro']})
+        return False
+    total = len(pedido['etapas'])
+    for indice, (descricao, funcao, argumentos) in enumerate(pedido['etapas'], 1):
+        fila.put({'tipo': 'etapa', 'descricao': descricao, 'indice': indice, 'total': total})
+        inicio = time.perf_counter()
+        try:
+            funcao(*argumentos)
+        except Exception as e:
+            pedido['erro'] = f"{descricao}: {str(e) or type(e).__name__}"
+            fila.put({'tipo': 'erro', 'descricao': descricao, 'mensagem': pedido['erro']})
+            return False
+        fila.put({'tipo': 'concluida', 'descricao': descricao, 'indice': indice, 'total': total,
+                  'duracao_s': time.perf_counter() - inicio})
+    return True
+
+def _atender_pedidos(executor, modulos):
+    _pre_carregar(modulos)
+    while True:
+        pedido = executor['pedidos'].get()
+        if pedido is None:
+            return
+        pedido['ok'] = _executar_pedido(pedido)
+        pedido['fila'].put({'tipo': 'fim', 'ok': pedido['ok']})
+
+def iniciar_executor_etapas(modulos=MODULOS_EXTRACAO):
+    """Cria o executor persistente e começa a importar os módulos em segundo plano
+
+    O executor é um dicionário com a fila de pedidos ('pedidos') e a thread
+    que os atende ('thread').
+    """
+    executor = {'pedidos': queue.Queue()}
+    executor['thread'] = threading.Thread(target=_atender_pedidos, args=(executor, tuple(modulos)), daemon=True)
+    executor['thread'].start()
+    return executor
+
+def enviar_etapas(executor, etapas, depende_de=None):
+    """Agenda as etapas [(descricao, funcao, argumentos), ...] e retorna o pedido
+
+    O pedido é um dicionário com a fila de eventos ('fila') e, quando
+    terminar, o resultado ('ok') e a mensagem da falha ('erro'). Com depende_de, as etapas só rodam se o
+    pedido indicado (enviado antes) terminou sem erro.
+    """
+    pedido = {'fila': queue.Queue(), 'etapas': list(etapas), 'depende_de': depende_de, 'ok': None, 'erro': None}
+    executor['pedidos'].put(pedido)
+    return pedido
+
+def encerrar_executor(executor, esperar=True):
+    """Atende os pedidos já enviados e encerra a thread do executor"""
+    executor['pedidos'].put(None)
+    if esperar:
+        executor['thread'].join()
+
+def extrair_com_relief(pasta_dados=None, pasta_features=None, n_workers=1):
+    """Extração com ReliefF (metodo_relief) como etapa; erro quando não há segmentos válidos
+
+    Os memory-maps abertos pela extração são fechados ao fim da etapa.
+    """
+    import metodo_relief
+    from armazenamento_segmentos import liberar_armazenamentos
+    pasta_dados = resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)
+    if not os.path.exists(pasta_dados):
+        raise FileNotFoundError(f"Pasta de dados não encontrada: {pasta_dados}")
+    try:
+        todas_features, _, _ = metodo_relief.executar_pipeline_relief(n_workers, pasta_dados=pasta_dados,
+                                                                       pasta_features=pasta_features)
+    finally:
+        liberar_armazenamentos(pasta_dados)
+    if len(todas_features) == 0:
+        raise ValueError("Nenhum segmento válido encontrado para extração de features.")
+
+def extrair_sem_relief(pasta_dados=None, pasta_features=None, n_workers=1):
+    """Extração de todas as features (features_sem_relief) como etapa; fecha os memory-maps ao fim"""
+    import features_sem_relief
+    from armazenamento_segmentos import liberar_armazenamentos
+    pasta_dados = resolver_pasta(pasta_dados, PASTA_CONVERTIDOS)
+    if not os.path.exists(pasta_dados):
+        raise FileNotFoundError(f"Pasta de dados não encontrada: {pasta_dados}")
+    try:
+        features_sem_relief.main(n_workers, pasta_dados=pasta_dados, pasta_features=pasta_features)
+    finally:
+        liberar_armazenamentos(pasta_dados)
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import os
+import sys
+
+# ============================================================================
+# EXECUÇÃO EM PARALELO COM ORDEM DETERMINÍSTICA
+# ============================================================================
+
+# Lotes por worker: equilibra a carga sem criar tarefas pequenas demais
+LOTES_POR_WORKER = 4
+
+# Itens por lote enviado a um worker; None divide em LOTES_POR_WORKER lotes por worker
+TAMANHO_LOTE = None
+
+def resolver_n_workers(n_workers):
+    """Número efetivo de workers (None ou 0 usa todos os núcleos da máquina)"""
+    if not n_workers:
+        return os.cpu_count() or 1
+    return max(1, int(n_workers))
+
+def dividir_em_lotes(itens, n_workers, tamanho_lote=None):
+    """Divide a lista de itens em lotes contíguos, LOTES_POR_WORKER por worker
+
+    Com tamanho_lote (ou TAMANHO_LOTE) definido, os lotes têm esse número de itens.
+    """
+    itens = list(itens)
+    tamanho_lote = tamanho_lote or TAMANHO_LOTE
+    if tamanho_lote:
+        tamanho = max(1, int(tamanho_lote))
+    else:
+        n_lotes = resolver_n_workers(n_workers) * LOTES_POR_WORKER
+        tamanho = max(1, -(-len(itens) // n_lotes))
+    return [itens[i:i + tamanho] for i in range(0, len(itens), tamanho)]
+
+def _executar_lote(funcao, lote):
+    """Executa funcao em cada item do lote, num worker, guardando o texto impresso"""
+    resultados = []
+    for item in lote:
+        saida = io.StringIO()
+        with contextlib.redirect_stdout(saida):
+            resultado = funcao(item)
+        resultados.append((resultado, saida.getvalue()))
+    return resultados
+
+def mapear_em_ordem(funcao, itens, n_workers=1, tamanho_lote=None):
+    """Aplica `funcao` a cada item e gera (item, resultado) na ordem original
+
+    Com n_workers == 1 tudo roda no processo atual, como antes. Com mais workers
+    os itens são divididos em lotes distribuídos num ProcessPoolExecutor e cada
+    worker devolve os resultados do lote de uma vez; o que cada chamada imprime
+    é capturado no worker e reimpresso aqui na ordem dos itens, de forma que a
+    saída e os resultados são os mesmos da execução serial. `funcao` precisa ser
+    uma função de módulo (serializável) e deve tratar os próprios erros.
+    tamanho_lote fixa o número de itens por lote (padrão: TAMANHO_LOTE).
+    """
+    itens = list(itens)
+    n_workers = min(resolver_n_workers(n_workers), len(itens))
+    if n_workers <= 1:
+        for item in itens:
+            yield item, funcao(item)
+        return
+
+    # Importado só aqui: a execução serial não carrega o multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    lotes = dividir_em_lotes(itens, n_workers, tamanho_lote)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futuros = [executor.submit(_executar_lote, funcao, lote) for lote in lotes]
+        for lote, futuro in zip(lotes, futuros):
+            for item, (resultado, texto) in zip(lote, futuro.result()):
+                sys.stdout.write(texto)
+                yield item, resultado
@@ -0,0 +1,256 @@
+import math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from scipy.spatial.distance import cdist
+from processamento_paralelo import resolver_n_workers
+
+# ============================================================================
+# RELIEFF VETORIZADO COM DISTÂNCIAS EM BLOCOS
+# ============================================================================
+#
+# Mesma formulação do skrebate.ReliefF para labels binários:
+#   - features com até LIMIAR_CATEGORICO valores distintos são categóricas;
+#   - distância: cityblock sobre as features contínuas normalizadas para [0, 1]
+#     (mais hamming * n_features sobre as categóricas, em dados mistos);
+#   - para cada amostra, os k vizinhos mais próximos da mesma classe (hits) e
+#     da outra classe (misses);
+#   - diferença por feature: |x - x_vizinho| / (max - min) nas contínuas
+#     (1 acima do desvio padrão, em dados mistos) e x != x_vizinho nas
+#     categóricas; score += (-média dos hits + média dos misses) / n.
+# A matriz de distâncias nunca é montada inteira: cada bloco de linhas ocupa
+# no máximo MEMORIA_BLOCO bytes (O(bloco × n) em vez de O(n²)). Os blocos são
+# independentes e podem ser calculados em threads (o cdist e o argpartition
+# liberam o GIL); as contribuições são somadas na ordem dos blocos, então o
+# resultado é o mesmo para qualquer n_jobs.
+
+LIMIAR_CATEGORICO = 10
+MEMORIA_BLOCO = 64 * 1024 * 1024
+
+def _informacoes_features(X, limiar_categorico):
+    """Tipo de cada feature e, nas contínuas, mínimo, amplitude e desvio padrão"""
+    continuas = np.array([len(np.unique(X[:, j])) > limiar_categorico for j in range(X.shape[1])], dtype=bool)
+    minimo = X.min(axis=0)
+    amplitude = X.max(axis=0) - minimo
+    desvio = X.std(axis=0)
+    if continuas.all():
+        tipo_dados = 'continuous'
+    elif continuas.any():
+        tipo_dados = 'mixed'
+    else:
+        tipo_dados = 'categorical'
+    return continuas, minimo, amplitude, desvio, tipo_dados
+
+def _distancias_bloco(linhas, xc, xd, n_features, tipo_dados):
+    """Distâncias (len(linhas), n) das amostras `linhas` a todas as amostras"""
+    if tipo_dados == 'categorical':
+        return cdist(xd[linhas], xd, metric='hamming')
+    distancias = cdist(xc[linhas], xc, metric='cityblock')
+    if tipo_dados == 'mixed':
+        distancias += cdist(xd[linhas], xd, metric='hamming') * n_features
+    return distancias
+
+def _k_menores(distancias, k):
+    """Índices (por linha) das k menores distâncias, sem ordem garantida"""
+    if k == 0:
+        return np.empty((distancias.shape[0], 0), dtype=np.intp)
+    if k >= distancias.shape[1]:
+        return np.broadcast_to(np.arange(distancias.shape[1]), distancias.shape).copy()
+    return np.argpartition(distancias, k - 1, axis=1)[:, :k]
+
+def _soma_diferencas(X, linhas, vizinhos, continuas, amplitude, desvio, tipo_dados):
+    """Soma, por linha e por feature, das diferenças para os vizinhos (linhas, k)"""
+    if vizinhos.shape[1] == 0:
+        return np.zeros((len(linhas), X.shape[1]))
+    x_linhas = X[linhas][:, None, :]
+    x_vizinhos = X[vizinhos]
+    bruta = np.abs(x_linhas - x_vizinhos)
+    amplitude_segura = np.where(continuas, amplitude, 1.0)
+    diferenca = bruta / amplitude_segura
+    if tipo_dados == 'mixed':
+        diferenca = np.where(bruta > desvio, 1.0, diferenca)
+    diferenca = np.where(continuas, diferenca, x_linhas != x_vizinhos)
+    return diferenca.sum(axis=1)
+
+def _preparar(X, y, n_vizinhos, limiar_categorico):
+    """Valida a entrada e monta os dados compartilhados pelos blocos"""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    classes = np.unique(y)
+    if len(classes) == 1:
+        raise ValueError("Todos os labels são da mesma classe")
+    if len(classes) != 2:
+        raise ValueError(f"O ReliefF nativo aceita apenas labels binários ({len(classes)} classes encontradas)")
+    if np.isnan(X).any():
+        raise ValueError("A matriz de features contém valores ausentes (NaN)")
+
+    continuas, minimo, amplitude, desvio, tipo_dados = _informacoes_features(X, limiar_categorico)
+    # Linhas contíguas: o cdist percorre cada amostra em sequência
+    xc = np.ascontiguousarray((X[:, continuas] - minimo[continuas]) / amplitude[continuas])
+    xd = np.ascontiguousarray(X[:, ~continuas])
+
+    # Posição de cada amostra entre as amostras da sua classe
+    membros = {classe: np.flatnonzero(y == classe) for classe in classes}
+    posicao_na_classe = np.empty(len(y), dtype=np.intp)
+    for indices in membros.values():
+        posicao_na_classe[indices] = np.arange(len(indices))
+    return X, y, xc, xd, membros, posicao_na_classe, continuas, amplitude, desvio, tipo_dados, n_vizinhos
+
+def _contribuicoes_bloco(linhas, dados):
+    """Contribuição (antes de dividir pelo número de amostras) de cada amostra de `linhas`
+
+    Retorna uma matriz (len(linhas), n_features).
+    """
+    X, y, xc, xd, membros, posicao_na_classe, continuas, amplitude, desvio, tipo_dados, n_vizinhos = dados
+    distancias = _distancias_bloco(linhas, xc, xd, X.shape[1], tipo_dados)
+
+    contribuicoes = np.zeros((len(linhas), X.shape[1]))
+    for classe, indices_classe in membros.items():
+        no_bloco = np.flatnonzero(y[linhas] == classe)
+        if len(no_bloco) == 0:
+            continue
+        linhas_classe = linhas[no_bloco]
+        indices_outras = np.flatnonzero(y != classe)
+        distancias_linhas = distancias[no_bloco]
+
+        # Hits: a própria amostra fica por último (distância infinita). Com
+        # menos de k vizinhos na classe ela entra na contagem, como no skrebate
+        distancias_hits = distancias_linhas[:, indices_classe]
+        distancias_hits[np.arange(len(linhas_classe)), posicao_na_classe[linhas_classe]] = np.inf
+        k_hits = min(n_vizinhos, len(indices_classe) - 1)
+        hits = indices_classe[_k_menores(distancias_hits, k_hits)]
+        contagem_hits = min(n_vizinhos, len(indices_classe))
+
+        k_misses = min(n_vizinhos, len(indices_outras))
+        misses = indices_outras[_k_menores(distancias_linhas[:, indices_outras], k_misses)]
+
+        soma_hits = _soma_diferencas(X, linhas_classe, hits, continuas, amplitude, desvio, tipo_dados)
+        soma_misses = _soma_diferencas(X, linhas_classe, misses, continuas, amplitude, desvio, tipo_dados)
+        contribuicoes[no_bloco] = soma_misses / k_misses - soma_hits / contagem_hits
+    return contribuicoes
+
+def _mapear_blocos(funcao, blocos, dados, n_jobs):
+    """Aplica funcao(bloco, dados) a cada bloco, em threads, devolvendo na ordem dos blocos"""
+    n_jobs = min(resolver_n_workers(n_jobs), len(blocos))
+    if n_jobs <= 1:
+        for bloco in blocos:
+            yield funcao(bloco, dados)
+        return
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        # map devolve os blocos na ordem de submissão: soma determinística
+        yield from executor.map(funcao, blocos, [dados] * len(blocos))
+
+def _dividir_em_blocos(linhas, n_amostras, memoria_bloco):
+    """Divide as amostras alvo em blocos de no máximo memoria_bloco bytes de distâncias"""
+    linhas_por_bloco = max(1, int(memoria_bloco // (8 * n_amostras)))
+    return [linhas[i:i + linhas_por_bloco] for i in range(0, len(linhas), linhas_por_bloco)]
+
+def calcular_scores_relieff(X, y, n_vizinhos=10, limiar_categorico=LIMIAR_CATEGORICO,
+                            memoria_bloco=MEMORIA_BLOCO, n_jobs=1):
+    """Scores ReliefF de cada coluna de X para labels binários y
+
+    Reproduz skrebate.ReliefF(n_neighbors=n_vizinhos).feature_importances_
+    sobre a mesma entrada (dados sem valores ausentes), a menos de empates
+    de distância e arredondamento. Com n_jobs > 1 (None ou 0: todos os
+    núcleos) os blocos são calculados em threads, cada uma com seu bloco de
+    distâncias em memória. Levanta ValueError se y não tiver exatamente duas
+    classes ou se X tiver valores ausentes.
+    """
+    dados = _preparar(X, y, n_vizinhos, limiar_categorico)
+    n_amostras, n_features = dados[0].shape
+    blocos = _dividir_em_blocos(np.arange(n_amostras), n_amostras, memoria_bloco)
+
+    scores = np.zeros(n_features)
+    for contribuicoes in _mapear_blocos(_contribuicoes_bloco, blocos, dados, n_jobs):
+        scores += (contribuicoes / n_amostras).sum(axis=0)
+    return scores
+
+# ============================================================================
+# RELIEFF APROXIMADO (AMOSTRAGEM ESTRATIFICADA E PARADA POR CONVERGÊNCIA)
+# ============================================================================
+
+def ordem_estratificada(estratos, semente=0):
+    """Permutação das amostras em que todo prefixo é uma amostra estratificada
+
+    Cada estrato é embaralhado e seus elementos recebem as posições
+    (i + u) / tamanho_do_estrato, u uniforme em [0, 1); a ordenação global por
+    essa posição intercala os estratos na proporção dos seus tamanhos.
+    """
+    estratos = np.asarray(estratos)
+    rng = np.random.default_rng(semente)
+    posicoes = np.empty(len(estratos))
+    for estrato in np.unique(estratos):
+        indices = np.flatnonzero(estratos == estrato)
+        embaralhados = rng.permutation(indices)
+        posicoes[embaralhados] = (np.arange(len(indices)) + rng.random(len(indices))) / len(indices)
+    return np.argsort(posicoes, kind='stable')
+
+def _confianca_top(scores, erro_padrao, top_k):
+    """Probabilidade (aproximação normal) de a k-ésima feature continuar acima da (k+1)-ésima"""
+    if top_k >= len(scores):
+        return 1.0
+    ordem = np.argsort(scores)[::-1]
+    k, seguinte = ordem[top_k - 1], ordem[top_k]
+    erro = math.sqrt(erro_padrao[k] ** 2 + erro_padrao[seguinte] ** 2)
+    if erro == 0:
+        return 1.0
+    z = (scores[k] - scores[seguinte]) / erro
+    return 0.5 * (1 + math.erf(z / math.sqrt(2)))
+
+def calcular_scores_relieff_aproximado(X, y, estratos=None, n_vizinhos=10, top_k=10,
+                                       tamanho_inicial=1000, fator_crescimento=2.0, estabilidade=2,
+                                       semente=0, limiar_categorico=LIMIAR_CATEGORICO,
+                                       memoria_bloco=MEMORIA_BLOCO, n_jobs=1):
+    """ReliefF sobre uma amostra estratificada crescente de instâncias alvo
+
+    Só m instâncias (amostra estratificada por `estratos`, por padrão os
+    labels) são pontuadas, com vizinhos buscados entre todas as amostras. m
+    começa em tamanho_inicial e é multiplicado por fator_crescimento até o
+    conjunto das top_k features se repetir em `estabilidade` incrementos
+    seguidos (ou até m = n, quando o resultado é o do ReliefF exato). Cada
+    incremento só pontua as instâncias novas. O resultado é o mesmo para a
+    mesma semente, com qualquer n_jobs.
+
+    Retorna (scores, info), com info = {'amostras_usadas', 'total_amostras',
+    'incrementos', 'convergiu', 'confianca_top'}; confianca_top estima, pelo
+    erro padrão das contribuições, a probabilidade de a fronteira do top_k não
+    mudar com mais amostras.
+    """
+    dados = _preparar(X, y, n_vizinhos, limiar_categorico)
+    n_amostras, n_features = dados[0].shape
+    ordem = ordem_estratificada(dados[1] if estratos is None else estratos, semente)
+
+    soma = np.zeros(n_features)
+    soma_quadrados = np.zeros(n_features)
+    usadas = 0
+    incrementos = 0
+    repeticoes = 0
+    top_anterior = None
+    alvo = min(tamanho_inicial, n_amostras)
+    while True:
+        blocos = _dividir_em_blocos(ordem[usadas:alvo], n_amostras, memoria_bloco)
+        for contribuicoes in _mapear_blocos(_contribuicoes_bloco, blocos, dados, n_jobs):
+            soma += contribuicoes.sum(axis=0)
+            soma_quadrados += (contribuicoes ** 2).sum(axis=0)
+        usadas = alvo
+        incrementos += 1
+
+        scores = soma / usadas
+        top = set(np.argsort(scores)[::-1][:top_k].tolist())
+        repeticoes = repeticoes + 1 if top == top_anterior else 0
+        top_anterior = top
+        if repeticoes >= estabilidade or usadas == n_amostras:
+            break
+        alvo = min(n_amostras, max(usadas + 1, int(usadas * fator_crescimento)))
+
+    variancia = np.maximum(soma_quadrados / usadas - scores ** 2, 0)
+    erro_padrao = np.sqrt(variancia / usadas)
+    if usadas == n_amostras:
+        erro_padrao = np.zeros(n_features)  # Todas as instâncias: não há erro de amostragem
+    info = {
+        'amostras_usadas': usadas,
+        'total_amostras': n_amostras,
+        'incrementos': incrementos,
+        'convergiu': repeticoes >= estabilidade,
+        'confianca_top': _confianca_top(scores, erro_padrao, top_k),
+    }
+    return scores, info
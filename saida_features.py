@@ -0,0 +1,141 @@
+import os
+import shutil
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================================
+# SAÍDA COLUNAR DE FEATURES (Parquet/Feather particionado por condição)
+# ============================================================================
+#
+# Em vez de um CSV por segmento, as features de todos os segmentos vão para um
+# único dataset gravado de uma vez, com uma subpasta por condição:
+#   features_por_segmento.parquet/condicao=97_Normal_0/part-0.parquet
+# A extensão da pasta indica o formato. O pyarrow é opcional: sem ele, o
+# formato padrão continua sendo um CSV por segmento.
+
+FORMATOS_SAIDA = ('csv', 'parquet', 'feather')
+COLUNA_PARTICAO = 'condicao'
+
+def pyarrow_disponivel():
+    """Verifica se o pyarrow está instalado"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def formato_padrao():
+    """'parquet' quando o pyarrow está instalado, senão 'csv' (um arquivo por segmento)"""
+    return 'parquet' if pyarrow_disponivel() else 'csv'
+
+def validar_formato(formato):
+    """Confere o formato pedido; Parquet e Feather exigem o pyarrow"""
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de saída desconhecido: {formato} (use {', '.join(FORMATOS_SAIDA)})")
+    if formato != 'csv' and not pyarrow_disponivel():
+        raise ImportError(f"O formato {formato} requer o pyarrow (pip install pyarrow); use o formato csv")
+
+def caminho_dataset(pasta_base, nome, formato):
+    """Pasta do dataset: <pasta_base>/<nome>.<formato>"""
+    return os.path.join(pasta_base, f'{nome}.{formato}')
+
+def _particionamento(ds, pa):
+    # Condição sempre como texto (uma pasta "97" não vira inteiro na leitura)
+    return ds.partitioning(pa.schema([(COLUNA_PARTICAO, pa.string())]), flavor='hive')
+
+def salvar_dataset(df, pasta_dataset, formato='parquet', float32=False):
+    """Grava o DataFrame como dataset particionado por condição, numa única chamada
+
+    O dataset anterior na mesma pasta é substituído. Com float32, as colunas
+    float64 são gravadas em float32 (metade do espaço; inteiros e textos não
+    mudam). Retorna o número de linhas gravadas.
+    """
+    validar_formato(formato)
+    if formato == 'csv':
+        raise ValueError("salvar_dataset grava apenas parquet ou feather")
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if float32:
+        df = df.astype({coluna: 'float32' for coluna in df.columns if df[coluna].dtype == 'float64'})
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+
+    if os.path.isdir(pasta_dataset):
+        shutil.rmtree(pasta_dataset)
+    ds.write_dataset(
+        tabela, pasta_dataset,
+        format=formato,
+        partitioning=_particionamento(ds, pa),
+        basename_template=f'part-{{i}}.{formato}',
+        max_partitions=max(1024, df[COLUNA_PARTICAO].nunique()),
+    )
+    return len(df)
+
+def carregar_dataset(pasta_dataset, condicoes=None, colunas=None):
+    """Lê um dataset gravado por salvar_dataset como DataFrame
+
+    O formato vem da extensão da pasta. `condicoes` restringe a leitura às
+    partições pedidas e `colunas` às colunas pedidas; a coluna condicao volta
+    como texto, no fim do DataFrame.
+    """
+    formato = os.path.splitext(pasta_dataset.rstrip(os.sep))[1].lstrip('.')
+    validar_formato(formato)
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(pasta_dataset, format=formato, partitioning=_particionamento(ds, pa))
+    filtro = None
+    if condicoes is not None:
+        filtro = ds.field(COLUNA_PARTICAO).isin(list(condicoes))
+    return dataset.to_table(columns=colunas, filter=filtro).to_pandas()
+
+# ============================================================================
+# CSVs POR SEGMENTO EM LOTE (mesmos bytes do DataFrame.to_csv)
+# ============================================================================
+
+# Threads de gravação dos arquivos por segmento (a escrita libera o GIL)
+THREADS_ESCRITA = 8
+
+def campo_csv(texto):
+    """Campo de texto com as aspas que o csv do pandas usaria (QUOTE_MINIMAL)"""
+    texto = str(texto)
+    if any(caractere in texto for caractere in ',"\r\n'):
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+def formatar_matriz_csv(matriz, indices_inteiros=()):
+    """Linhas de texto da matriz como DataFrame.to_csv grava
+
+    Os floats são formatados de uma vez (astype(str), o mesmo caminho do
+    pandas), NaN vira campo vazio e as colunas em indices_inteiros são
+    escritas como inteiros.
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+    textos = matriz.astype(str)
+    textos[np.isnan(matriz)] = ''
+    for indice in indices_inteiros:
+        textos[:, indice] = matriz[:, indice].astype(np.int64).astype(str)
+    return [','.join(linha) for linha in textos.tolist()]
+
+def _gravar_texto(caminho, texto):
+    try:
+        with open(caminho, 'w', encoding='utf-8', newline='') as f:
+            f.write(texto)
+        return None
+    except OSError as e:
+        return e
+
+def gravar_csvs_linha_unica(caminhos, cabecalho, linhas, n_threads=THREADS_ESCRITA):
+    """Grava cada linha em seu próprio CSV (cabeçalho + linha), em paralelo
+
+    `cabecalho` é a lista de colunas e `linhas` o texto já formatado de cada
+    arquivo. Retorna os (caminho, erro) dos arquivos que não puderam ser gravados.
+    """
+    prefixo = ','.join(campo_csv(coluna) for coluna in cabecalho) + os.linesep
+    textos = [prefixo + linha + os.linesep for linha in linhas]
+    if n_threads <= 1 or len(caminhos) <= 1:
+        erros = [_gravar_texto(caminho, texto) for caminho, texto in zip(caminhos, textos)]
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            erros = list(executor.map(_gravar_texto, caminhos, textos))
+    return [(caminho, erro) for caminho, erro in zip(caminhos, erros) if erro is not None]
@@ -1,14 +1,43 @@
+import sys
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--reset"]:
+    # Reset pela linha de comando (sistema_cli.py resetar): roda antes de
+    # importar tkinter/PIL e de criar a janela, também em servidores sem tela
+    from sistema_cli import main
+    sys.exit(main(["resetar"] + sys.argv[2:]))
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 from PIL import Image, ImageTk
 import os
 import re
-import shutil
-import sys
+
+from pipeline_dados import (PASTA_CONVERTIDOS, PASTA_SEGMENTOS, apagar_resultados, cancelar_tarefa, converter_segmentos,
+                            copiar_pasta_resultados, enviar_etapas, eventos_pendentes, extrair_com_relief,
+                            extrair_sem_relief, formatar_duracao, iniciar_executor_etapas, iniciar_segmentacao,
+                            listar_arquivos_dados, pasta_extracao)
 
 # Variável global para armazenar o caminho do arquivo
 definir_caminho = {'arquivo': None, 'pasta': None, 'tipo': None}
 
+# Segmentação em andamento (pipeline_dados.iniciar_segmentacao) ou None
+segmentacao_ativa = {'tarefa': None}
+
+# Intervalo (ms) entre as leituras da fila de progresso
+INTERVALO_PROGRESSO = 100
+
+# Executor persistente da conversão e da extração (pipeline_dados): as etapas
+# rodam como chamadas de função numa thread de vida longa, com numpy, pandas e
+# scikit-learn importados uma única vez, em segundo plano, desde a abertura.
+executor_etapas = iniciar_executor_etapas()
+
+# Valor inicial da opção "Também gravar segmento_N.txt" (estrutura antiga em texto)
+EXPORTAR_SEGMENTOS_TEXTO = False
+
+# Fração de cada segmento compartilhada com o seguinte (0 = segmentos disjuntos).
+# Com sobreposição os segmentos têm todos o mesmo tamanho e são janelas deslizantes.
+SOBREPOSICAO_SEGMENTOS = 0.0
+
 # Função para selecionar arquivo ou pasta
 def selecionar_arquivo_ou_pasta():
     escolha = messagebox.askquestion("Seleção", "Deseja selecionar uma PASTA inteira? (Sim para pasta, Não para arquivo)")
@@ -48,10 +77,7 @@ def processar_dados():
             messagebox.showerror("Erro", "Selecione uma pasta antes de processar.")
             return
         # Buscar arquivos de dados em todas as subpastas
-        for root, dirs, files in os.walk(pasta):
-            for file in files:
-                if file.lower().endswith(('.txt', '.csv')):
-                    arquivos_para_processar.append(os.path.join(root, file))
+        arquivos_para_processar = listar_arquivos_dados(pasta)
         if not arquivos_para_processar:
             messagebox.showerror("Erro", "Nenhum arquivo de dados (.txt, .csv) encontrado na pasta.")
             return
@@ -65,265 +91,107 @@ def processar_dados():
     except ValueError:
         messagebox.showerror("Erro", "Digite um número válido de segmentos.")
         return
-    pasta_base = os.path.join(os.getcwd(), 'resultados_segmentos')
+    pasta_base = os.path.join(os.getcwd(), PASTA_SEGMENTOS)
     os.makedirs(pasta_base, exist_ok=True)
-    for caminho_arquivo in arquivos_para_processar:
-        try:
-            with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-                linhas = f.readlines()
-        except Exception as e:
-            messagebox.showerror("Erro ao ler arquivo", f"{caminho_arquivo}: {e}")
-            continue
-        total_linhas = len(linhas)
-        if n_segmentos > total_linhas:
-            messagebox.showerror("Erro", f"O número de segmentos é maior que o número de linhas do arquivo: {os.path.basename(caminho_arquivo)}.")
-            continue
-        tamanho_segmento = total_linhas // n_segmentos
-        resto = total_linhas % n_segmentos
-        segmentos = []
-        inicio = 0
-        for i in range(n_segmentos):
-            fim = inicio + tamanho_segmento + (1 if i < resto else 0)
-            segmentos.append(linhas[inicio:fim])
-            inicio = fim
-        # Organização dos resultados em subpastas
-        nome_arquivo = os.path.splitext(os.path.basename(caminho_arquivo))[0]
-        subpasta_nome = nome_arquivo
-        subpastas_existentes = [d for d in os.listdir(pasta_base) if os.path.isdir(os.path.join(pasta_base, d))]
-        if subpasta_nome in subpastas_existentes:
-            idx = 1
-            while f"{nome_arquivo}_{idx}" in subpastas_existentes:
-                idx += 1
-            subpasta_nome = f"{nome_arquivo}_{idx}"
-        pasta_saida = os.path.join(pasta_base, subpasta_nome)
-        os.makedirs(pasta_saida, exist_ok=True)
-        for idx, segmento in enumerate(segmentos):
-            nome_saida = os.path.join(pasta_saida, f'segmento_{idx+1}.txt')
-            with open(nome_saida, 'w', encoding='utf-8') as f:
-                f.writelines(segmento)
-    messagebox.showinfo("Sucesso", f"Processamento concluído! Resultados em: {pasta_base}")
+    # Leitura e gravação numa thread; a janela acompanha o progresso pela fila
+    tarefa = iniciar_segmentacao(arquivos_para_processar, n_segmentos, pasta_base,
+                                 SOBREPOSICAO_SEGMENTOS, exportar_texto.get())
+    segmentacao_ativa['tarefa'] = tarefa
+    botao_processar.config(text="Cancelar", command=cancelar_processamento)
+    botao_baixar.config(state="disabled")
+    botao_extrair_features.config(state="disabled")
+    botao_resetar.config(state="disabled")
+    barra_progresso.config(maximum=len(arquivos_para_processar), value=0)
+    label_progresso.config(text=f"0/{len(arquivos_para_processar)} arquivos")
+    reposicionar_elementos()
+    janela.after(INTERVALO_PROGRESSO, acompanhar_segmentacao, tarefa, pasta_base)
+
+def cancelar_processamento():
+    tarefa = segmentacao_ativa['tarefa']
+    if tarefa is not None:
+        cancelar_tarefa(tarefa)
+        botao_processar.config(state="disabled")
+        label_progresso.config(text="Cancelando...")
+
+def acompanhar_segmentacao(tarefa, pasta_base):
+    """Lê os eventos da segmentação em andamento e atualiza a barra de progresso"""
+    for evento in eventos_pendentes(tarefa):
+        if evento['tipo'] == 'progresso':
+            barra_progresso.config(value=evento['concluidos'])
+            if not tarefa['cancelar'].is_set():
+                taxa = evento['arquivos_por_s']
+                label_progresso.config(
+                    text=f"{evento['concluidos']}/{evento['total']} arquivos"
+                         f" - {taxa or 0:.1f} arquivos/s - restante: {formatar_duracao(evento['eta_s'])}")
+        elif evento['tipo'] == 'erro':
+            messagebox.showerror(evento['titulo'], evento['mensagem'])
+        elif evento['tipo'] == 'fim':
+            finalizar_segmentacao()
+            if evento['cancelado']:
+                messagebox.showinfo("Cancelado", f"Processamento cancelado. {len(evento['pastas'])} arquivo(s) "
+                                                 f"concluído(s) mantido(s) em: {pasta_base}")
+            else:
+                messagebox.showinfo("Sucesso", f"Processamento concluído! Resultados em: {pasta_base}")
+            return
+    janela.after(INTERVALO_PROGRESSO, acompanhar_segmentacao, tarefa, pasta_base)
+
+def finalizar_segmentacao():
+    segmentacao_ativa['tarefa'] = None
+    botao_processar.config(text="Processar dados", command=processar_dados, state="normal")
+    botao_baixar.config(state="normal")
+    botao_extrair_features.config(state="normal")
+    botao_resetar.config(state="normal")
+    barra_progresso.place_forget()
+    label_progresso.place_forget()
 
 def baixar_dados():
-    pasta_origem = os.path.join(os.getcwd(), 'resultados_segmentos')
+    pasta_origem = os.path.join(os.getcwd(), PASTA_SEGMENTOS)
     if not os.path.exists(pasta_origem):
         messagebox.showerror("Erro", "A pasta 'resultados_segmentos' não existe.")
         return
     pasta_destino = filedialog.askdirectory(title="Selecione a pasta de destino para baixar os resultados")
     if not pasta_destino:
         return
-    nome_pasta_final = os.path.join(pasta_destino, 'resultados_segmentos')
-    # Se já existir, remover para evitar duplicidade
-    if os.path.exists(nome_pasta_final):
-        try:
-            shutil.rmtree(nome_pasta_final)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Não foi possível sobrescrever a pasta de destino: {e}")
-            return
     try:
-        shutil.copytree(pasta_origem, nome_pasta_final)
+        nome_pasta_final = copiar_pasta_resultados(pasta_origem, pasta_destino)
         messagebox.showinfo("Sucesso", f"Dados copiados para: {nome_pasta_final}")
     except Exception as e:
         messagebox.showerror("Erro", f"Erro ao copiar dados: {e}")
 
 def resetar_dados():
-    """Apaga todas as pastas de resultados e reinicia o processo do zero automaticamente, sem perguntar ao usuário"""
-    # Lista de pastas para apagar
-    pastas_para_apagar = [
-        "resultados_segmentos",
-        "features_extraidas", 
-        "dados_convertidos_csv"
-    ]
-    # Apaga cada pasta
-    for pasta in pastas_para_apagar:
-        if os.path.exists(pasta):
-            shutil.rmtree(pasta)
+    """Apaga todas as pastas de resultados (pipeline_dados.PASTAS_RESULTADOS), sem perguntar ao usuário
+
+    Para reprocessar, selecione os dados e use "Processar dados" novamente.
+    """
+    apagadas, erros = apagar_resultados()
     # Resetar variáveis globais
     definir_caminho['arquivo'] = None
     definir_caminho['pasta'] = None
     definir_caminho['tipo'] = None
     atualizar_label_selecionado()
-    # Reinicia o processo completo automaticamente
-    reiniciar_processo_completo()
-
-def reiniciar_processo_completo():
-    """Reinicia o processo completo de conversão, segmentação e extração de features"""
-    
-    try:
-        # Verifica se existe a pasta de dados originais
-        pasta_dados_originais = "dados_originais"
-        if not os.path.exists(pasta_dados_originais):
-            messagebox.showerror("Erro", 
-                               f"Pasta '{pasta_dados_originais}' não encontrada!\n\n"
-                               "Por favor, coloque os dados originais na pasta 'dados_originais' antes de continuar.")
-            return
-        
-        # Executa o processo de conversão
-        messagebox.showinfo("Processo", "1. Convertendo dados originais para CSV...")
-        try:
-            import converter_dados
-            converter_dados.converter_todos_arquivos()
-        except Exception as e:
-            messagebox.showerror("Erro na Conversão", f"Erro ao converter dados: {e}")
-            return
-        
-        # Executa o processo de segmentação
-        messagebox.showinfo("Processo", "2. Segmentando dados...")
-        try:
-            import segmentador
-            segmentador.segmentar_todos_arquivos()
-        except Exception as e:
-            messagebox.showerror("Erro na Segmentação", f"Erro ao segmentar dados: {e}")
-            return
-        
-        # Executa o processo de extração de features
-        messagebox.showinfo("Processo", "3. Extraindo features e aplicando ReliefF...")
-        try:
-            import metodo_relief
-            # Chama as funções principais do método relief
-            todas_features, nomes_segmentos, labels = metodo_relief.extrair_features_vibratorias()
-            if len(todas_features) > 0:
-                metodo_relief.aplicar_relief_e_salvar()
-                metodo_relief.organizar_features_relief_por_segmento()
-            else:
-                messagebox.showwarning("Aviso", "Nenhum dado válido encontrado para extração de features.")
-        except Exception as e:
-            messagebox.showerror("Erro na Extração", f"Erro ao extrair features: {e}")
-            return
-        
-        messagebox.showinfo("Sucesso", 
-                           "🎉 PROCESSO COMPLETO REINICIADO COM SUCESSO!\n\n"
-                           "Todos os dados foram processados do zero:\n"
-                           "✓ Conversão de dados\n"
-                           "✓ Segmentação\n"
-                           "✓ Extração de features\n"
-                           "✓ Aplicação do método ReliefF\n\n"
-                           "O sistema está pronto para uso!")
-        
-    except Exception as e:
-        messagebox.showerror("Erro Geral", f"Erro durante o reinício do processo: {e}")
-
-def resetar_dados_completo():
-    """Função integrada do resetar_dados.py - Reset completo via linha de comando"""
-    
-    print("=== RESET COMPLETO DO SISTEMA ===")
-    print("Este processo irá:")
-    print("1. Apagar todas as pastas de resultados")
-    print("2. Reiniciar o processo de conversão")
-    print("3. Reiniciar o processo de segmentação") 
-    print("4. Reiniciar o processo de extração de features")
-    print()
-    
-    # Executa o reset
-    if resetar_dados_automatico():
-        # Reinicia o processo
-        if reiniciar_processo_automatico():
-            print("\n🎉 RESET COMPLETO REALIZADO COM SUCESSO!")
-            print("O sistema está pronto para uso com dados frescos.")
-        else:
-            print("\n⚠ RESET PARCIAL: Dados apagados mas processo não foi reiniciado completamente.")
-            print("Verifique os erros acima e tente novamente.")
+    if erros:
+        messagebox.showerror("Erro", "Erro ao remover dados:\n" +
+                             "\n".join(f"{pasta}: {mensagem}" for pasta, mensagem in erros))
+    elif apagadas:
+        messagebox.showinfo("Sucesso", "Todos os dados processados foram removidos.\n\n"
+                                       "Selecione os dados e use \"Processar dados\" para recomeçar.")
     else:
-        print("\n❌ RESET CANCELADO: Dados não foram apagados.")
-
-def resetar_dados_automatico():
-    """Apaga todas as pastas de resultados automaticamente (sem interface gráfica)"""
-    
-    print("=== RESETANDO DADOS ===")
-    print("Atenção: Esta operação irá apagar TODOS os dados processados!")
-    
-    # Lista de pastas para apagar
-    pastas_para_apagar = [
-        "resultados_segmentos",
-        "features_extraidas", 
-        "dados_convertidos_csv"
-    ]
-    
-    # Confirma com o usuário
-    resposta = input("Tem certeza que deseja apagar todos os dados? (s/n): ").lower()
-    if resposta != 's' and resposta != 'sim':
-        print("Operação cancelada pelo usuário.")
-        return False
-    
-    print("\nApagando pastas...")
-    
-    # Apaga cada pasta
-    for pasta in pastas_para_apagar:
-        if os.path.exists(pasta):
-            try:
-                shutil.rmtree(pasta)
-                print(f"✓ Pasta '{pasta}' apagada com sucesso")
-            except Exception as e:
-                print(f"✗ Erro ao apagar pasta '{pasta}': {e}")
-                return False
-        else:
-            print(f"ℹ Pasta '{pasta}' não existe")
-    
-    print("\n=== DADOS RESETADOS COM SUCESSO ===")
-    print("Todas as pastas de resultados foram apagadas.")
-    print("O sistema está pronto para processar novos dados do zero.")
-    
-    return True
-
-def reiniciar_processo_automatico():
-    """Reinicia o processo de segmentação e extração de features automaticamente"""
-    
-    print("\n=== REINICIANDO PROCESSO ===")
-    
-    # Verifica se existe a pasta de dados originais
-    pasta_dados_originais = "dados_originais"
-    if not os.path.exists(pasta_dados_originais):
-        print(f"✗ Pasta '{pasta_dados_originais}' não encontrada!")
-        print("Por favor, coloque os dados originais na pasta 'dados_originais' antes de continuar.")
-        return False
-    
-    print("✓ Pasta de dados originais encontrada")
-    
-    # Executa o processo de conversão
-    print("\n1. Convertendo dados originais para CSV...")
-    try:
-        import converter_dados
-        converter_dados.converter_todos_arquivos()
-        print("✓ Conversão concluída")
-    except Exception as e:
-        print(f"✗ Erro na conversão: {e}")
-        return False
-    
-    # Executa o processo de segmentação
-    print("\n2. Segmentando dados...")
-    try:
-        import segmentador
-        segmentador.segmentar_todos_arquivos()
-        print("✓ Segmentação concluída")
-    except Exception as e:
-        print(f"✗ Erro na segmentação: {e}")
-        return False
-    
-    # Executa o processo de extração de features
-    print("\n3. Extraindo features e aplicando ReliefF...")
-    try:
-        import metodo_relief
-        # Chama a função principal do método relief
-        metodo_relief.extrair_features_vibratorias()
-        metodo_relief.aplicar_relief_e_salvar()
-        metodo_relief.organizar_features_relief_por_segmento()
-        print("✓ Extração de features concluída")
-    except Exception as e:
-        print(f"✗ Erro na extração de features: {e}")
-        return False
-    
-    print("\n=== PROCESSO REINICIADO COM SUCESSO ===")
-    print("Todos os dados foram processados do zero!")
-    
-    return True
+        messagebox.showinfo("Info", "Nenhum dado processado para resetar.")
 
 def extrair_features():
-    """Executa o conversor_csv.py e abre uma nova interface para extração de features"""
-    import subprocess
-    import threading
-    def rodar_conversor():
-        subprocess.run([sys.executable, 'conversor_csv.py'])
-    # Executa o conversor em thread separada para não travar a interface
-    threading.Thread(target=rodar_conversor).start()
+    """Abre uma nova interface para extração de features
+
+    A extração é um pedido ao executor_etapas e lê os segmentos direto de
+    resultados_segmentos. Só segmentações antigas, em texto, passam antes pela
+    conversão, e a extração só começa depois que ela terminou sem erro.
+    """
+    pasta_segmentos = os.path.join(os.getcwd(), PASTA_SEGMENTOS)
+    pasta_convertidos = os.path.join(os.getcwd(), PASTA_CONVERTIDOS)
+    pasta_dados = pasta_extracao(pasta_segmentos, pasta_convertidos)
+    pedido_conversao = None
+    if pasta_dados == pasta_convertidos:
+        pedido_conversao = enviar_etapas(executor_etapas, [
+            ("Convertendo segmentos", converter_segmentos, (pasta_segmentos, pasta_convertidos))])
     # Abre nova janela para o extrator de features
     nova_janela = tk.Toplevel(janela)
     nova_janela.title("Extrator de Features")
@@ -366,26 +234,38 @@ def extrair_features():
         botao_baixar_features.config(state="normal")
         mensagem_feedback.config(text="Processamento concluído! Agora você pode baixar as features.")
 
-    def iniciar_feedback_processamento():
+    def executar_extracao(descricao, funcao):
+        botao_sim.config(state="disabled")
+        botao_nao.config(state="disabled")
+        botao_baixar_features.config(state="disabled")
         mensagem_feedback.config(text="Processando, aguarde...")
+        pedido = enviar_etapas(executor_etapas, [(descricao, funcao, (pasta_dados,))],
+                               depende_de=pedido_conversao)
+        nova_janela.after(INTERVALO_PROGRESSO, acompanhar_extracao, pedido)
 
     def executar_metodo_relief():
-        import subprocess
-        iniciar_feedback_processamento()
-        proc = subprocess.Popen([sys.executable, 'metodo_relief.py'])
-        nova_janela.after(100, checar_fim_processo, proc, habilitar_botao_baixar)
+        executar_extracao("Extraindo features com ReliefF", extrair_com_relief)
 
     def executar_features_sem_relief():
-        import subprocess
-        iniciar_feedback_processamento()
-        proc = subprocess.Popen([sys.executable, 'features_sem_relief.py'])
-        nova_janela.after(100, checar_fim_processo, proc, habilitar_botao_baixar)
-
-    def checar_fim_processo(proc, callback):
-        if proc.poll() is None:
-            nova_janela.after(100, checar_fim_processo, proc, callback)
-        else:
-            callback()
+        executar_extracao("Extraindo features", extrair_sem_relief)
+
+    def acompanhar_extracao(pedido):
+        for evento in eventos_pendentes(pedido):
+            if evento['tipo'] == 'etapa':
+                mensagem_feedback.config(text=f"{evento['descricao']}, aguarde...")
+            elif evento['tipo'] == 'concluida':
+                mensagem_feedback.config(
+                    text=f"{evento['descricao']}: concluído em {formatar_duracao(evento['duracao_s'])}")
+            elif evento['tipo'] == 'erro':
+                mensagem_feedback.config(text=f"Erro em: {evento['descricao']}")
+                messagebox.showerror("Erro na extração", evento['mensagem'])
+            elif evento['tipo'] == 'fim':
+                botao_sim.config(state="normal")
+                botao_nao.config(state="normal")
+                if evento['ok']:
+                    habilitar_botao_baixar()
+                return
+        nova_janela.after(INTERVALO_PROGRESSO, acompanhar_extracao, pedido)
 
     botao_sim = ttk.Button(nova_janela, text="Sim", command=executar_metodo_relief)
     botao_sim.place(relx=0.4, y=170, anchor="center")
@@ -393,9 +273,9 @@ def extrair_features():
     botao_nao.place(relx=0.6, y=170, anchor="center")
 
     def baixar_features():
-        import shutil
         from tkinter import filedialog, messagebox
-        pasta_origem = os.path.join(os.getcwd(), 'features_extraidas')
+        from pipeline_dados import PASTA_FEATURES, copiar_arquivos_resultados
+        pasta_origem = os.path.join(os.getcwd(), PASTA_FEATURES)
         if not os.path.exists(pasta_origem):
             messagebox.showerror("Erro", "A pasta de features extraídas não foi encontrada!")
             return
@@ -403,19 +283,7 @@ def extrair_features():
         if not destino:
             return
         try:
-            # Cria a pasta principal de destino
-            pasta_destino = os.path.join(destino, 'features_extraidas')
-            if not os.path.exists(pasta_destino):
-                os.makedirs(pasta_destino)
-            # Copia todos os arquivos e subpastas mantendo a estrutura
-            for root, dirs, files in os.walk(pasta_origem):
-                rel_path = os.path.relpath(root, pasta_origem)
-                destino_atual = os.path.join(pasta_destino, rel_path)
-                if not os.path.exists(destino_atual):
-                    os.makedirs(destino_atual)
-                for file in files:
-                    if file.lower().endswith('.csv'):
-                        shutil.copy2(os.path.join(root, file), os.path.join(destino_atual, file))
+            pasta_destino = copiar_arquivos_resultados(pasta_origem, destino)
             messagebox.showinfo("Sucesso", f"Features baixadas com sucesso em: {pasta_destino}")
         except Exception as e:
             messagebox.showerror("Erro ao baixar features", str(e))
@@ -434,10 +302,15 @@ def reposicionar_elementos(event=None):
     botao_arquivo.place(relx=0.5, y=110, anchor="center")
     # Label do arquivo/pasta selecionado
     label_selecionado.place(relx=0.5, y=135, anchor="center")
+    # Progresso, só durante a segmentação
+    if segmentacao_ativa['tarefa'] is not None:
+        barra_progresso.place(relx=0.5, y=170, anchor="center", width=min(360, largura - 40))
+        label_progresso.place(relx=0.5, y=192, anchor="center")
     # Pergunta e caixa de entrada
     nova_y_pergunta = 230 if altura < 400 else int(altura*0.55)
     txt_pergunta.place(relx=0.5, y=nova_y_pergunta, anchor="center")
     entrada_segmentos.place(relx=0.5, y=nova_y_pergunta+30, anchor="center")
+    opcao_texto.place(relx=0.5, y=nova_y_pergunta+55, anchor="center")
     # Botões inferiores - agora com 4 botões
     largura_total = 440  # Aumentada para acomodar 4 botões
     x_inicial = (largura - largura_total) // 2
@@ -480,6 +353,10 @@ botao_arquivo.place(relx=0.5, y=110, anchor="center")
 label_selecionado = ttk.Label(janela, text="Nenhum arquivo ou pasta selecionado.", font=("Arial", 9))
 label_selecionado.place(relx=0.5, y=165, anchor="center")
 
+# Barra e texto de progresso da segmentação (posicionados só durante o processamento)
+barra_progresso = ttk.Progressbar(janela, mode="determinate")
+label_progresso = ttk.Label(janela, text="", font=("Arial", 9))
+
 def atualizar_label_selecionado():
     if definir_caminho['tipo'] == 'arquivo' and definir_caminho['arquivo']:
         nome = os.path.basename(definir_caminho['arquivo'])
@@ -498,6 +375,11 @@ txt_pergunta.place(relx=0.5, y=nova_y_pergunta, anchor="center")
 entrada_segmentos = ttk.Entry(janela, width=8, font=("Arial", 10))
 entrada_segmentos.place(relx=0.5, y=nova_y_pergunta+30, anchor="center")
 
+# Opção de também gravar os segmentos em texto (segmento_N.txt)
+exportar_texto = tk.BooleanVar(value=EXPORTAR_SEGMENTOS_TEXTO)
+opcao_texto = ttk.Checkbutton(janela, text="Também gravar segmento_N.txt", variable=exportar_texto)
+opcao_texto.place(relx=0.5, y=nova_y_pergunta+55, anchor="center")
+
 # Botões alinhados lado a lado, mais separados
 largura_total = 440  # largura total ocupada pelos 4 botões e espaçamentos
 x_inicial = (500 - largura_total) // 2
@@ -518,8 +400,4 @@ reposicionar_elementos()  # Chamada inicial para posicionar
 
 # Verifica se foi chamado como script principal ou módulo
 if __name__ == "__main__":
-    # Verifica se há argumentos de linha de comando para reset
-    if len(sys.argv) > 1 and sys.argv[1] == "--reset":
-        resetar_dados_completo()
-    else:
-        janela.mainloop()
+    janela.mainloop()
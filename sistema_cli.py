@@ -0,0 +1,279 @@
+import argparse
+import os
+import sys
+
+# ============================================================================
+# PIPELINE COMPLETO PELA LINHA DE COMANDO (sem tkinter/PIL)
+# ============================================================================
+#
+# Subcomandos (nomes em inglês aceitos como apelidos):
+#   segmentar (segment)   - grava os segmentos em resultados_segmentos
+#   converter (convert)   - materializa os segmentos em dados_convertidos_csv
+#   extrair (extract)     - extrai as features, com ou sem ReliefF (--relief)
+#   selecionar (select)   - só o ranking ReliefF (relief_scores.csv)
+#   exportar (export)     - copia segmentos ou features para outra pasta
+#   executar (run)        - segmentar e extrair em sequência, lendo os segmentos
+#                           direto de resultados_segmentos
+#   resetar (reset)       - apaga segmentos, dados convertidos e features
+# Cada subcomando importa apenas os módulos de que precisa: segmentar e
+# converter usam só o numpy; pandas e scikit-learn entram apenas na extração.
+
+def _configurar_paralelismo(args):
+    """Aplica --tamanho-lote ao particionamento das tarefas entre os workers"""
+    if getattr(args, 'tamanho_lote', None):
+        import processamento_paralelo
+        processamento_paralelo.TAMANHO_LOTE = args.tamanho_lote
+
+def comando_segmentar(args):
+    from pipeline_dados import PASTA_SEGMENTOS, listar_arquivos_dados, segmentar_arquivos
+
+    pasta_base = args.saida or os.path.join(os.getcwd(), PASTA_SEGMENTOS)
+    arquivos = []
+    for caminho in args.entradas:
+        arquivos.extend(listar_arquivos_dados(caminho))
+    if not arquivos:
+        print("ERRO: Nenhum arquivo de dados (.txt, .csv) encontrado.")
+        return 1
+
+    if args.janela:
+        # Janelas de tamanho fixo (janelamento.py) em vez de um número de segmentos
+        from janelamento import segmentar_arquivo_em_janelas
+        erros = []
+        for caminho in arquivos:
+            try:
+                pasta_saida, n_segmentos = segmentar_arquivo_em_janelas(
+                    caminho, pasta_base, args.janela, args.passo, args.final, args.minimo)
+                print(f"{os.path.basename(caminho)}: {n_segmentos} janelas em {pasta_saida}")
+            except (OSError, ValueError) as e:
+                erros.append((caminho, str(e)))
+    else:
+        pastas_saida, erros = segmentar_arquivos(arquivos, args.segmentos, pasta_base, args.sobreposicao,
+                                                 args.exportar_texto)
+        for pasta_saida in pastas_saida:
+            print(f"Segmentos gravados em: {pasta_saida}")
+    for caminho, mensagem in erros:
+        print(f"ERRO em {caminho}: {mensagem}")
+    print(f"Processamento concluído! Resultados em: {pasta_base}")
+    return 1 if erros else 0
+
+def comando_converter(args):
+    from pipeline_dados import PASTA_CONVERTIDOS, PASTA_SEGMENTOS, converter_segmentos
+
+    pasta_origem = args.origem or os.path.join(os.getcwd(), PASTA_SEGMENTOS)
+    if not os.path.exists(pasta_origem):
+        print(f"ERRO: Pasta de segmentos não encontrada: {pasta_origem}")
+        return 1
+    pasta_destino = converter_segmentos(pasta_origem, args.destino or os.path.join(os.getcwd(), PASTA_CONVERTIDOS))
+    print(f'Conversão concluída. Arquivos CSV salvos em: {pasta_destino}')
+    return 0
+
+def _pastas_extracao(args):
+    """(pasta_dados, pasta_features) da extração; None quando a pasta de dados não existe
+
+    Sem --dados, os segmentos são lidos direto de resultados_segmentos
+    (dados_convertidos_csv só para segmentações antigas, em texto).
+    """
+    from pipeline_dados import (PASTA_CONVERTIDOS, PASTA_FEATURES, PASTA_SEGMENTOS, pasta_extracao,
+                                resolver_pasta)
+
+    pasta_dados = args.dados or pasta_extracao(resolver_pasta(None, PASTA_SEGMENTOS),
+                                               resolver_pasta(None, PASTA_CONVERTIDOS))
+    if not os.path.exists(pasta_dados):
+        print(f"ERRO: Pasta de dados não encontrada: {pasta_dados}")
+        return None
+    return pasta_dados, resolver_pasta(args.features, PASTA_FEATURES)
+
+def comando_extrair(args):
+    _configurar_paralelismo(args)
+    pastas = _pastas_extracao(args)
+    if pastas is None:
+        return 1
+    pasta_dados, pasta_features = pastas
+    if args.relief:
+        import metodo_relief
+        try:
+            todas_features, _, _ = metodo_relief.executar_pipeline_relief(
+                args.workers, not args.sem_cache, args.relief_aproximado, args.semente, args.formato, args.float32,
+                pasta_dados=pasta_dados, pasta_features=pasta_features)
+        except RuntimeError as e:
+            print(f"ERRO: {e}")
+            return 1
+        return 0 if len(todas_features) else 1
+
+    import features_sem_relief
+    features_sem_relief.main(args.workers, not args.sem_cache, args.formato, args.float32, pasta_dados, pasta_features)
+    return 0
+
+def comando_selecionar(args):
+    _configurar_paralelismo(args)
+    pastas = _pastas_extracao(args)
+    if pastas is None:
+        return 1
+    pasta_dados, pasta_features = pastas
+    import metodo_relief
+    # Com o cache de extração, só os segmentos novos ou alterados são lidos
+    extracao = metodo_relief.extrair_features_vibratorias(args.workers, not args.sem_cache, pasta_dados=pasta_dados,
+                                                          pasta_features=pasta_features)
+    if len(extracao[0]) == 0:
+        print("Nenhum segmento válido encontrado para extração de features.")
+        return 1
+    try:
+        metodo_relief.aplicar_relief_e_salvar(args.workers, not args.sem_cache, extracao, args.relief_aproximado,
+                                              semente=args.semente, pasta_features=pasta_features)
+    except RuntimeError as e:
+        print(f"ERRO: {e}")
+        return 1
+    metodo_relief.mostrar_top_features(pasta_features)
+    return 0
+
+def comando_exportar(args):
+    from pipeline_dados import (PASTA_FEATURES, PASTA_SEGMENTOS, copiar_arquivos_resultados,
+                                copiar_pasta_resultados)
+
+    try:
+        if args.o_que == 'segmentos':
+            copia = copiar_pasta_resultados(os.path.join(os.getcwd(), PASTA_SEGMENTOS), args.destino)
+        else:
+            # CSVs e datasets colunares; o cache e os relatórios JSON ficam de fora
+            copia = copiar_arquivos_resultados(os.path.join(os.getcwd(), PASTA_FEATURES), args.destino)
+    except OSError as e:
+        print(f"ERRO: {e}")
+        return 1
+    print(f"Resultados copiados para: {copia}")
+    return 0
+
+def comando_executar(args):
+    from pipeline_dados import PASTA_CONVERTIDOS, PASTA_SEGMENTOS, pasta_extracao
+
+    codigo = comando_segmentar(args)
+    if codigo:
+        return codigo
+    pasta_segmentos = args.saida or os.path.join(os.getcwd(), PASTA_SEGMENTOS)
+    if args.dados is None:
+        # Sem --dados, os extratores leem direto da pasta dos segmentos
+        args.dados = pasta_extracao(pasta_segmentos, os.path.join(os.getcwd(), PASTA_CONVERTIDOS))
+    if args.dados != pasta_segmentos:
+        # Pasta de dados separada (ou segmentos antigos em texto): materializa os segmentos nela
+        args.origem = pasta_segmentos
+        args.destino = args.dados
+        codigo = comando_converter(args)
+        if codigo:
+            return codigo
+    return comando_extrair(args)
+
+def comando_resetar(args):
+    from pipeline_dados import PASTAS_RESULTADOS, apagar_resultados
+
+    print("Atenção: esta operação apaga TODOS os dados processados:", ", ".join(PASTAS_RESULTADOS))
+    if not args.sim:
+        try:
+            resposta = input("Tem certeza que deseja apagar todos os dados? (s/n): ").lower()
+        except EOFError:
+            resposta = ''  # Sem terminal: só com --sim
+        if resposta not in ('s', 'sim'):
+            print("Operação cancelada pelo usuário.")
+            return 1
+    apagadas, erros = apagar_resultados()
+    for pasta in apagadas:
+        print(f"✓ Pasta '{pasta}' apagada com sucesso")
+    for pasta, mensagem in erros:
+        print(f"✗ Erro ao apagar pasta '{pasta}': {mensagem}")
+    if not apagadas and not erros:
+        print("Nenhum dado processado para apagar.")
+    return 1 if erros else 0
+
+# ============================================================================
+# ARGUMENTOS
+# ============================================================================
+
+def _argumentos_segmentacao(parser):
+    parser.add_argument('entradas', nargs='+', help="Arquivos de gravação (.txt/.csv) ou pastas com eles")
+    parser.add_argument('--segmentos', type=int, default=None, help="Número de segmentos por arquivo")
+    parser.add_argument('--sobreposicao', type=float, default=0.0,
+                        help="Fração de cada segmento compartilhada com o seguinte (0 = disjuntos)")
+    parser.add_argument('--exportar-texto', action='store_true',
+                        help="Também grava cada segmento como segmento_N.txt")
+    parser.add_argument('--janela', type=int, default=None,
+                        help="Segmenta em janelas deste tamanho (em amostras) em vez de --segmentos")
+    parser.add_argument('--passo', type=int, default=None, help="Passo entre janelas (padrão: sem sobreposição)")
+    parser.add_argument('--final', choices=['descartar', 'manter'], default='descartar',
+                        help="O que fazer com o trecho final menor que uma janela")
+    parser.add_argument('--minimo', type=int, default=None, help="Tamanho mínimo do trecho final mantido")
+    parser.add_argument('--saida', default=None, help="Pasta base dos segmentos (padrão: resultados_segmentos)")
+
+def _argumentos_paralelismo(parser):
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos paralelos na extração e threads do ReliefF (0 = todos os núcleos)")
+    parser.add_argument('--tamanho-lote', type=int, default=None,
+                        help="Itens por lote enviado a cada worker (padrão: 4 lotes por worker)")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="Recalcula todos os segmentos, ignorando o cache de extração")
+    parser.add_argument('--dados', default=None,
+                        help="Pasta dos segmentos lida pelos extratores (padrão: resultados_segmentos, ou "
+                             "dados_convertidos_csv para segmentações antigas só em texto)")
+    parser.add_argument('--features', default=None, help="Pasta dos resultados (padrão: features_extraidas)")
+
+def _argumentos_relief(parser):
+    parser.add_argument('--relief-aproximado', action='store_true',
+                        help="ReliefF sobre amostra estratificada crescente até o top 10 estabilizar")
+    parser.add_argument('--semente', type=int, default=0, help="Semente da amostragem do ReliefF aproximado")
+
+def _argumentos_extracao(parser):
+    _argumentos_paralelismo(parser)
+    parser.add_argument('--relief', action='store_true',
+                        help="Extrai com o método ReliefF (metodo_relief.py); sem ele, todas as features")
+    _argumentos_relief(parser)
+    parser.add_argument('--formato', choices=['csv', 'parquet', 'feather'], default=None,
+                        help="Saída por segmento: dataset parquet/feather particionado por condição ou um CSV "
+                             "por segmento (padrão: parquet com pyarrow instalado, senão csv)")
+    parser.add_argument('--float32', action='store_true',
+                        help="Grava as features em float32 nos formatos parquet/feather")
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Pipeline de segmentação e extração de features sem interface gráfica")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    segmentar = subparsers.add_parser('segmentar', aliases=['segment'], help="Segmenta gravações")
+    _argumentos_segmentacao(segmentar)
+    segmentar.set_defaults(funcao=comando_segmentar)
+
+    converter = subparsers.add_parser('converter', aliases=['convert'],
+                                      help="Materializa os segmentos (hardlinks) na pasta dos extratores")
+    converter.add_argument('--origem', default=None, help="Pasta dos segmentos (padrão: resultados_segmentos)")
+    converter.add_argument('--destino', default=None, help="Pasta de destino (padrão: dados_convertidos_csv)")
+    converter.set_defaults(funcao=comando_converter)
+
+    extrair = subparsers.add_parser('extrair', aliases=['extract'], help="Extrai as features dos segmentos")
+    _argumentos_extracao(extrair)
+    extrair.set_defaults(funcao=comando_extrair)
+
+    selecionar = subparsers.add_parser('selecionar', aliases=['select'],
+                                       help="Calcula o ranking ReliefF das features")
+    _argumentos_paralelismo(selecionar)
+    _argumentos_relief(selecionar)
+    selecionar.set_defaults(funcao=comando_selecionar)
+
+    exportar = subparsers.add_parser('exportar', aliases=['export'], help="Copia resultados para outra pasta")
+    exportar.add_argument('o_que', choices=['segmentos', 'features'], help="O que exportar")
+    exportar.add_argument('destino', help="Pasta de destino")
+    exportar.set_defaults(funcao=comando_exportar)
+
+    executar = subparsers.add_parser('executar', aliases=['run'], help="Segmenta e extrai as features")
+    _argumentos_segmentacao(executar)
+    _argumentos_extracao(executar)
+    executar.set_defaults(funcao=comando_executar)
+
+    resetar = subparsers.add_parser('resetar', aliases=['reset'], help="Apaga todos os resultados processados")
+    resetar.add_argument('--sim', action='store_true', help="Não pede confirmação")
+    resetar.set_defaults(funcao=comando_resetar)
+    return parser
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if hasattr(args, 'entradas') and bool(args.segmentos) == bool(args.janela):
+        parser.error("informe --segmentos ou --janela")
+    return args.funcao(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
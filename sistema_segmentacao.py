@@ -3,11 +3,29 @@ from tkinter import ttk, filedialog, messagebox, simpledialog
 from PIL import Image, ImageTk
 import os
 import re
-import shutil
+
+from pipeline_dados import (PASTA_SEGMENTOS, PASTAS_RESULTADOS, apagar_resultados, cancelar_tarefa,
+                            copiar_pasta_resultados, eventos_pendentes, formatar_duracao, iniciar_segmentacao,
+                            listar_arquivos_dados)
 
 # Variável global para armazenar o caminho do arquivo
 definir_caminho = {'arquivo': None, 'pasta': None, 'tipo': None}
 
+# Segmentação em andamento (pipeline_dados.iniciar_segmentacao) ou None
+segmentacao_ativa = {'tarefa': None}
+
+# Intervalo (ms) entre as leituras da fila de progresso
+INTERVALO_PROGRESSO = 100
+
+# Valor inicial da opção "Também gravar segmento_N.txt" (estrutura antiga em
+# texto). Ligada aqui: o download desta ferramenta é o seu único produto e
+# quem o consome espera os arquivos de texto.
+EXPORTAR_SEGMENTOS_TEXTO = True
+
+# Fração de cada segmento compartilhada com o seguinte (0 = segmentos disjuntos).
+# Com sobreposição os segmentos têm todos o mesmo tamanho e são janelas deslizantes.
+SOBREPOSICAO_SEGMENTOS = 0.0
+
 # Função para selecionar arquivo ou pasta
 def selecionar_arquivo_ou_pasta():
     escolha = messagebox.askquestion("Seleção", "Deseja selecionar uma PASTA inteira? (Sim para pasta, Não para arquivo)")
@@ -47,10 +65,7 @@ def processar_dados():
             messagebox.showerror("Erro", "Selecione uma pasta antes de processar.")
             return
         # Buscar arquivos de dados em todas as subpastas
-        for root, dirs, files in os.walk(pasta):
-            for file in files:
-                if file.lower().endswith(('.txt', '.csv')):
-                    arquivos_para_processar.append(os.path.join(root, file))
+        arquivos_para_processar = listar_arquivos_dados(pasta)
         if not arquivos_para_processar:
             messagebox.showerror("Erro", "Nenhum arquivo de dados (.txt, .csv) encontrado na pasta.")
             return
@@ -64,78 +79,74 @@ def processar_dados():
     except ValueError:
         messagebox.showerror("Erro", "Digite um número válido de segmentos.")
         return
-    pasta_base = os.path.join(os.getcwd(), 'resultados_segmentos')
+    pasta_base = os.path.join(os.getcwd(), PASTA_SEGMENTOS)
     os.makedirs(pasta_base, exist_ok=True)
-    for caminho_arquivo in arquivos_para_processar:
-        try:
-            with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-                linhas = f.readlines()
-        except Exception as e:
-            messagebox.showerror("Erro ao ler arquivo", f"{caminho_arquivo}: {e}")
-            continue
-        total_linhas = len(linhas)
-        if n_segmentos > total_linhas:
-            messagebox.showerror("Erro", f"O número de segmentos é maior que o número de linhas do arquivo: {os.path.basename(caminho_arquivo)}.")
-            continue
-        tamanho_segmento = total_linhas // n_segmentos
-        resto = total_linhas % n_segmentos
-        segmentos = []
-        inicio = 0
-        for i in range(n_segmentos):
-            fim = inicio + tamanho_segmento + (1 if i < resto else 0)
-            segmentos.append(linhas[inicio:fim])
-            inicio = fim
-        # Organização dos resultados em subpastas
-        nome_arquivo = os.path.splitext(os.path.basename(caminho_arquivo))[0]
-        subpasta_nome = nome_arquivo
-        subpastas_existentes = [d for d in os.listdir(pasta_base) if os.path.isdir(os.path.join(pasta_base, d))]
-        if subpasta_nome in subpastas_existentes:
-            idx = 1
-            while f"{nome_arquivo}_{idx}" in subpastas_existentes:
-                idx += 1
-            subpasta_nome = f"{nome_arquivo}_{idx}"
-        pasta_saida = os.path.join(pasta_base, subpasta_nome)
-        os.makedirs(pasta_saida, exist_ok=True)
-        for idx, segmento in enumerate(segmentos):
-            nome_saida = os.path.join(pasta_saida, f'segmento_{idx+1}.txt')
-            with open(nome_saida, 'w', encoding='utf-8') as f:
-                f.writelines(segmento)
-    messagebox.showinfo("Sucesso", f"Processamento concluído! Resultados em: {pasta_base}")
+    # Leitura e gravação numa thread; a janela acompanha o progresso pela fila
+    tarefa = iniciar_segmentacao(arquivos_para_processar, n_segmentos, pasta_base,
+                                 SOBREPOSICAO_SEGMENTOS, exportar_texto.get())
+    segmentacao_ativa['tarefa'] = tarefa
+    botao_processar.config(text="Cancelar", command=cancelar_processamento)
+    botao_baixar.config(state="disabled")
+    botao_resetar.config(state="disabled")
+    barra_progresso.config(maximum=len(arquivos_para_processar), value=0)
+    label_progresso.config(text=f"0/{len(arquivos_para_processar)} arquivos")
+    reposicionar_elementos()
+    janela.after(INTERVALO_PROGRESSO, acompanhar_segmentacao, tarefa, pasta_base)
+
+def cancelar_processamento():
+    tarefa = segmentacao_ativa['tarefa']
+    if tarefa is not None:
+        cancelar_tarefa(tarefa)
+        botao_processar.config(state="disabled")
+        label_progresso.config(text="Cancelando...")
+
+def acompanhar_segmentacao(tarefa, pasta_base):
+    """Lê os eventos da segmentação em andamento e atualiza a barra de progresso"""
+    for evento in eventos_pendentes(tarefa):
+        if evento['tipo'] == 'progresso':
+            barra_progresso.config(value=evento['concluidos'])
+            if not tarefa['cancelar'].is_set():
+                taxa = evento['arquivos_por_s']
+                label_progresso.config(
+                    text=f"{evento['concluidos']}/{evento['total']} arquivos"
+                         f" - {taxa or 0:.1f} arquivos/s - restante: {formatar_duracao(evento['eta_s'])}")
+        elif evento['tipo'] == 'erro':
+            messagebox.showerror(evento['titulo'], evento['mensagem'])
+        elif evento['tipo'] == 'fim':
+            finalizar_segmentacao()
+            if evento['cancelado']:
+                messagebox.showinfo("Cancelado", f"Processamento cancelado. {len(evento['pastas'])} arquivo(s) "
+                                                 f"concluído(s) mantido(s) em: {pasta_base}")
+            else:
+                messagebox.showinfo("Sucesso", f"Processamento concluído! Resultados em: {pasta_base}")
+            return
+    janela.after(INTERVALO_PROGRESSO, acompanhar_segmentacao, tarefa, pasta_base)
+
+def finalizar_segmentacao():
+    segmentacao_ativa['tarefa'] = None
+    botao_processar.config(text="Processar dados", command=processar_dados, state="normal")
+    botao_baixar.config(state="normal")
+    botao_resetar.config(state="normal")
+    barra_progresso.place_forget()
+    label_progresso.place_forget()
 
 def baixar_dados():
-    pasta_origem = os.path.join(os.getcwd(), 'resultados_segmentos')
+    pasta_origem = os.path.join(os.getcwd(), PASTA_SEGMENTOS)
     if not os.path.exists(pasta_origem):
         messagebox.showerror("Erro", "A pasta 'resultados_segmentos' não existe.")
         return
     pasta_destino = filedialog.askdirectory(title="Selecione a pasta de destino para baixar os resultados")
     if not pasta_destino:
         return
-    nome_pasta_final = os.path.join(pasta_destino, 'resultados_segmentos')
-    # Se já existir, remover para evitar duplicidade
-    if os.path.exists(nome_pasta_final):
-        try:
-            shutil.rmtree(nome_pasta_final)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Não foi possível sobrescrever a pasta de destino: {e}")
-            return
     try:
-        shutil.copytree(pasta_origem, nome_pasta_final)
+        nome_pasta_final = copiar_pasta_resultados(pasta_origem, pasta_destino)
         messagebox.showinfo("Sucesso", f"Dados copiados para: {nome_pasta_final}")
     except Exception as e:
         messagebox.showerror("Erro", f"Erro ao copiar dados: {e}")
 
 def resetar_dados():
-    """Apaga todas as pastas de resultados e reinicia o processo do zero"""
-    
-    # Lista de pastas para apagar
-    pastas_para_apagar = [
-        "resultados_segmentos",
-        "features_extraidas", 
-        "dados_convertidos_csv"
-    ]
-    
-    # Verifica se alguma pasta existe
-    pastas_existentes = [pasta for pasta in pastas_para_apagar if os.path.exists(pasta)]
+    """Apaga todas as pastas de resultados (pipeline_dados.PASTAS_RESULTADOS) após confirmação"""
+    pastas_existentes = [pasta for pasta in PASTAS_RESULTADOS if os.path.exists(os.path.join(os.getcwd(), pasta))]
     
     if not pastas_existentes:
         messagebox.showinfo("Info", "Nenhum dado processado para resetar.")
@@ -152,88 +163,19 @@ def resetar_dados():
     if not confirm:
         return
     
-    try:
-        # Apaga cada pasta
-        for pasta in pastas_para_apagar:
-            if os.path.exists(pasta):
-                shutil.rmtree(pasta)
-        
-        messagebox.showinfo("Sucesso", "Todos os dados processados foram removidos com sucesso!")
-        
-        # Resetar variáveis globais
-        definir_caminho['arquivo'] = None
-        definir_caminho['pasta'] = None
-        definir_caminho['tipo'] = None
-        atualizar_label_selecionado()
-        
-        # Pergunta se deseja reiniciar o processo
-        if messagebox.askyesno("Reiniciar Processo", 
-                              "Deseja reiniciar o processo completo?\n\n"
-                              "Isso irá:\n"
-                              "1. Converter dados originais para CSV\n"
-                              "2. Segmentar os dados\n"
-                              "3. Extrair features e aplicar ReliefF"):
-            reiniciar_processo_completo()
-            
-    except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao remover dados: {e}")
-
-def reiniciar_processo_completo():
-    """Reinicia o processo completo de conversão, segmentação e extração de features"""
+    _, erros = apagar_resultados()
+    if erros:
+        messagebox.showerror("Erro", "Erro ao remover dados:\n" +
+                             "\n".join(f"{pasta}: {mensagem}" for pasta, mensagem in erros))
+        return
+    messagebox.showinfo("Sucesso", "Todos os dados processados foram removidos com sucesso!\n\n"
+                                   "Selecione os dados e use \"Processar dados\" para recomeçar.")
     
-    try:
-        # Verifica se existe a pasta de dados originais
-        pasta_dados_originais = "dados_originais"
-        if not os.path.exists(pasta_dados_originais):
-            messagebox.showerror("Erro", 
-                               f"Pasta '{pasta_dados_originais}' não encontrada!\n\n"
-                               "Por favor, coloque os dados originais na pasta 'dados_originais' antes de continuar.")
-            return
-        
-        # Executa o processo de conversão
-        messagebox.showinfo("Processo", "1. Convertendo dados originais para CSV...")
-        try:
-            import converter_dados
-            converter_dados.converter_todos_arquivos()
-        except Exception as e:
-            messagebox.showerror("Erro na Conversão", f"Erro ao converter dados: {e}")
-            return
-        
-        # Executa o processo de segmentação
-        messagebox.showinfo("Processo", "2. Segmentando dados...")
-        try:
-            import segmentador
-            segmentador.segmentar_todos_arquivos()
-        except Exception as e:
-            messagebox.showerror("Erro na Segmentação", f"Erro ao segmentar dados: {e}")
-            return
-        
-        # Executa o processo de extração de features
-        messagebox.showinfo("Processo", "3. Extraindo features e aplicando ReliefF...")
-        try:
-            import metodo_relief
-            # Chama as funções principais do método relief
-            todas_features, nomes_segmentos, labels = metodo_relief.extrair_features_vibratorias()
-            if len(todas_features) > 0:
-                metodo_relief.aplicar_relief_e_salvar()
-                metodo_relief.organizar_features_relief_por_segmento()
-            else:
-                messagebox.showwarning("Aviso", "Nenhum dado válido encontrado para extração de features.")
-        except Exception as e:
-            messagebox.showerror("Erro na Extração", f"Erro ao extrair features: {e}")
-            return
-        
-        messagebox.showinfo("Sucesso", 
-                           "🎉 PROCESSO COMPLETO REINICIADO COM SUCESSO!\n\n"
-                           "Todos os dados foram processados do zero:\n"
-                           "✓ Conversão de dados\n"
-                           "✓ Segmentação\n"
-                           "✓ Extração de features\n"
-                           "✓ Aplicação do método ReliefF\n\n"
-                           "O sistema está pronto para uso!")
-        
-    except Exception as e:
-        messagebox.showerror("Erro Geral", f"Erro durante o reinício do processo: {e}")
+    # Resetar variáveis globais
+    definir_caminho['arquivo'] = None
+    definir_caminho['pasta'] = None
+    definir_caminho['tipo'] = None
+    atualizar_label_selecionado()
 
 def reposicionar_elementos(event=None):
     largura = janela.winfo_width()
@@ -247,10 +189,15 @@ def reposicionar_elementos(event=None):
     botao_arquivo.place(relx=0.5, y=110, anchor="center")
     # Label do arquivo/pasta selecionado
     label_selecionado.place(relx=0.5, y=135, anchor="center")
+    # Progresso, só durante a segmentação
+    if segmentacao_ativa['tarefa'] is not None:
+        barra_progresso.place(relx=0.5, y=170, anchor="center", width=min(360, largura - 40))
+        label_progresso.place(relx=0.5, y=192, anchor="center")
     # Pergunta e caixa de entrada
     nova_y_pergunta = 230 if altura < 400 else int(altura*0.55)
     txt_pergunta.place(relx=0.5, y=nova_y_pergunta, anchor="center")
     entrada_segmentos.place(relx=0.5, y=nova_y_pergunta+30, anchor="center")
+    opcao_texto.place(relx=0.5, y=nova_y_pergunta+55, anchor="center")
     # Botões inferiores
     largura_total = 330
     x_inicial = (largura - largura_total) // 2
@@ -292,6 +239,10 @@ botao_arquivo.place(relx=0.5, y=110, anchor="center")
 label_selecionado = ttk.Label(janela, text="Nenhum arquivo ou pasta selecionado.", font=("Arial", 9))
 label_selecionado.place(relx=0.5, y=165, anchor="center")
 
+# Barra e texto de progresso da segmentação (posicionados só durante o processamento)
+barra_progresso = ttk.Progressbar(janela, mode="determinate")
+label_progresso = ttk.Label(janela, text="", font=("Arial", 9))
+
 def atualizar_label_selecionado():
     if definir_caminho['tipo'] == 'arquivo' and definir_caminho['arquivo']:
         nome = os.path.basename(definir_caminho['arquivo'])
@@ -310,6 +261,11 @@ txt_pergunta.place(relx=0.5, y=nova_y_pergunta, anchor="center")
 entrada_segmentos = ttk.Entry(janela, width=8, font=("Arial", 10))
 entrada_segmentos.place(relx=0.5, y=nova_y_pergunta+30, anchor="center")
 
+# Opção de também gravar os segmentos em texto (segmento_N.txt)
+exportar_texto = tk.BooleanVar(value=EXPORTAR_SEGMENTOS_TEXTO)
+opcao_texto = ttk.Checkbutton(janela, text="Também gravar segmento_N.txt", variable=exportar_texto)
+opcao_texto.place(relx=0.5, y=nova_y_pergunta+55, anchor="center")
+
 # Botões alinhados lado a lado, mais separados
 largura_total = 330  # largura total ocupada pelos 3 botões e espaçamentos
 x_inicial = (420 - largura_total) // 2
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+
+import cache_extracao
+from armazenamento_segmentos import ARQUIVO_SINAL, carregar_armazenamento, liberar_armazenamentos, salvar_armazenamento
+from cache_extracao import carregar_cache, consultar, registrar, salvar_cache, versao_features
+
+# ============================================================================
+# INVALIDAÇÃO DO CACHE DE EXTRAÇÃO
+# ============================================================================
+#
+# Cada teste simula execuções sucessivas de um extrator: consultar o cache,
+# recalcular o que faltar e registrar. Só os segmentos alterados devem ser
+# recalculados.
+
+def _executar(caminho_cache, versao, pasta, arquivos):
+    """Uma passada de extração; retorna o conjunto de arquivos recalculados"""
+    cache = carregar_cache(caminho_cache, versao)
+    recalculados = set()
+    for arquivo in arquivos:
+        resultado, identificacao = consultar(cache, pasta, arquivo)
+        if resultado is None:
+            recalculados.add(arquivo)
+            registrar(cache, identificacao, {'arquivo': arquivo})
+    salvar_cache(cache, caminho_cache)
+    return recalculados
+
+def _gravar_segmentos_texto(pasta, n_segmentos=3):
+    os.makedirs(pasta)
+    arquivos = []
+    for i in range(1, n_segmentos + 1):
+        arquivo = f'segmento_{i}.csv'
+        with open(os.path.join(pasta, arquivo), 'w') as f:
+            f.write(''.join(f'{i * 10 + j}.5\n' for j in range(5)))
+        arquivos.append(arquivo)
+    return arquivos
+
+def test_segmento_em_texto_editado(tmp_path):
+    pasta = str(tmp_path / 'condicao')
+    caminho_cache = str(tmp_path / 'cache.json')
+    arquivos = _gravar_segmentos_texto(pasta)
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == set(arquivos)
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == set()
+
+    with open(os.path.join(pasta, 'segmento_2.csv'), 'a') as f:
+        f.write('99.0\n')
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == {'segmento_2.csv'}
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == set()
+
+def test_segmento_em_texto_so_com_mtime_alterado(tmp_path):
+    pasta = str(tmp_path / 'condicao')
+    caminho_cache = str(tmp_path / 'cache.json')
+    arquivos = _gravar_segmentos_texto(pasta)
+    _executar(caminho_cache, 'v1', pasta, arquivos)
+
+    caminho = os.path.join(pasta, 'segmento_3.csv')
+    estado = os.stat(caminho)
+    os.utime(caminho, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10**9))
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == set()
+    # A nova assinatura foi gravada: a próxima passada nem calcula o hash
+    chave = os.path.join(os.path.abspath(pasta), 'segmento_3.csv')
+    assert carregar_cache(caminho_cache, 'v1')['entradas'][chave]['assinatura'][1] == estado.st_mtime_ns + 10**9
+
+def test_segmento_do_armazenamento_binario_editado(tmp_path):
+    pasta = str(tmp_path / 'condicao')
+    caminho_cache = str(tmp_path / 'cache.json')
+    linhas = [f'{v}.25\n' for v in range(12)]
+    salvar_armazenamento(pasta, linhas, [(0, 4), (4, 8), (8, 12)], 'condicao')
+    arquivos = ['segmento_1.csv', 'segmento_2.csv', 'segmento_3.csv']
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == set(arquivos)
+
+    # Regrava o .npy (novo mtime para todos os segmentos) mudando só o segundo
+    sinal, _ = carregar_armazenamento(pasta)
+    valores = np.array(sinal)
+    valores[5] += 1.0
+    liberar_armazenamentos(pasta)
+    np.save(os.path.join(pasta, ARQUIVO_SINAL), valores)
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == {'segmento_2.csv'}
+    assert _executar(caminho_cache, 'v1', pasta, arquivos) == set()
+    liberar_armazenamentos(pasta)
+
+def test_modulo_versionado_alterado(tmp_path, monkeypatch):
+    pasta = str(tmp_path / 'condicao')
+    caminho_cache = str(tmp_path / 'cache.json')
+    arquivos = _gravar_segmentos_texto(pasta)
+    modulo = tmp_path / 'modulo_versionado.py'
+    modulo.write_text('FATOR = 1\n')
+    # Caminho absoluto: os.path.join ignora a pasta dos módulos do projeto
+    monkeypatch.setattr(cache_extracao, 'MODULOS_VERSAO', cache_extracao.MODULOS_VERSAO + [str(modulo)])
+
+    versao = versao_features(['media', 'rms'])
+    assert versao_features(['media', 'rms']) == versao
+    _executar(caminho_cache, versao, pasta, arquivos)
+    assert _executar(caminho_cache, versao, pasta, arquivos) == set()
+
+    modulo.write_text('FATOR = 2\n')
+    nova_versao = versao_features(['media', 'rms'])
+    assert nova_versao != versao
+    assert _executar(caminho_cache, nova_versao, pasta, arquivos) == set(arquivos)
+
+def test_modulos_versionados_existem():
+    pasta_modulos = os.path.dirname(os.path.abspath(cache_extracao.__file__))
+    for modulo in cache_extracao.MODULOS_VERSAO:
+        assert os.path.isfile(os.path.join(pasta_modulos, modulo)), modulo
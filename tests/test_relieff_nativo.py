@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+from relieff_nativo import calcular_scores_relieff
+
+# ============================================================================
+# RELIEFF NATIVO x SKREBATE
+# ============================================================================
+#
+# Scores de referência gerados com skrebate 0.8.4:
+#   ReliefF(n_neighbors=5, n_jobs=1).fit(X, y).feature_importances_
+# sobre os conjuntos abaixo (classes balanceadas, classes desbalanceadas e
+# dados mistos, com uma feature categórica). O skrebate não é dependência do
+# projeto: os valores ficam gravados aqui.
+
+N_VIZINHOS = 5
+
+X_BALANCEADO = np.array([
+    [0.001, 0.299, -0.274, -0.891],
+    [-0.455, -0.992, 0.060, 1.340],
+    [-0.492, -0.620, 0.490, 0.357],
+    [0.105, -0.930, -0.029, 0.695],
+    [-1.344, -0.458, -1.901, -1.290],
+    [-1.842, -0.235, -1.267, 0.271],
+    [0.157, -0.187, -2.517, -0.539],
+    [-0.049, 0.113, -1.530, -0.478],
+    [-0.979, -0.809, 1.061, -0.808],
+    [-0.033, 0.884, -0.584, -0.112],
+    [0.110, 0.064, -1.225, 0.076],
+    [1.359, -1.547, 0.859, 0.119],
+    [-0.641, 2.000, 0.762, -1.199],
+    [0.075, 0.577, -0.189, 0.683],
+    [-0.067, 0.667, 1.439, -0.676],
+    [1.703, 0.037, 0.127, -1.187],
+    [0.921, 0.304, 0.899, 1.145],
+    [0.176, -0.295, 0.647, -1.992],
+    [1.037, 0.403, 1.257, 0.689],
+    [1.173, 0.131, -0.250, 1.524],
+    [1.072, 0.196, 0.353, -0.121],
+    [1.303, -0.614, -0.012, -0.444],
+    [2.666, 1.153, -0.024, 0.668],
+    [1.160, 1.552, -0.005, 0.583],
+    [0.209, 0.847, -1.688, -2.035],
+    [1.196, -0.400, 0.164, 2.245],
+    [0.668, -0.124, 0.205, 0.493],
+    [1.324, 0.294, 0.702, 0.520],
+    [0.466, 0.421, 0.035, -1.054],
+    [1.760, -0.358, 0.972, 0.193],
+])
+Y_BALANCEADO = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1])
+SCORES_BALANCEADO = [0.1315039929015084, 0.02961187858283996, 0.013196831816649811, 0.012529595015576326]
+
+X_DESBALANCEADO = np.array([
+    [0.089, -0.591, -0.119, -1.998],
+    [-1.131, 0.363, -2.129, 0.847],
+    [-1.746, 0.757, -0.845, 0.779],
+    [0.131, -1.537, 1.249, 1.442],
+    [-0.066, -0.274, -0.160, -0.975],
+    [1.099, -0.543, -0.051, -0.793],
+    [-0.626, -1.278, 1.257, -0.154],
+    [0.966, 0.013, -0.694, -0.327],
+    [-0.560, 0.008, -0.375, -0.300],
+    [-1.379, -0.807, 1.654, -0.671],
+    [-1.054, 0.337, 1.407, -1.454],
+    [-0.209, -0.632, -1.761, 0.735],
+    [-0.023, 0.071, -0.752, 0.455],
+    [-0.539, -0.143, -1.108, -1.216],
+    [1.336, -0.507, 0.292, -0.034],
+    [-0.441, -0.508, 0.630, -0.302],
+    [-0.151, 0.022, 1.177, 0.681],
+    [0.383, -0.564, -1.382, 0.950],
+    [0.966, -0.141, 0.542, 0.781],
+    [0.831, 0.921, -0.456, 1.515],
+    [-1.247, 0.862, 0.494, 0.874],
+    [1.879, 1.484, -1.145, -1.689],
+    [0.817, -1.015, -0.012, 0.840],
+    [-1.644, -2.110, 0.259, 0.044],
+    [1.254, 0.539, -0.861, -1.513],
+    [1.333, -0.472, -1.643, 0.506],
+    [1.439, 0.907, -0.989, -0.658],
+    [0.501, -0.387, 0.195, -0.783],
+    [1.856, 0.840, 2.025, -1.393],
+    [2.388, 0.411, -0.014, -1.450],
+    [1.040, 1.243, -0.082, 0.081],
+])
+Y_DESBALANCEADO = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1])
+SCORES_DESBALANCEADO = [0.13046490940587102, 0.08267901699965895, 0.029206206221752844, 0.07011193447379778]
+
+X_MISTO = np.array([
+    [-0.291, 1.155, -0.021, 2.0],
+    [-0.692, -1.969, -3.251, 1.0],
+    [1.334, 0.047, -1.173, 2.0],
+    [1.131, 0.158, 0.048, 1.0],
+    [0.038, 0.805, 0.553, 1.0],
+    [-1.043, 0.511, -0.684, 1.0],
+    [-1.271, -0.138, -0.007, 2.0],
+    [1.722, 1.460, -0.464, 1.0],
+    [0.379, -2.614, 0.250, 2.0],
+    [0.083, -1.077, -0.269, 2.0],
+    [1.188, 0.334, -0.006, 0.0],
+    [-0.555, -0.389, -1.817, 2.0],
+    [0.964, 0.917, 0.669, 1.0],
+    [0.215, -0.252, -0.204, 0.0],
+    [1.512, 0.556, -0.058, 0.0],
+    [-0.635, 1.603, 0.507, 0.0],
+    [-0.346, -1.109, -0.067, 1.0],
+    [-0.393, -0.227, -0.221, 0.0],
+    [-0.093, 0.265, -0.854, 2.0],
+    [0.729, 1.077, 1.524, 3.0],
+    [0.898, 0.691, -0.002, 3.0],
+    [1.961, 2.516, -0.258, 3.0],
+    [0.455, 0.819, -1.247, 1.0],
+    [2.780, -0.405, 1.081, 1.0],
+    [1.759, 1.053, 1.952, 3.0],
+    [0.907, -0.853, 0.042, 3.0],
+    [2.460, -0.442, -0.855, 3.0],
+    [1.792, 0.295, 0.214, 1.0],
+])
+Y_MISTO = np.array([0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1])
+SCORES_MISTO = [-0.03242761928271677, -0.169057365636313, -0.06539633727794404, 0.5285714285714286]
+
+CASOS = {
+    'balanceado': (X_BALANCEADO, Y_BALANCEADO, SCORES_BALANCEADO),
+    'desbalanceado': (X_DESBALANCEADO, Y_DESBALANCEADO, SCORES_DESBALANCEADO),
+    'misto': (X_MISTO, Y_MISTO, SCORES_MISTO),
+}
+
+@pytest.mark.parametrize('caso', sorted(CASOS))
+def test_scores_iguais_ao_skrebate(caso):
+    X, y, referencia = CASOS[caso]
+    scores = calcular_scores_relieff(X, y, n_vizinhos=N_VIZINHOS)
+    np.testing.assert_allclose(scores, referencia, rtol=1e-9, atol=1e-12)
+
+@pytest.mark.parametrize('caso', sorted(CASOS))
+def test_blocos_e_threads_nao_mudam_os_scores(caso):
+    X, y, referencia = CASOS[caso]
+    # Blocos de uma linha, calculados em duas threads
+    scores = calcular_scores_relieff(X, y, n_vizinhos=N_VIZINHOS, memoria_bloco=1, n_jobs=2)
+    np.testing.assert_allclose(scores, referencia, rtol=1e-9, atol=1e-12)
+
+def test_labels_de_uma_classe():
+    with pytest.raises(ValueError):
+        calcular_scores_relieff(X_BALANCEADO, np.zeros(len(X_BALANCEADO)), n_vizinhos=N_VIZINHOS)
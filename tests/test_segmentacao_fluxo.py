@@ -0,0 +1,85 @@
+import filecmp
+import os
+
+import numpy as np
+import pytest
+
+import armazenamento_segmentos
+from armazenamento_segmentos import (ARQUIVO_SINAL, carregar_armazenamento, contar_linhas, converter_linhas,
+                                     liberar_armazenamentos, limites_segmentos, salvar_armazenamento)
+from janelamento import limites_por_contagem, segmentar_arquivo_em_janelas
+from pipeline_dados import segmentar_arquivo
+
+# ============================================================================
+# SEGMENTAÇÃO EM FLUXO x LEITURA DO ARQUIVO INTEIRO
+# ============================================================================
+#
+# A referência lê a gravação com readlines e grava com salvar_armazenamento
+# (o caminho original); segmentar_arquivo lê em blocos. Os blocos pequenos
+# forçam linhas e segmentos partidos entre blocos.
+
+_RNG = np.random.default_rng(0)
+GRAVACOES = {
+    'simples': ''.join(f'{v}\n' for v in _RNG.normal(size=103)),
+    'cabecalho': 'tempo;valor\n' + ''.join(f'{i};{v:.4f}\n'.replace('.', ',')
+                                           for i, v in enumerate(_RNG.normal(size=50))),
+    'crlf': ''.join(f'{v}\r\n' for v in _RNG.normal(size=40)),
+    'cr': ''.join(f'{v}\r' for v in _RNG.normal(size=30)),
+    'sem_quebra_final': '\n'.join(str(v) for v in _RNG.normal(size=33)),
+    'linhas_invalidas': ''.join((f'{v}\n' if i % 5 else 'x\n') for i, v in enumerate(_RNG.normal(size=61))) + '\n\n',
+}
+
+@pytest.fixture(params=['blocos_pequenos', 'blocos_padrao'])
+def tamanho_blocos(request, monkeypatch):
+    if request.param == 'blocos_pequenos':
+        monkeypatch.setattr(armazenamento_segmentos, 'LINHAS_POR_BLOCO', 7)
+        monkeypatch.setattr(armazenamento_segmentos, 'TAMANHO_BLOCO_BYTES', 5)
+    return request.param
+
+def _gravar(tmp_path, nome):
+    caminho = str(tmp_path / f'{nome}.txt')
+    with open(caminho, 'w', encoding='utf-8', newline='') as f:
+        f.write(GRAVACOES[nome])
+    return caminho
+
+def _ler_linhas(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return f.readlines()
+
+@pytest.mark.parametrize('nome', sorted(GRAVACOES))
+@pytest.mark.parametrize('n_segmentos, sobreposicao', [(4, 0.0), (6, 0.5)])
+def test_fluxo_igual_a_leitura_inteira(tmp_path, tamanho_blocos, nome, n_segmentos, sobreposicao):
+    caminho = _gravar(tmp_path, nome)
+    linhas = _ler_linhas(caminho)
+    assert contar_linhas(caminho) == len(linhas)
+    if sobreposicao:
+        limites = limites_por_contagem(len(linhas), n_segmentos, sobreposicao)
+    else:
+        limites = limites_segmentos(len(linhas), n_segmentos)
+
+    referencia = str(tmp_path / 'referencia' / nome)
+    salvar_armazenamento(referencia, linhas, limites, nome)
+    for i, (inicio, fim) in enumerate(limites, 1):
+        with open(os.path.join(referencia, f'segmento_{i}.txt'), 'w', encoding='utf-8') as f:
+            f.writelines(linhas[inicio:fim])
+
+    saida = segmentar_arquivo(caminho, n_segmentos, str(tmp_path / 'fluxo'), sobreposicao, exportar_texto=True)
+    assert sorted(os.listdir(saida)) == sorted(os.listdir(referencia))
+    sinal_referencia = np.load(os.path.join(referencia, ARQUIVO_SINAL))
+    sinal_fluxo = np.load(os.path.join(saida, ARQUIVO_SINAL))
+    assert sinal_fluxo.dtype == sinal_referencia.dtype
+    assert np.array_equal(sinal_fluxo, sinal_referencia)
+    for arquivo in os.listdir(referencia):
+        if arquivo != ARQUIVO_SINAL:
+            # Índice e segmentos em texto idênticos byte a byte
+            assert filecmp.cmp(os.path.join(referencia, arquivo), os.path.join(saida, arquivo), shallow=False), arquivo
+
+@pytest.mark.parametrize('nome', sorted(GRAVACOES))
+def test_janelas_em_fluxo(tmp_path, tamanho_blocos, nome):
+    caminho = _gravar(tmp_path, nome)
+    valores, validos = converter_linhas(_ler_linhas(caminho))
+    pasta, n_janelas = segmentar_arquivo_em_janelas(caminho, str(tmp_path / 'janelas'), 8, 4, 'manter')
+    sinal, indice = carregar_armazenamento(pasta)
+    assert np.array_equal(np.asarray(sinal), valores[validos])
+    assert n_janelas == len(indice)
+    liberar_armazenamentos(pasta)